@@ -158,29 +158,40 @@ class ResultAnalyzer:
     Single object to encapsulate all postprocessing aggregation.
     """
 
-    def __init__(self, study: Study, result: Result):
+    def __init__(self, study: Study, result: Result, dtype=None):
         """
         Create an instance.
 
         :param study: study to use
         :param result: result of study used
+        :param dtype: type of numerical columns, like np.float32 to halve memory.
+        default None to use study dtype, float if study doesn't set one
         """
         self.result = result
         self.study = study
+        if dtype is None:
+            dtype = float if study.dtype is None else study.dtype
+        self.dtype = np.dtype(dtype)
 
-        self.consumption = ResultAnalyzer._build_consumption(self.study, self.result)
-        self.production = ResultAnalyzer._build_production(self.study, self.result)
-        self.storage = ResultAnalyzer._build_storage(self.study, self.result)
-        self.link = ResultAnalyzer._build_link(self.study, self.result)
+        self.consumption = ResultAnalyzer._build_consumption(
+            self.study, self.result, self.dtype
+        )
+        self.production = ResultAnalyzer._build_production(
+            self.study, self.result, self.dtype
+        )
+        self.storage = ResultAnalyzer._build_storage(
+            self.study, self.result, self.dtype
+        )
+        self.link = ResultAnalyzer._build_link(self.study, self.result, self.dtype)
         self.src_converter = ResultAnalyzer._build_src_converter(
-            self.study, self.result
+            self.study, self.result, self.dtype
         )
         self.dest_converter = ResultAnalyzer._build_dest_converter(
-            self.study, self.result
+            self.study, self.result, self.dtype
         )
 
     @staticmethod
-    def _build_consumption(study: Study, result: Result):
+    def _build_consumption(study: Study, result: Result, dtype=float):
         """
         Flat all data to build global consumption dataframe
         columns: | cost | name | node | network | asked | given | t | scn |
@@ -196,9 +207,9 @@ class ResultAnalyzer:
         )
         size = scn * h * elements
         cons = {
-            "cost": np.empty(size, dtype=float),
-            "asked": np.empty(size, dtype=float),
-            "given": np.empty(size, dtype=float),
+            "cost": np.empty(size, dtype=dtype),
+            "asked": np.empty(size, dtype=dtype),
+            "given": np.empty(size, dtype=dtype),
             "name": np.empty(size, dtype=str),
             "node": np.empty(size, dtype=str),
             "network": np.empty(size, dtype=str),
@@ -213,12 +224,12 @@ class ResultAnalyzer:
                 for i, rc in enumerate(net.nodes[node].consumptions):
                     slices = cons.index[n_cons * h * scn : (n_cons + 1) * h * scn]
                     sc = study.networks[n].nodes[node].consumptions[i]
-                    cons.loc[slices, "cost"] = sc.cost.flatten()
+                    cons.loc[slices, "cost"] = sc.cost.flatten().astype(dtype)
                     cons.loc[slices, "name"] = rc.name
                     cons.loc[slices, "node"] = node
                     cons.loc[slices, "network"] = n
-                    cons.loc[slices, "asked"] = sc.quantity.flatten()
-                    cons.loc[slices, "given"] = rc.quantity.flatten()
+                    cons.loc[slices, "asked"] = sc.quantity.flatten().astype(dtype)
+                    cons.loc[slices, "given"] = rc.quantity.flatten().astype(dtype)
                     cons.loc[slices, "t"] = np.tile(np.arange(h), scn)
                     cons.loc[slices, "scn"] = np.repeat(np.arange(scn), h)
 
@@ -227,7 +238,7 @@ class ResultAnalyzer:
         return cons
 
     @staticmethod
-    def _build_production(study: Study, result: Result):
+    def _build_production(study: Study, result: Result, dtype=float):
         """
         Flat all data to build global production dataframe
         columns: | cost | avail | used | network | name | node | t |
@@ -242,9 +253,9 @@ class ResultAnalyzer:
         )
         size = scn * h * elements
         prod = {
-            "cost": np.empty(size, dtype=float),
-            "avail": np.empty(size, dtype=float),
-            "used": np.empty(size, dtype=float),
+            "cost": np.empty(size, dtype=dtype),
+            "avail": np.empty(size, dtype=dtype),
+            "used": np.empty(size, dtype=dtype),
             "name": np.empty(size, dtype=str),
             "node": np.empty(size, dtype=str),
             "network": np.empty(size, dtype=str),
@@ -259,12 +270,12 @@ class ResultAnalyzer:
                 for i, rp in enumerate(net.nodes[node].productions):
                     slices = prod.index[n_prod * h * scn : (n_prod + 1) * h * scn]
                     sp = study.networks[n].nodes[node].productions[i]
-                    prod.loc[slices, "cost"] = sp.cost.flatten()
+                    prod.loc[slices, "cost"] = sp.cost.flatten().astype(dtype)
                     prod.loc[slices, "name"] = rp.name
                     prod.loc[slices, "node"] = node
                     prod.loc[slices, "network"] = n
-                    prod.loc[slices, "avail"] = sp.quantity.flatten()
-                    prod.loc[slices, "used"] = rp.quantity.flatten()
+                    prod.loc[slices, "avail"] = sp.quantity.flatten().astype(dtype)
+                    prod.loc[slices, "used"] = rp.quantity.flatten().astype(dtype)
                     prod.loc[slices, "t"] = np.tile(np.arange(h), scn)
                     prod.loc[slices, "scn"] = np.repeat(np.arange(scn), h)
 
@@ -273,11 +284,12 @@ class ResultAnalyzer:
         return prod
 
     @staticmethod
-    def _build_storage(study: Study, result: Result):
+    def _build_storage(study: Study, result: Result, dtype=float):
         """
         Flat all data to build global storage dataframe
         :param study:
         :param result:
+        :param dtype: type of numerical columns
         :return:
         """
         h = study.horizon
@@ -291,15 +303,15 @@ class ResultAnalyzer:
         size = h * scn * elements
 
         stor = {
-            "max_capacity": np.empty(size, dtype=float),
-            "capacity": np.empty(size, dtype=float),
-            "max_flow_in": np.empty(size, dtype=float),
-            "flow_in": np.empty(size, dtype=float),
-            "max_flow_out": np.empty(size, dtype=float),
-            "flow_out": np.empty(size, dtype=float),
-            "cost": np.empty(size, dtype=float),
-            "init_capacity": np.empty(size, dtype=float),
-            "eff": np.empty(size, dtype=float),
+            "max_capacity": np.empty(size, dtype=dtype),
+            "capacity": np.empty(size, dtype=dtype),
+            "max_flow_in": np.empty(size, dtype=dtype),
+            "flow_in": np.empty(size, dtype=dtype),
+            "max_flow_out": np.empty(size, dtype=dtype),
+            "flow_out": np.empty(size, dtype=dtype),
+            "cost": np.empty(size, dtype=dtype),
+            "init_capacity": np.empty(size, dtype=dtype),
+            "eff": np.empty(size, dtype=dtype),
             "name": np.empty(size, dtype=str),
             "node": np.empty(size, dtype=str),
             "network": np.empty(size, dtype=str),
@@ -316,15 +328,23 @@ class ResultAnalyzer:
                     slices = stor.index[n_stor * h * scn : (n_stor + 1) * h * scn]
                     study_stor = study.networks[n].nodes[node].storages[i]
 
-                    stor.loc[slices, "max_capacity"] = study_stor.capacity.flatten()
-                    stor.loc[slices, "capacity"] = c.capacity.flatten()
-                    stor.loc[slices, "max_flow_in"] = study_stor.flow_in.flatten()
-                    stor.loc[slices, "flow_in"] = c.flow_in.flatten()
-                    stor.loc[slices, "max_flow_out"] = study_stor.flow_out.flatten()
-                    stor.loc[slices, "flow_out"] = c.flow_out.flatten()
-                    stor.loc[slices, "cost"] = study_stor.cost.flatten()
-                    stor.loc[slices, "init_capacity"] = study_stor.init_capacity
-                    stor.loc[slices, "eff"] = study_stor.eff.flatten()
+                    stor.loc[
+                        slices, "max_capacity"
+                    ] = study_stor.capacity.flatten().astype(dtype)
+                    stor.loc[slices, "capacity"] = c.capacity.flatten().astype(dtype)
+                    stor.loc[
+                        slices, "max_flow_in"
+                    ] = study_stor.flow_in.flatten().astype(dtype)
+                    stor.loc[slices, "flow_in"] = c.flow_in.flatten().astype(dtype)
+                    stor.loc[
+                        slices, "max_flow_out"
+                    ] = study_stor.flow_out.flatten().astype(dtype)
+                    stor.loc[slices, "flow_out"] = c.flow_out.flatten().astype(dtype)
+                    stor.loc[slices, "cost"] = study_stor.cost.flatten().astype(dtype)
+                    stor.loc[slices, "init_capacity"] = np.dtype(dtype).type(
+                        study_stor.init_capacity
+                    )
+                    stor.loc[slices, "eff"] = study_stor.eff.flatten().astype(dtype)
                     stor.loc[slices, "network"] = n
                     stor.loc[slices, "name"] = c.name
                     stor.loc[slices, "node"] = node
@@ -334,7 +354,7 @@ class ResultAnalyzer:
         return stor
 
     @staticmethod
-    def _build_link(study: Study, result: Result):
+    def _build_link(study: Study, result: Result, dtype=float):
         """
         Flat all data to build global link dataframe
         columns: | cost | avail | used | node | dest | t |
@@ -350,9 +370,9 @@ class ResultAnalyzer:
         size = h * scn * elements
 
         link = {
-            "cost": np.empty(size, dtype=float),
-            "avail": np.empty(size, dtype=float),
-            "used": np.empty(size, dtype=float),
+            "cost": np.empty(size, dtype=dtype),
+            "avail": np.empty(size, dtype=dtype),
+            "used": np.empty(size, dtype=dtype),
             "node": np.empty(size, dtype=str),
             "dest": np.empty(size, dtype=str),
             "network": np.empty(size, dtype=str),
@@ -367,12 +387,12 @@ class ResultAnalyzer:
                 for i, rl in enumerate(net.nodes[node].links):
                     slices = link.index[n_link * h * scn : (n_link + 1) * h * scn]
                     sl = study.networks[n].nodes[node].links[i]
-                    link.loc[slices, "cost"] = sl.cost.flatten()
+                    link.loc[slices, "cost"] = sl.cost.flatten().astype(dtype)
                     link.loc[slices, "dest"] = rl.dest
                     link.loc[slices, "node"] = node
                     link.loc[slices, "network"] = n
-                    link.loc[slices, "avail"] = sl.quantity.flatten()
-                    link.loc[slices, "used"] = rl.quantity.flatten()
+                    link.loc[slices, "avail"] = sl.quantity.flatten().astype(dtype)
+                    link.loc[slices, "used"] = rl.quantity.flatten().astype(dtype)
                     link.loc[slices, "t"] = np.tile(np.arange(h), scn)
                     link.loc[slices, "scn"] = np.repeat(np.arange(scn), h)
 
@@ -381,7 +401,7 @@ class ResultAnalyzer:
         return link
 
     @staticmethod
-    def _build_dest_converter(study: Study, result: Result):
+    def _build_dest_converter(study: Study, result: Result, dtype=float):
         h = study.horizon
         scn = study.nb_scn
         elements = sum([len(v.src_ratios) for v in study.converters.values()])
@@ -391,27 +411,29 @@ class ResultAnalyzer:
             "name": np.empty(size, dtype=str),
             "network": np.empty(size, dtype=str),
             "node": np.empty(size, dtype=str),
-            "flow": np.empty(size, dtype=float),
-            "cost": np.empty(size, dtype=float),
-            "max": np.empty(size, dtype=float),
+            "flow": np.empty(size, dtype=dtype),
+            "cost": np.empty(size, dtype=dtype),
+            "max": np.empty(size, dtype=dtype),
         }
         dest_conv = pd.DataFrame(data=dest_conv)
 
         for i, (name, v) in enumerate(study.converters.items()):
             slices = dest_conv.index[i * h * scn : (i + 1) * h * scn]
             dest_conv.loc[slices, "name"] = v.name
-            dest_conv.loc[slices, "cost"] = v.cost.flatten()
-            dest_conv.loc[slices, "max"] = v.max.flatten()
+            dest_conv.loc[slices, "cost"] = v.cost.flatten().astype(dtype)
+            dest_conv.loc[slices, "max"] = v.max.flatten().astype(dtype)
             dest_conv.loc[slices, "network"] = v.dest_network
             dest_conv.loc[slices, "node"] = v.dest_node
-            dest_conv.loc[slices, "flow"] = result.converters[name].flow_dest.flatten()
+            dest_conv.loc[slices, "flow"] = (
+                result.converters[name].flow_dest.flatten().astype(dtype)
+            )
             dest_conv.loc[slices, "t"] = np.tile(np.arange(h), scn)
             dest_conv.loc[slices, "scn"] = np.repeat(np.arange(scn), h)
 
         return dest_conv
 
     @staticmethod
-    def _build_src_converter(study: Study, result: Result):
+    def _build_src_converter(study: Study, result: Result, dtype=float):
         h = study.horizon
         scn = study.nb_scn
         elements = sum([len(v.src_ratios) for v in study.converters.values()])
@@ -421,9 +443,9 @@ class ResultAnalyzer:
             "name": np.empty(size, dtype=str),
             "network": np.empty(size, dtype=str),
             "node": np.empty(size, dtype=str),
-            "ratio": np.empty(size, dtype=float),
-            "flow": np.empty(size, dtype=float),
-            "max": np.empty(size, dtype=float),
+            "ratio": np.empty(size, dtype=dtype),
+            "flow": np.empty(size, dtype=dtype),
+            "max": np.empty(size, dtype=dtype),
         }
         src_conv = pd.DataFrame(data=src_conv)
 
@@ -441,10 +463,15 @@ class ResultAnalyzer:
                 slices = src_conv.index[s:e]
                 src_conv.loc[slices, "network"] = net
                 src_conv.loc[slices, "node"] = node
-                src_conv.loc[slices, "max"] = v.max.flatten()
-                src_conv.loc[slices, "ratio"] = v.src_ratios[(net, node)].flatten()
+                src_conv.loc[slices, "max"] = v.max.flatten().astype(dtype)
+                src_conv.loc[slices, "ratio"] = (
+                    v.src_ratios[(net, node)].flatten().astype(dtype)
+                )
                 src_conv.loc[slices, "flow"] = (
-                    result.converters[name].flow_src[(net, node)].flatten()
+                    result.converters[name]
+                    .flow_src[(net, node)]
+                    .flatten()
+                    .astype(dtype)
                 )
                 s = e
             s = e
@@ -597,7 +624,7 @@ class ResultAnalyzer:
         :param network: network asked. Default is 'default'
         :return: timeline array with balance exchanges value
         """
-        balance = np.zeros((self.nb_scn, self.study.horizon))
+        balance = np.zeros((self.nb_scn, self.study.horizon), dtype=self.dtype)
 
         mask = (self.link["dest"] == node) & (self.link["network"] == network)
         im = pd.pivot_table(
@@ -622,7 +649,7 @@ class ResultAnalyzer:
         :param network: network name, 'default' as default if node is provided or None to ask whole network.
         :return: matrix (scn, time)
         """
-        cost = np.zeros((self.nb_scn, self.horizon))
+        cost = np.zeros((self.nb_scn, self.horizon), dtype=self.dtype)
         c, p, s, l, _, v = self.get_elements_inside(node, network)
         network = "default" if node and network is None else network
         if c:
@@ -686,7 +713,9 @@ class ResultAnalyzer:
         """
 
         def fill_width_zeros(arr: np.ndarray) -> np.ndarray:
-            return np.zeros((self.nb_scn, self.horizon)) if arr.size == 0 else arr
+            if arr.size == 0:
+                return np.zeros((self.nb_scn, self.horizon), dtype=self.dtype)
+            return arr
 
         prod_used = (
             self.production[self.production["network"] == network]
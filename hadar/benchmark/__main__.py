@@ -0,0 +1,55 @@
+#  Copyright (c) 2019-2020, RTE (https://www.rte-france.com)
+#  See AUTHORS.txt
+#  This Source Code Form is subject to the terms of the Apache License, version 2.0.
+#  If a copy of the Apache License, version 2.0 was not distributed with this file, you can obtain one at http://www.apache.org/licenses/LICENSE-2.0.
+#  SPDX-License-Identifier: Apache-2.0
+#  This file is part of hadar-simulator, a python adequacy library for everyone.
+"""
+Run scaling benchmark from command line, like:
+
+    python -m hadar.benchmark --grid nb_scn=10,100 --grid nodes=2,8 --set horizon=24 --output bench
+"""
+import argparse
+
+from hadar.benchmark.suite import run_scaling, write_tables, DEFAULT_GRID
+
+
+def _parse(items, many: bool):
+    res = dict()
+    for item in items or []:
+        name, values = item.split("=")
+        values = [float(v) if "." in v else int(v) for v in values.split(",")]
+        res[name] = values if many else values[0]
+    return res
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Hadar scaling benchmark")
+    parser.add_argument(
+        "--grid",
+        action="append",
+        help="generate_study parameter and values to combine, like nodes=2,8",
+    )
+    parser.add_argument(
+        "--set", action="append", help="generate_study fixed parameter, like horizon=24"
+    )
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--no-memory", action="store_true")
+    parser.add_argument("--output", default="benchmark")
+    args = parser.parse_args(args)
+
+    df = run_scaling(
+        grid=_parse(args.grid, many=True) or DEFAULT_GRID,
+        base=_parse(args.set, many=False),
+        processes=args.processes,
+        repeat=args.repeat,
+        memory=not args.no_memory,
+    )
+    print(df.to_string(index=False))
+    for path in write_tables(df, args.output).values():
+        print("Written %s" % path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#  Copyright (c) 2019-2020, RTE (https://www.rte-france.com)
+#  See AUTHORS.txt
+#  This Source Code Form is subject to the terms of the Apache License, version 2.0.
+#  If a copy of the Apache License, version 2.0 was not distributed with this file, you can obtain one at http://www.apache.org/licenses/LICENSE-2.0.
+#  SPDX-License-Identifier: Apache-2.0
+#  This file is part of hadar-simulator, a python adequacy library for everyone.
+import numpy as np
+
+from hadar.optimizer.domain.input import Study
+
+__all__ = ["generate_study", "network_name", "node_name"]
+
+
+def network_name(i: int) -> str:
+    """
+    Name of i-th generated network. First one is 'default'.
+    """
+    return "default" if i == 0 else "net%d" % i
+
+
+def node_name(i: int) -> str:
+    """
+    Name of i-th generated node inside a network.
+    """
+    return "n%d" % i
+
+
+def _load(rng: np.random.Generator, nb_scn: int, horizon: int) -> np.ndarray:
+    """
+    Generate consumption with a daily shape on hourly steps and noise by scenario.
+
+    :return: array like (nb_scn, horizon)
+    """
+    t = np.arange(horizon)
+    shape = 1 + 0.3 * np.sin(2 * np.pi * (t % 24) / 24)
+    level = rng.uniform(50, 150)
+    noise = rng.normal(1, 0.1, size=(nb_scn, horizon))
+    return np.maximum(level * shape * noise, 0)
+
+
+def generate_study(
+    nodes: int = 4,
+    link_density: float = 0.5,
+    horizon: int = 168,
+    nb_scn: int = 10,
+    storages: int = 1,
+    converters: int = 0,
+    networks: int = 1,
+    seed: int = 0,
+) -> Study:
+    """
+    Generate a synthetic study with the fluent api. Each node gets a consumption varying by scenario,
+    a cheap and an expensive production and storages. Links are drawn between node pairs,
+    converters link a random node of a network to a random node of next network.
+
+    :param nodes: number of nodes by network
+    :param link_density: probability of a link (in both ways) between two nodes of the same network, between 0 and 1
+    :param horizon: number of time steps
+    :param nb_scn: number of scenarios
+    :param storages: number of storages by node
+    :param converters: number of converters, needs at least two networks
+    :param networks: number of networks
+    :param seed: random seed, same parameters and seed give the same study
+    :return: study
+    """
+    if nodes < 1 or networks < 1:
+        raise ValueError("Study needs at least one network and one node")
+    if not 0 <= link_density <= 1:
+        raise ValueError("Link density must be between 0 and 1")
+    if converters > 0 and networks < 2:
+        raise ValueError("Converters need at least two networks")
+
+    rng = np.random.default_rng(seed)
+    study = Study(horizon=horizon, nb_scn=nb_scn)
+
+    # Converter i goes from network i % (networks - 1) to next network
+    # sources is {node: [(converter, ratio), ...]} by network
+    sources = [dict() for _ in range(networks)]
+    dests = []
+    for i in range(converters):
+        n_src = i % (networks - 1)
+        node = node_name(rng.integers(nodes))
+        sources[n_src].setdefault(node, []).append(
+            ("conv%d" % i, float(rng.uniform(0.5, 1)))
+        )
+        dests.append(
+            ("conv%d" % i, network_name(n_src + 1), node_name(rng.integers(nodes)))
+        )
+
+    for n in range(networks):
+        builder = study.network(network_name(n))
+        for i in range(nodes):
+            name = node_name(i)
+            load = _load(rng, nb_scn, horizon)
+            peak = float(load.max())
+            builder = (
+                builder.node(name)
+                .consumption(name="load", cost=10 ** 4, quantity=load)
+                .production(
+                    name="base", cost=float(rng.uniform(10, 30)), quantity=0.7 * peak
+                )
+                .production(
+                    name="peak", cost=float(rng.uniform(50, 100)), quantity=0.4 * peak
+                )
+            )
+            for s in range(storages):
+                builder = builder.storage(
+                    name="storage%d" % s,
+                    capacity=2 * peak,
+                    flow_in=0.2 * peak,
+                    flow_out=0.2 * peak,
+                    cost=-0.01 * (s + 1),
+                    eff=0.9,
+                )
+            for conv, ratio in sources[n].get(name, []):
+                builder = builder.to_converter(name=conv, ratio=ratio)
+
+        for i in range(nodes):
+            for j in range(i + 1, nodes):
+                if rng.random() < link_density:
+                    quantity = float(rng.uniform(10, 100))
+                    cost = float(rng.uniform(1, 5))
+                    builder = builder.link(
+                        src=node_name(i),
+                        dest=node_name(j),
+                        cost=cost,
+                        quantity=quantity,
+                    )
+                    builder = builder.link(
+                        src=node_name(j),
+                        dest=node_name(i),
+                        cost=cost,
+                        quantity=quantity,
+                    )
+
+    for conv, network, node in dests:
+        builder = builder.converter(
+            name=conv, to_network=network, to_node=node, max=100, cost=1
+        )
+    return builder.build()
@@ -0,0 +1,164 @@
+#  Copyright (c) 2019-2020, RTE (https://www.rte-france.com)
+#  See AUTHORS.txt
+#  This Source Code Form is subject to the terms of the Apache License, version 2.0.
+#  If a copy of the Apache License, version 2.0 was not distributed with this file, you can obtain one at http://www.apache.org/licenses/LICENSE-2.0.
+#  SPDX-License-Identifier: Apache-2.0
+#  This file is part of hadar-simulator, a python adequacy library for everyone.
+import itertools
+import logging
+import os
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from hadar.analyzer.result import ResultAnalyzer
+from hadar.benchmark.generator import generate_study
+from hadar.optimizer.domain.input import Study
+from hadar.optimizer.optimizer import LPOptimizer
+from hadar.workflow.shuffler import Shuffler
+
+__all__ = ["measure", "run_case", "run_scaling", "write_tables", "DEFAULT_GRID"]
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GRID = {"nb_scn": [10, 100, 1000], "nodes": [2, 8, 32]}
+
+
+def measure(func: Callable, repeat: int = 1, memory: bool = True) -> Tuple:
+    """
+    Measure a function. Time is measured without memory tracing, which slows allocations down,
+    then peak memory is measured by one more traced run.
+
+    :param func: function without parameter to measure
+    :param repeat: number of timed runs, best time is kept. default 1
+    :param memory: measure peak memory allocated by python and numpy in current process. default True
+    :return: (result of last run, best time in seconds, peak memory in bytes or None)
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        res = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return res, best, peak
+
+
+def _shuffler(study: Study, sources: int = 10) -> Shuffler:
+    """
+    Create shuffler with one timeline by consumption, sampled from first study scenarios.
+
+    :param study: study to read consumptions from
+    :param sources: number of rows by timeline
+    :return: shuffler
+    """
+    shuffler = Shuffler()
+    for name_network, network in study.networks.items():
+        for name_node, node in network.nodes.items():
+            for cons in node.consumptions:
+                data = np.atleast_2d(cons.quantity.value)[:sources]
+                shuffler.add_data(
+                    name="%s_%s_%s" % (name_network, name_node, cons.name), data=data
+                )
+    return shuffler
+
+
+def run_case(
+    params: Dict, processes: int = None, repeat: int = 1, memory: bool = True
+) -> Dict:
+    """
+    Generate a study and measure optimizer, analyzer and shuffler on it.
+
+    :param params: generate_study parameters
+    :param processes: number of optimizer workers. default None to use number of cpu
+    :param repeat: number of timed runs of each step, best time is kept. default 1
+    :param memory: measure peak memory of each step. default True
+    :return: table row with params, times (s), memory peaks (bytes) and model size
+    """
+    study, t_gen, _ = measure(lambda: generate_study(**params), memory=False)
+    row = dict(params, generate=t_gen)
+
+    with LPOptimizer(processes=processes) as optimizer:
+        optimizer.solve(study)  # Start workers outside of measure
+        result, row["optimizer"], row["optimizer_memory"] = measure(
+            lambda: optimizer.solve(study), repeat, memory
+        )
+
+    bench = result.benchmark
+    row["solver"] = sum(bench.solver)
+    row["mapper"] = bench.mapper
+    row["worker_rss"] = max([rss for rss in bench.rss if rss is not None], default=None)
+    row["variables"] = bench.variables[0] if bench.variables else None
+    row["constraints"] = bench.constraints[0] if bench.constraints else None
+
+    _, row["analyzer"], row["analyzer_memory"] = measure(
+        lambda: ResultAnalyzer(study, result), repeat, memory
+    )
+
+    shuffler = _shuffler(study)
+    _, row["shuffler"], row["shuffler_memory"] = measure(
+        lambda: shuffler.shuffle(study.nb_scn), repeat, memory
+    )
+    return row
+
+
+def run_scaling(
+    grid: Dict[str, List] = None,
+    base: Dict = None,
+    processes: int = None,
+    repeat: int = 1,
+    memory: bool = True,
+) -> pd.DataFrame:
+    """
+    Run a case for each combination of grid values.
+
+    :param grid: values to combine by generate_study parameter. default DEFAULT_GRID
+    :param base: generate_study parameters shared by every case. default None to use generate_study defaults
+    :param processes: number of optimizer workers. default None to use number of cpu
+    :param repeat: number of timed runs of each step, best time is kept. default 1
+    :param memory: measure peak memory of each step. default True
+    :return: dataframe with a row by case
+    """
+    grid = grid or DEFAULT_GRID
+    names = list(grid)
+    rows = []
+    for values in itertools.product(*(grid[name] for name in names)):
+        params = dict(base or {}, **dict(zip(names, values)))
+        logger.info("Benchmark case %s", params)
+        rows.append(run_case(params, processes, repeat, memory))
+    return pd.DataFrame(rows)
+
+
+def write_tables(df: pd.DataFrame, directory: str) -> Dict[str, str]:
+    """
+    Write benchmark tables as csv: one with times, one with memory peaks.
+
+    :param df: dataframe given by run_scaling
+    :param directory: directory where tables are written, created if needed
+    :return: {table name: file path}
+    """
+    os.makedirs(directory, exist_ok=True)
+    memory = [c for c in df.columns if c.endswith("_memory") or c.endswith("_rss")]
+    timing = [
+        c
+        for c in df.columns
+        if c in ["generate", "optimizer", "solver", "mapper", "analyzer", "shuffler"]
+    ]
+    params = [c for c in df.columns if c not in memory + timing]
+
+    paths = dict()
+    for name, columns in [("timing", timing), ("memory", memory)]:
+        paths[name] = os.path.join(directory, "%s.csv" % name)
+        df[params + columns].to_csv(paths[name], index=False)
+    return paths
@@ -0,0 +1,165 @@
+#  Copyright (c) 2019-2020, RTE (https://www.rte-france.com)
+#  See AUTHORS.txt
+#  This Source Code Form is subject to the terms of the Apache License, version 2.0.
+#  If a copy of the Apache License, version 2.0 was not distributed with this file, you can obtain one at http://www.apache.org/licenses/LICENSE-2.0.
+#  SPDX-License-Identifier: Apache-2.0
+#  This file is part of hadar-simulator, a python adequacy library for everyone.
+import io
+import json
+import struct
+import zipfile
+
+import numpy as np
+
+from hadar.optimizer.domain.input import Study
+from hadar.optimizer.utils import keep_arrays
+
+__all__ = ["save_study", "load_study"]
+
+FORMAT = 1
+STRUCTURE = "study.json"  # Study to_json tree, arrays replaced by {ARRAY: index}
+ARRAY = "__array__"
+ALIGN = 64  # Array data is aligned inside file, npy header keeps this alignment
+PADDING = 0xD935  # Zip extra field id used to pad local headers
+
+
+def _extract(node, arrays: list):
+    """
+    Replace numerical arrays of a to_json tree by their index inside arrays.
+    """
+    if isinstance(node, np.ndarray) and not node.dtype.hasobject:
+        arrays.append(node)
+        return {ARRAY: len(arrays) - 1}
+    if isinstance(node, np.ndarray):
+        return node.tolist()
+    if isinstance(node, dict):
+        return {k: _extract(v, arrays) for k, v in node.items()}
+    if isinstance(node, list):
+        return [_extract(v, arrays) for v in node]
+    return node
+
+
+def _insert(node, read):
+    """
+    Put back arrays inside a tree given by _extract.
+    """
+    if isinstance(node, dict):
+        if ARRAY in node:
+            return read(node[ARRAY])
+        return {k: _insert(v, read) for k, v in node.items()}
+    if isinstance(node, list):
+        return [_insert(v, read) for v in node]
+    return node
+
+
+def _name(i: int) -> str:
+    return "arrays/%d.npy" % i
+
+
+def _write_array(zf: zipfile.ZipFile, name: str, array: np.ndarray):
+    """
+    Write array as a stored npy member, its data aligned inside file.
+
+    :param zf: zip file opened in write mode
+    :param name: member name
+    :param array: array to write
+    :return:
+    """
+    array = np.ascontiguousarray(array)
+    header = io.BytesIO()
+    np.lib.format.write_array_header_1_0(
+        header, np.lib.format.header_data_from_array_1_0(array)
+    )
+    header = header.getvalue()  # Size is a multiple of ALIGN
+
+    info = zipfile.ZipInfo(name)
+    info.compress_type = zipfile.ZIP_STORED
+    info.file_size = len(header) + array.nbytes
+    # Same rule as zipfile, zip64 adds its own extra field of 20 bytes
+    zip64 = info.file_size * 1.05 > zipfile.ZIP64_LIMIT
+    local = zipfile.sizeFileHeader + len(name.encode()) + (20 if zip64 else 0)
+    pad = -(zf.start_dir + local + 4) % ALIGN
+    info.extra = struct.pack("<HH", PADDING, pad) + b"\0" * pad
+
+    with zf.open(info, "w", force_zip64=zip64) as f:
+        f.write(header)
+        f.write(memoryview(array.reshape(-1).view(np.uint8)))
+
+
+def _map_array(path: str, info: zipfile.ZipInfo) -> np.ndarray:
+    """
+    Map a stored npy member on file without reading its data.
+
+    :param path: file path
+    :param info: member
+    :return: read-only array mapped on file
+    """
+    with open(path, "rb") as f:
+        f.seek(info.header_offset)
+        fields = struct.unpack(zipfile.structFileHeader, f.read(zipfile.sizeFileHeader))
+        name_size, extra_size = fields[10], fields[11]
+        f.seek(name_size + extra_size, 1)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+
+    if dtype.hasobject or int(np.prod(shape)) == 0:
+        return None
+    return np.memmap(
+        path,
+        dtype=dtype,
+        mode="r",
+        offset=offset,
+        shape=shape,
+        order="F" if fortran else "C",
+    )
+
+
+def save_study(study: Study, path: str):
+    """
+    Write study into one uncompressed zip file: structure as json metadata and each numerical array
+    as an npy member, therefore also readable by np.load.
+
+    :param study: study to write
+    :param path: file path
+    :return:
+    """
+    arrays = []
+    with keep_arrays():
+        tree = _extract(study.to_json(), arrays)
+
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as zf:
+        zf.writestr(STRUCTURE, json.dumps({"format": FORMAT, "study": tree}))
+        for i, array in enumerate(arrays):
+            _write_array(zf, _name(i), array)
+
+
+def load_study(path: str, mmap: bool = True) -> Study:
+    """
+    Read study written by save_study. Structure is parsed, arrays are mapped without copy or read.
+
+    :param path: file path
+    :param mmap: map arrays on file, they are then read-only. default True
+    :return: study
+    """
+    with zipfile.ZipFile(path, "r") as zf:
+        meta = json.loads(zf.read(STRUCTURE).decode())
+        if meta.get("format") != FORMAT:
+            raise ValueError("Unknown study file format %s" % meta.get("format"))
+
+        def read(i: int) -> np.ndarray:
+            info = zf.getinfo(_name(i))
+            if mmap and info.compress_type == zipfile.ZIP_STORED:
+                array = _map_array(path, info)
+                if array is not None:
+                    return array
+            with zf.open(info) as f:
+                return np.lib.format.read_array(f)
+
+        tree = _insert(meta["study"], read)
+
+    # Tree is built here, no need to copy it before building study
+    return Study._from_tree(tree)
@@ -271,19 +271,24 @@ class Study(JSON):
     Main object to facilitate to build a study
     """
 
-    def __init__(self, horizon: int, nb_scn: int = 1, version: str = None):
+    def __init__(self, horizon: int, nb_scn: int = 1, version: str = None, dtype=None):
         """
         Instance study.
 
         :param horizon: simulation time horizon (i.e. number of time step in simulation)
         :param nb_scn: number of scenarios in study. Default is 1.
+        :param dtype: type of numerical arrays, like np.float32 to halve study memory. Results are given
+        in the same type, problems are still solved in double. Default is None to keep arrays as given.
         """
         self.version = version or hadar.__version__
         self.networks = dict()
         self.converters = dict()
         self.horizon = horizon
         self.nb_scn = nb_scn
-        self.factory = NumericalValueFactory(horizon=horizon, nb_scn=nb_scn)
+        self.dtype = None if dtype is None else np.dtype(dtype).name
+        self.factory = NumericalValueFactory(
+            horizon=horizon, nb_scn=nb_scn, dtype=dtype
+        )
 
     def to_json(self):
         # remove factory from serialization
@@ -293,9 +298,21 @@ class Study(JSON):
 
     @staticmethod
     def from_json(dict, factory=None):
-        dict = deepcopy(dict)
+        return Study._from_tree(deepcopy(dict))
+
+    @staticmethod
+    def _from_tree(dict) -> "Study":
+        """
+        Build study from to_json tree. Tree is consumed: elements are built in place of its dicts.
+
+        :param dict: tree given by to_json
+        :return: study
+        """
         study = Study(
-            horizon=dict["horizon"], nb_scn=dict["nb_scn"], version=dict["version"]
+            horizon=dict["horizon"],
+            nb_scn=dict["nb_scn"],
+            version=dict["version"],
+            dtype=dict.get("dtype"),
         )
         study.networks = {
             k: InputNetwork.from_json(dict=v, factory=study.factory)
@@ -307,6 +324,31 @@ class Study(JSON):
         }
         return study
 
+    def save(self, path: str):
+        """
+        Write study into a file. Numerical arrays are written as raw npy members, ready to be mapped by load.
+
+        :param path: file path, usually with .hdr extension
+        :return:
+        """
+        from hadar.optimizer.domain.archive import save_study
+
+        save_study(self, path)
+
+    @staticmethod
+    def load(path: str, mmap: bool = True) -> "Study":
+        """
+        Read study written by save.
+
+        :param path: file path
+        :param mmap: map numerical arrays on file without reading them, arrays are then read-only.
+        default True
+        :return: study
+        """
+        from hadar.optimizer.domain.archive import load_study
+
+        return load_study(path, mmap)
+
     def network(self, name="default"):
         """
         Entry point to create study with the fluent api.
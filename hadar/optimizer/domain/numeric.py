@@ -51,6 +51,52 @@ class NumericalValue(JSON, ABC, Generic[T]):
         """
         pass
 
+    @abstractmethod
+    def scenario(self, scn: int) -> np.ndarray:
+        """
+        Get whole time series of one scenario at once. Compact values are broadcast, not copied.
+
+        :param scn: scenario index
+        :return: view like (horizon, ), must not be modified
+        """
+        pass
+
+    @abstractmethod
+    def block(self, scns, ts) -> np.ndarray:
+        """
+        Get values of several scenarios and time steps at once. Compact values are broadcast, not copied.
+
+        :param scns: scenario indexes as slice or list
+        :param ts: time step indexes as slice or list
+        :return: view like (scenarios, time steps), must not be modified
+        """
+        pass
+
+    def _check_scn(self, scn: int):
+        if scn >= self.nb_scn:
+            raise IndexError(
+                "There are %d scenario you ask the %dth" % (self.nb_scn, scn)
+            )
+
+    @staticmethod
+    def _size(index, size: int, name: str) -> int:
+        """
+        Count elements selected by index and check they exist.
+
+        :param index: slice or list of indexes
+        :param size: size of indexed axis
+        :param name: axis name used by error message
+        :return: number of elements selected
+        """
+        if isinstance(index, slice):
+            return len(range(*index.indices(size)))
+        index = np.asarray(index, dtype=int)
+        if index.size and index.max() >= size:
+            raise IndexError(
+                "There are %d %s you ask the %dth" % (size, name, index.max())
+            )
+        return index.size
+
 
 class ScalarNumericalValue(NumericalValue[float]):
     """
@@ -78,6 +124,17 @@ class ScalarNumericalValue(NumericalValue[float]):
     def flatten(self) -> np.ndarray:
         return np.ones(self.horizon * self.nb_scn) * self.value
 
+    def scenario(self, scn: int) -> np.ndarray:
+        self._check_scn(scn)
+        return np.broadcast_to(self.value, (self.horizon,))
+
+    def block(self, scns, ts) -> np.ndarray:
+        shape = (
+            self._size(scns, self.nb_scn, "scenario"),
+            self._size(ts, self.horizon, "time step"),
+        )
+        return np.broadcast_to(self.value, shape)
+
     @staticmethod
     def from_json(dict):
         pass  # not used. Deserialization is done by study elements themself
@@ -107,6 +164,12 @@ class MatrixNumericalValue(NumpyNumericalValue):
     def flatten(self) -> np.ndarray:
         return self.value.flatten()
 
+    def scenario(self, scn: int) -> np.ndarray:
+        return self.value[scn]
+
+    def block(self, scns, ts) -> np.ndarray:
+        return self.value[scns][:, ts]
+
     @staticmethod
     def from_json(dict):
         pass  # not used. Deserialization is done by study elements themself
@@ -128,6 +191,16 @@ class RowNumericValue(NumpyNumericalValue):
     def flatten(self) -> np.ndarray:
         return np.tile(self.value, self.nb_scn)
 
+    def scenario(self, scn: int) -> np.ndarray:
+        self._check_scn(scn)
+        return self.value
+
+    def block(self, scns, ts) -> np.ndarray:
+        row = self.value[ts]
+        return np.broadcast_to(
+            row, (self._size(scns, self.nb_scn, "scenario"), row.size)
+        )
+
     @staticmethod
     def from_json(dict):
         pass  # not used. Deserialization is done by study elements themself
@@ -149,20 +222,41 @@ class ColumnNumericValue(NumpyNumericalValue):
     def flatten(self) -> np.ndarray:
         return np.repeat(self.value.flatten(), self.horizon)
 
+    def scenario(self, scn: int) -> np.ndarray:
+        return np.broadcast_to(self.value[scn], (self.horizon,))
+
+    def block(self, scns, ts) -> np.ndarray:
+        column = self.value[scns]
+        return np.broadcast_to(
+            column, (column.shape[0], self._size(ts, self.horizon, "time step"))
+        )
+
     @staticmethod
     def from_json(dict):
         pass  # not used. Deserialization is done by study elements themself
 
 
 class NumericalValueFactory:
-    def __init__(self, horizon: int, nb_scn: int):
+    def __init__(self, horizon: int, nb_scn: int, dtype=None):
+        """
+        Create factory.
+
+        :param horizon: study horizon
+        :param nb_scn: study number of scenarios
+        :param dtype: type of arrays created, like np.float32 to halve memory. default None to keep given type
+        """
         self.horizon = horizon
         self.nb_scn = nb_scn
+        self.dtype = None if dtype is None else np.dtype(dtype)
 
     def __eq__(self, other):
         if not isinstance(other, NumericalValueFactory):
             return False
-        return other.horizon == self.horizon and other.nb_scn == self.nb_scn
+        return (
+            other.horizon == self.horizon
+            and other.nb_scn == self.nb_scn
+            and other.dtype == self.dtype
+        )
 
     def create(
         self, value: Union[float, List[float], str, np.ndarray, NumericalValue]
@@ -185,6 +279,10 @@ class NumericalValueFactory:
             value = np.array(value)
 
         if isinstance(value, np.ndarray):
+            # Without copy if already in right type, mapped arrays stay mapped
+            if self.dtype is not None:
+                value = np.asarray(value, dtype=self.dtype)
+
             # If scenario are not provided copy timeseries for each scenario
             if value.shape == (self.horizon,):
                 return RowNumericValue(
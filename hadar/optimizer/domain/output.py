@@ -8,6 +8,7 @@ from copy import deepcopy
 from typing import Union, List, Dict, Tuple
 
 import numpy as np
+import pandas as pd
 
 from hadar.optimizer.domain.input import InputNode, JSON
 
@@ -35,7 +36,7 @@ class OutputConsumption(JSON):
         :param quantity: quantity matched by node
         :param name: consumption name (unique in a node)
         """
-        self.quantity = np.array(quantity)
+        self.quantity = np.asarray(quantity)
         self.name = name
 
     @staticmethod
@@ -56,7 +57,7 @@ class OutputProduction(JSON):
         :param name: production name (unique in a node)
         """
         self.name = name
-        self.quantity = np.array(quantity)
+        self.quantity = np.asarray(quantity)
 
     @staticmethod
     def from_json(dict, factory=None):
@@ -84,9 +85,9 @@ class OutputStorage(JSON):
         :param flow_out: final output flow
         """
         self.name = name
-        self.capacity = np.array(capacity)
-        self.flow_in = np.array(flow_in)
-        self.flow_out = np.array(flow_out)
+        self.capacity = np.asarray(capacity)
+        self.flow_in = np.asarray(flow_in)
+        self.flow_out = np.asarray(flow_out)
 
     @staticmethod
     def from_json(dict, factory=None):
@@ -106,7 +107,7 @@ class OutputLink(JSON):
         :param quantity: capacity used
         """
         self.dest = dest
-        self.quantity = np.array(quantity)
+        self.quantity = np.asarray(quantity)
 
     @staticmethod
     def from_json(dict, factory=None):
@@ -132,16 +133,18 @@ class OutputConverter(JSON):
         :param flow_dest: flow to destination
         """
         self.name = name
-        self.flow_src = {src: np.array(qt) for src, qt in flow_src.items()}
-        self.flow_dest = np.array(flow_dest)
+        self.flow_src = {src: np.asarray(qt) for src, qt in flow_src.items()}
+        self.flow_dest = np.asarray(flow_dest)
 
     def to_json(self) -> dict:
         dict = deepcopy(self.__dict__)
         # flow_src has a tuple of two string as key. These forbidden by JSON.
         # Therefore when serialized we join these two strings with '::' to create on string as key
         # Ex: ('elec', 'a') --> 'elec::a'
-        dict["flow_src"] = {"::".join(k): v.tolist() for k, v in self.flow_src.items()}
-        dict["flow_dest"] = self.flow_dest.tolist()
+        dict["flow_src"] = {
+            "::".join(k): JSON.convert(v) for k, v in self.flow_src.items()
+        }
+        dict["flow_dest"] = JSON.convert(self.flow_dest)
         return dict
 
     @staticmethod
@@ -191,16 +194,25 @@ class OutputNode(JSON):
         """
         output = OutputNode(consumptions=[], productions=[], storages=[], links=[])
         output.consumptions = [
-            OutputConsumption(name=i.name, quantity=fill) for i in input.consumptions
+            OutputConsumption(name=i.name, quantity=np.array(fill))
+            for i in input.consumptions
         ]
         output.productions = [
-            OutputProduction(name=i.name, quantity=fill) for i in input.productions
+            OutputProduction(name=i.name, quantity=np.array(fill))
+            for i in input.productions
         ]
         output.storages = [
-            OutputStorage(name=i.name, capacity=fill, flow_out=fill, flow_in=fill)
+            OutputStorage(
+                name=i.name,
+                capacity=np.array(fill),
+                flow_out=np.array(fill),
+                flow_in=np.array(fill),
+            )
             for i in input.storages
         ]
-        output.links = [OutputLink(dest=i.dest, quantity=fill) for i in input.links]
+        output.links = [
+            OutputLink(dest=i.dest, quantity=np.array(fill)) for i in input.links
+        ]
         return output
 
     @staticmethod
@@ -235,17 +247,103 @@ class OutputNetwork(JSON):
 
 
 class Benchmark(JSON):
+    """
+    Solve instrumentation. Lists hold one record by solved scenario, in completion order:
+
+    - scenarios: scenario index
+    - modeler: time to build and load model (s)
+    - solver: time from scenario start to end of solve (s)
+    - iterations: solver iterations
+    - status: solve status like optimal or infeasible
+    - variables, constraints: model size, summed over windows
+    - queue: time waited by worker task before it starts (s)
+    - transfer: time from end of worker task to its reception by main process (s)
+    - rss: peak resident memory of worker (bytes)
+    - workers: worker process id
+
+    Scenarios deduplicated or read from cache have no record.
+    """
+
+    RECORDS = [
+        "scenarios",
+        "modeler",
+        "solver",
+        "iterations",
+        "status",
+        "variables",
+        "constraints",
+        "queue",
+        "transfer",
+        "rss",
+        "workers",
+    ]
+
     def __init__(
         self,
-        modeler: List[int] = None,
-        solver: List[int] = None,
-        mapper: int = 0,
-        total: int = 0,
+        modeler: List[float] = None,
+        solver: List[float] = None,
+        mapper: float = 0,
+        total: float = 0,
+        iterations: List[int] = None,
+        saved: int = 0,
+        cached: int = 0,
+        sharing: float = 0,
+        removed_variables: int = 0,
+        removed_constraints: int = 0,
+        **records: List
     ):
+        """
+        Create benchmark.
+
+        :param modeler: modeler time of each scenario
+        :param solver: solver time of each scenario
+        :param mapper: time to map outputs into result (s)
+        :param total: whole solve time (s)
+        :param iterations: solver iterations of each scenario
+        :param saved: number of scenarios not solved because identical to another one
+        :param cached: number of scenarios read from cache
+        :param sharing: time to copy study into shared memory (s)
+        :param removed_variables: number of variables removed or merged by presolve
+        :param removed_constraints: number of constraints removed by presolve
+        :param records: other lists of records, see class documentation
+        """
         self.modeler = modeler or []
         self.solver = solver or []
+        self.iterations = iterations or []
+        for name in Benchmark.RECORDS:
+            if name not in ["modeler", "solver", "iterations"]:
+                setattr(self, name, records.pop(name, None) or [])
+        if records:
+            raise ValueError("Unknown benchmark records %s" % sorted(records))
         self.mapper = mapper
         self.total = total
+        self.saved = saved
+        self.cached = cached
+        self.sharing = sharing
+        self.removed_variables = removed_variables
+        self.removed_constraints = removed_constraints
+
+    def add(self, **record):
+        """
+        Append record of a scenario.
+
+        :param record: value by record name, missing ones are set to None
+        :return:
+        """
+        unknown = set(record) - set(Benchmark.RECORDS)
+        if unknown:
+            raise ValueError("Unknown benchmark records %s" % sorted(unknown))
+        for name in Benchmark.RECORDS:
+            getattr(self, name).append(record.get(name))
+
+    def to_df(self) -> pd.DataFrame:
+        """
+        Export records.
+
+        :return: dataframe with a row by solved scenario, indexed by scenario
+        """
+        df = pd.DataFrame({name: getattr(self, name) for name in Benchmark.RECORDS})
+        return df.set_index("scenarios").rename_axis("scenario")
 
     @staticmethod
     def from_json(dict, factory=None):
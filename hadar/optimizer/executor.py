@@ -0,0 +1,507 @@
+#  Copyright (c) 2019-2020, RTE (https://www.rte-france.com)
+#  See AUTHORS.txt
+#  This Source Code Form is subject to the terms of the Apache License, version 2.0.
+#  If a copy of the Apache License, version 2.0 was not distributed with this file, you can obtain one at http://www.apache.org/licenses/LICENSE-2.0.
+#  SPDX-License-Identifier: Apache-2.0
+#  This file is part of hadar-simulator, a python adequacy library for everyone.
+import argparse
+import concurrent.futures
+import logging
+import multiprocessing
+import multiprocessing.connection
+import multiprocessing.pool
+import os
+import pickle
+import threading
+import traceback
+import uuid
+from abc import ABC, abstractmethod
+from typing import Callable, Iterable, Iterator, List, Tuple, Union
+
+from hadar.optimizer.domain.input import Study
+from hadar.optimizer.shared import SharedStudy, register
+
+__all__ = [
+    "Executor",
+    "SerialExecutor",
+    "ThreadExecutor",
+    "ProcessExecutor",
+    "SocketExecutor",
+    "create_executor",
+    "serve",
+    "AUTHKEY_ENV",
+]
+
+logger = logging.getLogger(__name__)
+
+AUTHKEY_ENV = "HADAR_AUTHKEY"  # Environment variable read when no secret key is given to socket workers
+
+
+class Executor(ABC):
+    """
+    Run tasks on workers. Functions given to executor must be defined at module level
+    so they can be sent to workers by reference.
+
+    Study is given to workers by share, tasks carry only the name of shared study, workers get it by
+    hadar.optimizer.shared.attach.
+    """
+
+    # Number of workers, used to size tasks
+    processes = 1
+
+    @abstractmethod
+    def imap_unordered(self, func: Callable, iterable: Iterable) -> Iterator:
+        """
+        Apply function to each item on workers. Closing iterator before its end, like when an error comes,
+        stops tasks not started and waits running ones.
+
+        :param func: function to apply
+        :param iterable: function parameters
+        :return: iterator of results in completion order
+        """
+        pass
+
+    def map(self, func: Callable, iterable: Iterable) -> List:
+        """
+        Apply function to each item on workers.
+
+        :param func: function to apply
+        :param iterable: function parameters
+        :return: results in parameters order
+        """
+        indexed = ((func, i, params) for i, params in enumerate(iterable))
+        results = dict(self.imap_unordered(_indexed, indexed))
+        return [results[i] for i in range(len(results))]
+
+    def broadcast(self, func: Callable, params):
+        """
+        Apply function once in each worker process, like to release worker caches.
+        By default function is applied in current process, where serial and thread workers run.
+
+        :param func: function to apply
+        :param params: function parameters
+        :return:
+        """
+        func(params)
+
+    def share(self, study: Study):
+        """
+        Give study to workers.
+
+        :param study: study to share
+        :return: context manager with a name attribute, study is released at exit
+        """
+        return SharedStudy(study)
+
+    def close(self):
+        """
+        Stop workers.
+
+        :return:
+        """
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def _indexed(params) -> Tuple[int, object]:
+    """
+    Apply function and keep parameters position. Called by Executor.map.
+
+    :param params: (function, position, function parameters)
+    :return: (position, result)
+    """
+    func, i, params = params
+    return i, func(params)
+
+
+class SerialExecutor(Executor):
+    """
+    Run tasks one after the other inside current process. Useful to debug or profile workers.
+    """
+
+    def imap_unordered(self, func: Callable, iterable: Iterable) -> Iterator:
+        for params in iterable:
+            yield func(params)
+
+
+class ThreadExecutor(Executor):
+    """
+    Run tasks on a pool of threads inside current process. Solvers release the GIL while solving.
+    """
+
+    def __init__(self, processes: int = None):
+        """
+        Start threads.
+
+        :param processes: number of threads. default None to use number of cpu
+        """
+        self.processes = processes or os.cpu_count() or 1
+        self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=self.processes)
+
+    def imap_unordered(self, func: Callable, iterable: Iterable) -> Iterator:
+        futures = [self.pool.submit(func, params) for params in iterable]
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+            concurrent.futures.wait(futures)
+
+    def close(self):
+        self.pool.shutdown()
+
+
+class ProcessExecutor(Executor):
+    """
+    Run tasks on a pool of local worker processes, study is shared by shared memory.
+    """
+
+    def __init__(self, processes: int = None, pool: multiprocessing.pool.Pool = None):
+        """
+        Start worker processes.
+
+        :param processes: number of processes. default None to use number of cpu
+        :param pool: existing pool to use instead of starting one. It's not closed by executor.
+        """
+        self.owner = pool is None
+        self.barrier = None
+        self._pool = pool
+        if pool is None:
+            self.processes = processes or os.cpu_count() or 1
+            self._start()
+        else:
+            self.processes = pool._processes
+
+    def _start(self):
+        # Each worker waits others on barrier, so a broadcast task is taken once by each worker
+        self.barrier = multiprocessing.Barrier(self.processes)
+        self._pool = multiprocessing.Pool(
+            self.processes, initializer=_set_barrier, initargs=(self.barrier,)
+        )
+
+    @property
+    def pool(self) -> multiprocessing.pool.Pool:
+        """
+        Get pool, started again if its workers were stopped by a cancel.
+
+        :return: pool
+        """
+        if self._pool is None:
+            self._start()
+        return self._pool
+
+    def imap_unordered(self, func: Callable, iterable: Iterable) -> Iterator:
+        results = self.pool.imap_unordered(func, iterable)
+        try:
+            yield from results
+        except BaseException:
+            self._cancel(results)
+            raise
+
+    def _cancel(self, results: Iterator):
+        """
+        Stop tasks left by an iteration not ended.
+
+        :param results: iterator given by pool
+        :return:
+        """
+        if self.owner:
+            # Tasks already queued can't be removed, workers are stopped and pool started again when needed
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+            return
+        # Pool given by user can't be stopped, its remaining tasks are waited
+        while True:
+            try:
+                next(results)
+            except StopIteration:
+                return
+            except Exception:
+                pass
+
+    def broadcast(self, func: Callable, params):
+        """
+        Apply function once in each worker process. Workers of a pool given by user can't be reached
+        one by one, function is then applied processes times on any of them.
+        """
+        if self._pool is None:
+            return  # Workers stopped, nothing left inside them
+        tasks = [(func, params)] * self.processes
+        self.pool.map(_on_barrier, tasks, chunksize=1)
+        if self.barrier is not None and self.barrier.broken:
+            self.barrier.reset()
+
+    def close(self):
+        if self.owner and self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+
+
+_barrier = None  # Barrier of ProcessExecutor pool, set in each worker
+BARRIER_TIMEOUT = 60
+
+
+def _set_barrier(barrier: threading.Barrier):
+    global _barrier
+    _barrier = barrier
+
+
+def _on_barrier(params):
+    """
+    Apply function then wait other workers of pool. Called by ProcessExecutor.broadcast.
+
+    :param params: (function, function parameters)
+    :return:
+    """
+    func, params = params
+    func(params)
+    if _barrier is not None:
+        try:
+            _barrier.wait(BARRIER_TIMEOUT)
+        except threading.BrokenBarrierError:
+            pass  # A worker is missing, like a busy one. Broadcast is done as best as possible
+
+
+class _SentStudy:
+    """
+    Study sent once to each socket worker, which keeps it under its name until another one comes.
+    """
+
+    def __init__(self, executor: "SocketExecutor", study: Study):
+        self.name = "study-%s" % uuid.uuid4().hex
+        payload = pickle.dumps(study, protocol=pickle.HIGHEST_PROTOCOL)
+        for conn in executor.connections:
+            conn.send(("study", self.name, payload))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+def _authkey(authkey: Union[str, bytes, None]) -> bytes:
+    """
+    Get secret key of socket workers, from argument or else from environment variable AUTHKEY_ENV.
+
+    :param authkey: key given or None
+    :return: key
+    """
+    if authkey is None:
+        authkey = os.environ.get(AUTHKEY_ENV)
+    if not authkey:
+        raise ValueError(
+            "Socket workers need a secret key: give authkey or set %s" % AUTHKEY_ENV
+        )
+    return authkey.encode() if isinstance(authkey, str) else authkey
+
+
+class SocketExecutor(Executor):
+    """
+    Run tasks on workers reached by sockets, each one started by serve on a host of a trusted network:
+
+        HADAR_AUTHKEY=<secret> python -m hadar.optimizer.executor --host <private address> --port 7000
+
+    Workers run any function sent by a client knowing the secret key, connections are authenticated
+    but not encrypted. Only run workers on trusted private networks, never reachable from outside,
+    and keep the secret key as private as an ssh key.
+
+    A worker solves one task at a time, start several workers by host to use its cpu.
+    Workers can also be started as local processes, useful to test multi host setup on one computer.
+    """
+
+    def __init__(
+        self,
+        addresses: List[Tuple[str, int]] = None,
+        local: int = 0,
+        authkey: Union[str, bytes] = None,
+    ):
+        """
+        Connect to workers.
+
+        :param addresses: (host, port) of workers started by serve. default None
+        :param local: number of worker processes to start on this computer. default 0
+        :param authkey: secret key shared with workers to authenticate connections.
+        default None to read HADAR_AUTHKEY environment variable, executor refuses to start without key.
+        """
+        authkey = _authkey(authkey)
+        self.authkey = authkey
+        self.processes_started = []
+        addresses = list(addresses or [])
+        for _ in range(local):
+            reader, writer = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(
+                target=serve, args=(("localhost", 0), authkey, writer), daemon=True
+            )
+            process.start()
+            addresses.append(reader.recv())
+            self.processes_started.append(process)
+        if not addresses:
+            raise ValueError("SocketExecutor needs at least one worker")
+
+        self.connections = [
+            multiprocessing.connection.Client(tuple(address), authkey=authkey)
+            for address in addresses
+        ]
+        self.processes = len(self.connections)
+
+    def share(self, study: Study):
+        return _SentStudy(self, study)
+
+    def broadcast(self, func: Callable, params):
+        for conn in self.connections:
+            conn.send(("task", func, params))
+        # Every answer is read so connections stay usable
+        answers = [conn.recv() for conn in self.connections]
+        for status, value in answers:
+            if status == "error":
+                raise RuntimeError("Worker task failed:\n%s" % value)
+
+    def imap_unordered(self, func: Callable, iterable: Iterable) -> Iterator:
+        tasks = iter(iterable)
+        idle = list(self.connections)
+        busy = []
+
+        def send(conn) -> bool:
+            params = next(tasks, _END)
+            if params is _END:
+                return False
+            conn.send(("task", func, params))
+            busy.append(conn)
+            return True
+
+        while idle and send(idle.pop()):
+            pass
+        try:
+            while busy:
+                for conn in multiprocessing.connection.wait(busy):
+                    busy.remove(conn)
+                    status, value = conn.recv()
+                    if status == "error":
+                        raise RuntimeError("Worker task failed:\n%s" % value)
+                    send(conn)
+                    yield value
+        finally:
+            # Iteration stopped before end: no more task is sent, running ones are waited
+            # so connections stay usable
+            for conn in busy:
+                conn.recv()
+
+    def close(self):
+        for conn in self.connections:
+            try:
+                conn.send(("close",))
+                conn.close()
+            except OSError:
+                pass  # Worker already gone
+        self.connections = []
+        for process in self.processes_started:
+            process.join()
+        self.processes_started = []
+
+
+_END = object()
+
+
+def serve(
+    address: Tuple[str, int],
+    authkey: Union[str, bytes] = None,
+    ready: multiprocessing.connection.Connection = None,
+):
+    """
+    Run a socket worker. Worker serves one executor at a time, until executor closes.
+    Worker started as local process stops with its executor.
+
+    Worker runs any function sent by an executor knowing the secret key: listen only on a trusted
+    private network, see SocketExecutor.
+
+    :param address: (host, port) to listen on, port 0 to choose a free one
+    :param authkey: secret key shared with executor to authenticate connections.
+    default None to read HADAR_AUTHKEY environment variable, worker refuses to start without key.
+    :param ready: connection where listening address is sent, used by local workers. default None
+    :return:
+    """
+    authkey = _authkey(authkey)
+    with multiprocessing.connection.Listener(address, authkey=authkey) as listener:
+        logger.info("Worker listening on %s", listener.address)
+        if ready is not None:
+            ready.send(listener.address)
+            ready.close()
+        while True:
+            with listener.accept() as conn:
+                _serve_connection(conn)
+            if ready is not None:
+                return
+
+
+def _serve_connection(conn: multiprocessing.connection.Connection):
+    """
+    Answer executor messages until it closes connection.
+
+    :param conn: executor connection
+    :return:
+    """
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+        if message[0] == "close":
+            return
+        if message[0] == "study":
+            _, name, payload = message
+            register(name, pickle.loads(payload))
+        elif message[0] == "task":
+            _, func, params = message
+            try:
+                conn.send(("ok", func(params)))
+            except Exception:
+                conn.send(("error", traceback.format_exc()))
+
+
+EXECUTORS = ["serial", "thread", "process"]
+
+
+def create_executor(
+    name: Union[str, Executor, multiprocessing.pool.Pool] = "process",
+    processes: int = None,
+) -> Executor:
+    """
+    Create executor by its name.
+
+    :param name: 'serial', 'thread' or 'process'. An executor or a multiprocessing pool is also accepted and
+    used as it is. default 'process'
+    :param processes: number of workers. default None to use number of cpu
+    :return: executor
+    """
+    if isinstance(name, Executor):
+        return name
+    if isinstance(name, multiprocessing.pool.Pool):
+        return ProcessExecutor(pool=name)
+    if name == "serial":
+        return SerialExecutor()
+    if name == "thread":
+        return ThreadExecutor(processes)
+    if name == "process":
+        return ProcessExecutor(processes)
+    raise ValueError("Unknown executor %s, use one of %s" % (name, EXECUTORS))
+
+
+if __name__ == "__main__":
+    # Secret key is only read from environment, a command line argument is visible by other users
+    parser = argparse.ArgumentParser(
+        description="Hadar socket worker, secret key is read from %s. "
+        "Worker runs code sent by clients: only listen on a trusted private network."
+        % AUTHKEY_ENV
+    )
+    parser.add_argument("--host", default="localhost", help="host to listen on")
+    parser.add_argument("--port", type=int, default=7000, help="port to listen on")
+    args = parser.parse_args()
+    serve((args.host, args.port))
@@ -0,0 +1,118 @@
+#  Copyright (c) 2019-2020, RTE (https://www.rte-france.com)
+#  See AUTHORS.txt
+#  This Source Code Form is subject to the terms of the Apache License, version 2.0.
+#  If a copy of the Apache License, version 2.0 was not distributed with this file, you can obtain one at http://www.apache.org/licenses/LICENSE-2.0.
+#  SPDX-License-Identifier: Apache-2.0
+#  This file is part of hadar-simulator, a python adequacy library for everyone.
+import hashlib
+from typing import Dict, Iterator, List
+
+import numpy as np
+
+from hadar.optimizer.domain.input import Study
+from hadar.optimizer.domain.numeric import (
+    NumericalValue,
+    MatrixNumericalValue,
+    ColumnNumericValue,
+)
+
+__all__ = [
+    "numerical_values",
+    "structure_fingerprint",
+    "scenario_fingerprints",
+    "group_scenarios",
+]
+
+
+def numerical_values(study: Study) -> Iterator[NumericalValue]:
+    """
+    Iterate over every numerical value of study, always in the same order for the same structure.
+
+    :param study: study to read
+    :return: numerical values
+    """
+    for network in study.networks.values():
+        for node in network.nodes.values():
+            for cons in node.consumptions:
+                yield from (cons.cost, cons.quantity)
+            for prod in node.productions:
+                yield from (prod.cost, prod.quantity)
+            for stor in node.storages:
+                yield from (stor.capacity, stor.flow_in, stor.flow_out)
+                yield from (stor.cost, stor.eff)
+            for link in node.links:
+                yield from (link.cost, link.quantity)
+
+    for conv in study.converters.values():
+        yield from (conv.cost, conv.max)
+        yield from conv.src_ratios.values()
+
+
+def _varies(value: NumericalValue) -> bool:
+    return isinstance(value, (MatrixNumericalValue, ColumnNumericValue))
+
+
+def structure_fingerprint(study: Study) -> bytes:
+    """
+    Compute a digest of everything shared by all scenarios: horizon, element names and parameters,
+    and values which don't change by scenario. Two studies with the same digest give the same linear problem
+    for scenarios with the same scenario fingerprint.
+
+    :param study: study to read
+    :return: digest
+    """
+    structure = [study.horizon]
+    for name_network, network in study.networks.items():
+        for name_node, node in network.nodes.items():
+            structure.append(
+                (
+                    name_network,
+                    name_node,
+                    [cons.name for cons in node.consumptions],
+                    [prod.name for prod in node.productions],
+                    [(stor.name, stor.init_capacity) for stor in node.storages],
+                    [link.dest for link in node.links],
+                )
+            )
+    for name, conv in study.converters.items():
+        structure.append(
+            (name, conv.dest_network, conv.dest_node, list(conv.src_ratios))
+        )
+
+    h = hashlib.blake2b(repr(structure).encode(), digest_size=16)
+    for value in numerical_values(study):
+        h.update(type(value).__name__.encode())
+        if not _varies(value):
+            h.update(np.ascontiguousarray(value.value, dtype=float).data)
+    return h.digest()
+
+
+def scenario_fingerprints(study: Study) -> List[bytes]:
+    """
+    Compute a digest of each scenario inputs. Only values which change by scenario are read:
+    two scenarios of the same study with the same digest have the same linear problem.
+
+    :param study: study to read
+    :return: digest of each scenario
+    """
+    hashes = [hashlib.blake2b(digest_size=16) for _ in range(study.nb_scn)]
+    for value in numerical_values(study):
+        if not _varies(value):
+            continue
+        array = np.ascontiguousarray(value.value, dtype=float)
+        for scn, h in enumerate(hashes):
+            h.update(array[scn].data)
+    return [h.digest() for h in hashes]
+
+
+def group_scenarios(study: Study) -> Dict[int, List[int]]:
+    """
+    Group scenarios with identical inputs.
+
+    :param study: study to read
+    :return: {first scenario: [every scenario with same inputs, first one included]}
+    """
+    groups = dict()
+    for scn, digest in enumerate(scenario_fingerprints(study)):
+        groups.setdefault(digest, []).append(scn)
+    return {scns[0]: scns for scns in groups.values()}
@@ -0,0 +1,499 @@
+#  Copyright (c) 2019-2020, RTE (https://www.rte-france.com)
+#  See AUTHORS.txt
+#  This Source Code Form is subject to the terms of the Apache License, version 2.0.
+#  If a copy of the Apache License, version 2.0 was not distributed with this file, you can obtain one at http://www.apache.org/licenses/LICENSE-2.0.
+#  SPDX-License-Identifier: Apache-2.0
+#  This file is part of hadar-simulator, a python adequacy library for everyone.
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, Tuple
+
+import numpy as np
+from ortools.linear_solver.linear_solver_pb2 import MPModelProto, MPSolutionResponse
+from ortools.linear_solver.pywraplp import Solver, MPSolverParameters
+
+from hadar.optimizer.lp.modeler import LPModel
+
+__all__ = [
+    "Backend",
+    "OrToolsBackend",
+    "ScipyBackend",
+    "BACKENDS",
+    "create_backend",
+    "ProtoModel",
+]
+
+logger = logging.getLogger(__name__)
+
+
+def _varint(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Encode integers as protobuf varints.
+
+    :param values: positive integers to encode
+    :return: (bytes of all varints concatenated, bytes size of each varint)
+    """
+    values = np.asarray(values, dtype=np.uint64)
+    sizes = np.ones(values.size, dtype=np.int64)
+    for k in range(1, 10):
+        sizes += values >= np.uint64(1 << (7 * k))
+    offsets = np.cumsum(sizes) - sizes
+    out = np.zeros(int(sizes.sum()), dtype=np.uint8)
+    for k in range(int(sizes.max(initial=0))):
+        mask = sizes > k
+        byte = (values[mask] >> np.uint64(7 * k)) & np.uint64(0x7F)
+        byte |= np.where(sizes[mask] > k + 1, np.uint64(0x80), np.uint64(0))
+        out[offsets[mask] + k] = byte
+    return out, sizes
+
+
+def _scatter(out: np.ndarray, starts: np.ndarray, data: np.ndarray, sizes: np.ndarray):
+    """
+    Copy blocks of variable size into buffer.
+
+    :param out: buffer to fill
+    :param starts: position in buffer of each block
+    :param data: all blocks concatenated
+    :param sizes: size of each block
+    :return:
+    """
+    if data.size == 0:
+        return
+    shift = np.repeat(starts - (np.cumsum(sizes) - sizes), sizes)
+    out[np.arange(data.size) + shift] = data
+
+
+class ProtoModel:
+    """
+    Model serialized into ortools MPModelProto wire format. Every message is written by numpy in one pass,
+    therefore model is loaded in bulk by ortools instead of one call by variable and coefficient.
+
+    Values are stored as fixed size doubles, so a model with the same structure can be written in place
+    without encoding the matrix again.
+    """
+
+    def __init__(self, model: LPModel):
+        """
+        Serialize model.
+
+        :param model: model to serialize
+        """
+        # MPModelProto.variable (field 3) := lower_bound (1) upper_bound (2) objective_coefficient (3)
+        self.variables = np.empty(
+            model.nb_vars,
+            dtype=[
+                ("tag", "u1"),
+                ("size", "u1"),
+                ("tag_lb", "u1"),
+                ("lb", "<f8"),
+                ("tag_ub", "u1"),
+                ("ub", "<f8"),
+                ("tag_cost", "u1"),
+                ("cost", "<f8"),
+            ],
+        )
+        self.variables["tag"], self.variables["size"] = 0x1A, 27
+        self.variables["tag_lb"] = 0x09
+        self.variables["tag_ub"] = 0x11
+        self.variables["tag_cost"] = 0x19
+
+        # MPModelProto.constraint (field 4) := lower_bound (2) upper_bound (3)
+        #                                      var_index (6, packed) coefficient (7, packed)
+        m = model.nb_rows
+        nnz = np.bincount(model.rows, minlength=m)
+        has = (nnz > 0).astype(np.int64)
+        index_bytes, index_sizes = _varint(model.cols)
+        index_len = np.bincount(model.rows, weights=index_sizes, minlength=m).astype(
+            np.int64
+        )
+        index_len_bytes, index_len_sizes = _varint(index_len)
+        coeff_len = 8 * nnz
+        coeff_len_bytes, coeff_len_sizes = _varint(coeff_len)
+
+        size = 18 + has * (
+            2 + index_len_sizes + index_len + coeff_len_sizes + coeff_len
+        )
+        size_bytes, size_sizes = _varint(size)
+        total = 1 + size_sizes + size
+        start = np.cumsum(total) - total
+
+        out = np.zeros(int(total.sum()), dtype=np.uint8)
+        out[start] = 0x22
+        _scatter(out, start + 1, size_bytes, size_sizes)
+        p = start + 1 + size_sizes
+        out[p] = 0x11
+        out[p + 9] = 0x19
+        self._row_pos = p + 1
+
+        mask = has.astype(bool)
+        p = p + 18
+        out[p[mask]] = 0x32
+        p = p + has
+        _scatter(
+            out,
+            p[mask],
+            index_len_bytes[np.repeat(mask, index_len_sizes)],
+            index_len_sizes[mask],
+        )
+        p = p + has * index_len_sizes
+        _scatter(out, p, index_bytes, index_len)
+        p = p + index_len
+        out[p[mask]] = 0x3A
+        p = p + has
+        _scatter(
+            out,
+            p[mask],
+            coeff_len_bytes[np.repeat(mask, coeff_len_sizes)],
+            coeff_len_sizes[mask],
+        )
+        p = p + has * coeff_len_sizes
+        # coefficients are sorted by row, k-th coefficient of a row is written at 8 * k after row start
+        row_start = np.cumsum(nnz) - nnz
+        self._coeff_pos = p[model.rows] + 8 * (
+            np.arange(model.rows.size) - row_start[model.rows]
+        )
+        self.constraints = out
+
+        self.update(model)
+
+    def update(self, model: LPModel):
+        """
+        Write values of a model with the same structure.
+
+        :param model: model to write, must have the same rows and cols than the serialized one
+        :return:
+        """
+        self.variables["lb"] = model.lb
+        self.variables["ub"] = model.ub
+        self.variables["cost"] = model.cost
+
+        out, shift = self.constraints, np.arange(8)
+        out[self._row_pos[:, None] + shift] = (
+            model.row_lb.astype("<f8").view(np.uint8).reshape(-1, 8)
+        )
+        out[self._row_pos[:, None] + 9 + shift] = (
+            model.row_ub.astype("<f8").view(np.uint8).reshape(-1, 8)
+        )
+        out[self._coeff_pos[:, None] + shift] = (
+            model.coeffs.astype("<f8").view(np.uint8).reshape(-1, 8)
+        )
+
+    def tobytes(self) -> bytes:
+        return self.variables.tobytes() + self.constraints.tobytes()
+
+
+def _encode_model(model: LPModel) -> bytes:
+    """
+    Serialize model into ortools MPModelProto wire format.
+
+    :param model: model to serialize
+    :return: MPModelProto bytes
+    """
+    return ProtoModel(model).tobytes()
+
+
+def _load_model(solver: Solver, proto: ProtoModel):
+    """
+    Load serialized model into ortools solver in bulk.
+
+    :param solver: ortools solver instance to use
+    :param proto: model to load
+    :return:
+    """
+    error = solver.LoadModelFromProto(MPModelProto.FromString(proto.tobytes()))
+    if error:
+        raise ValueError("Model can't be loaded into solver: %s" % error)
+
+
+def _read_solution(solver: Solver) -> np.ndarray:
+    """
+    Read all variables value in one call.
+
+    :param solver: solver after solve
+    :return: variables value in model order
+    """
+    response = MPSolutionResponse()
+    solver.FillSolutionResponseProto(response)
+    return np.array(response.variable_value)
+
+
+class Backend(ABC):
+    """
+    Linear solver used by workers to solve models built by MatrixModeler.
+
+    Parameters are given by a dict with common keys, a backend raises ValueError for a key it doesn't handle:
+    - time_limit: maximum solve time in seconds
+    - threads: number of threads used by solver
+    - primal_tolerance, dual_tolerance: feasibility tolerances
+    - presolve: True or False to enable or disable presolve
+    """
+
+    # Backend can update a loaded model and start from its previous solution
+    warm_start = False
+
+    def __init__(self, params: Dict = None):
+        """
+        Create backend.
+
+        :param params: solver parameters. default None to keep solver defaults
+        """
+        self.params = params or {}
+        # Status of last solve: optimal, feasible, infeasible, unbounded, abnormal or not_solved
+        self.status = None
+
+    @abstractmethod
+    def load(self, model: LPModel):
+        """
+        Load a new model, solved from scratch.
+
+        :param model: model to load
+        :return:
+        """
+        pass
+
+    def update(self, previous: LPModel, model: LPModel):
+        """
+        Update values of loaded model. Called when backend supports warm start,
+        by default model is loaded again from scratch.
+
+        :param previous: model loaded before
+        :param model: new model with the same structure
+        :return:
+        """
+        self.load(model)
+
+    @abstractmethod
+    def solve(self) -> Tuple[np.ndarray, int]:
+        """
+        Solve loaded model.
+
+        :return: (variables value in model order, number of iterations).
+        Values are zero if solver doesn't find a solution, see status
+        """
+        pass
+
+
+class OrToolsBackend(Backend):
+    """
+    Solver reached through ortools linear solver wrapper: GLOP, PDLP, CLP, HiGHS, ...
+    Models are loaded in bulk by MPModelProto, warm start is supported.
+
+    Besides common parameters, 'lp_algorithm' can be 'primal', 'dual' or 'barrier'
+    and 'specific' gives a string of solver specific parameters.
+    """
+
+    warm_start = True
+
+    _STATUS = {
+        Solver.OPTIMAL: "optimal",
+        Solver.FEASIBLE: "feasible",
+        Solver.INFEASIBLE: "infeasible",
+        Solver.UNBOUNDED: "unbounded",
+        Solver.NOT_SOLVED: "not_solved",
+    }
+
+    _ALGORITHMS = {
+        "primal": MPSolverParameters.PRIMAL,
+        "dual": MPSolverParameters.DUAL,
+        "barrier": MPSolverParameters.BARRIER,
+    }
+
+    def __init__(self, solver: str = "GLOP", params: Dict = None):
+        """
+        Create backend.
+
+        :param solver: ortools solver id like GLOP, PDLP, CLP or HIGHS. default GLOP
+        :param params: solver parameters. default None
+        """
+        Backend.__init__(self, params)
+        unknown = set(self.params) - {
+            "time_limit",
+            "threads",
+            "primal_tolerance",
+            "dual_tolerance",
+            "presolve",
+            "lp_algorithm",
+            "specific",
+        }
+        if unknown:
+            raise ValueError("Unknown ortools parameters %s" % sorted(unknown))
+        if Solver.CreateSolver(solver) is None:
+            raise ValueError("ortools solver %s is not available" % solver)
+
+        self.solver_id = solver
+        self.solver = None
+        self.proto = None
+        self.variables = []
+        self.constraints = []
+
+        self.solver_params = MPSolverParameters()
+        if "primal_tolerance" in self.params:
+            self.solver_params.SetDoubleParam(
+                MPSolverParameters.PRIMAL_TOLERANCE, self.params["primal_tolerance"]
+            )
+        if "dual_tolerance" in self.params:
+            self.solver_params.SetDoubleParam(
+                MPSolverParameters.DUAL_TOLERANCE, self.params["dual_tolerance"]
+            )
+        if "presolve" in self.params:
+            self.solver_params.SetIntegerParam(
+                MPSolverParameters.PRESOLVE,
+                MPSolverParameters.PRESOLVE_ON
+                if self.params["presolve"]
+                else MPSolverParameters.PRESOLVE_OFF,
+            )
+        if "lp_algorithm" in self.params:
+            self.solver_params.SetIntegerParam(
+                MPSolverParameters.LP_ALGORITHM,
+                OrToolsBackend._ALGORITHMS[self.params["lp_algorithm"]],
+            )
+
+    def load(self, model: LPModel):
+        if self.proto is None:
+            self.proto = ProtoModel(model)
+        else:
+            self.proto.update(model)
+
+        self.solver = Solver.CreateSolver(self.solver_id)
+        if "time_limit" in self.params:
+            self.solver.SetTimeLimit(int(self.params["time_limit"] * 1000))
+        if "threads" in self.params:
+            self.solver.SetNumThreads(self.params["threads"])
+        if "specific" in self.params:
+            self.solver.SetSolverSpecificParametersAsString(self.params["specific"])
+        _load_model(self.solver, self.proto)
+        self.variables = self.solver.variables()
+        self.constraints = self.solver.constraints()
+
+    def update(self, previous: LPModel, model: LPModel):
+        variables, constraints = self.variables, self.constraints
+        for i in np.flatnonzero(
+            (model.lb != previous.lb) | (model.ub != previous.ub)
+        ).tolist():
+            variables[i].SetBounds(float(model.lb[i]), float(model.ub[i]))
+
+        objective = self.solver.Objective()
+        for i in np.flatnonzero(model.cost != previous.cost).tolist():
+            objective.SetCoefficient(variables[i], float(model.cost[i]))
+
+        for i in np.flatnonzero(
+            (model.row_lb != previous.row_lb) | (model.row_ub != previous.row_ub)
+        ).tolist():
+            constraints[i].SetBounds(float(model.row_lb[i]), float(model.row_ub[i]))
+
+        for i in np.flatnonzero(model.coeffs != previous.coeffs).tolist():
+            constraints[model.rows[i]].SetCoefficient(
+                variables[model.cols[i]], float(model.coeffs[i])
+            )
+
+    def solve(self) -> Tuple[np.ndarray, int]:
+        if logger.isEnabledFor(logging.DEBUG):
+            self.solver.EnableOutput()
+        status = self.solver.Solve(self.solver_params)
+        self.status = OrToolsBackend._STATUS.get(status, "abnormal")
+        if self.status not in ["optimal", "feasible"]:
+            # No solution to read, status tells caller output is empty
+            logger.info("Solver finish status=%s", self.status)
+            return np.zeros(len(self.variables)), self.solver.iterations()
+
+        logger.info(
+            "Solver finish status=%s cost=%d",
+            self.status,
+            self.solver.Objective().Value(),
+        )
+        return _read_solution(self.solver), self.solver.iterations()
+
+
+class ScipyBackend(Backend):
+    """
+    HiGHS solver reached through scipy.optimize.linprog. Scipy is an optional dependency.
+
+    Besides common parameters, 'method' can be 'highs', 'highs-ds' (dual simplex) or 'highs-ipm' (interior point).
+    """
+
+    # linprog status: 0 optimal, 1 iteration or time limit, 2 infeasible, 3 unbounded, 4 numerical difficulties
+    _STATUS = {0: "optimal", 1: "not_solved", 2: "infeasible", 3: "unbounded"}
+
+    def __init__(self, params: Dict = None):
+        """
+        Create backend.
+
+        :param params: solver parameters. default None
+        """
+        Backend.__init__(self, params)
+        unknown = set(self.params) - {
+            "time_limit",
+            "primal_tolerance",
+            "dual_tolerance",
+            "presolve",
+            "method",
+        }
+        if unknown:
+            raise ValueError("Unknown scipy parameters %s" % sorted(unknown))
+        try:
+            from scipy.optimize import linprog
+            from scipy.sparse import csr_matrix, vstack
+        except ImportError:
+            raise ImportError("scipy backend needs scipy, please install it")
+        self._linprog, self._csr_matrix, self._vstack = linprog, csr_matrix, vstack
+
+        self.options = {}
+        if "time_limit" in self.params:
+            self.options["time_limit"] = self.params["time_limit"]
+        if "primal_tolerance" in self.params:
+            self.options["primal_feasibility_tolerance"] = self.params[
+                "primal_tolerance"
+            ]
+        if "dual_tolerance" in self.params:
+            self.options["dual_feasibility_tolerance"] = self.params["dual_tolerance"]
+        if "presolve" in self.params:
+            self.options["presolve"] = self.params["presolve"]
+        self.model = None
+
+    def load(self, model: LPModel):
+        self.model = model
+
+    def solve(self) -> Tuple[np.ndarray, int]:
+        model = self.model
+        a = self._csr_matrix(
+            (model.coeffs, (model.rows, model.cols)),
+            shape=(model.nb_rows, model.nb_vars),
+        )
+        eq = model.row_lb == model.row_ub
+        upper = ~eq & np.isfinite(model.row_ub)
+        lower = ~eq & np.isfinite(model.row_lb)
+        a_ub = self._vstack([a[upper], -a[lower]])
+        b_ub = np.concatenate([model.row_ub[upper], -model.row_lb[lower]])
+
+        res = self._linprog(
+            c=model.cost,
+            A_ub=a_ub if b_ub.size else None,
+            b_ub=b_ub if b_ub.size else None,
+            A_eq=a[eq],
+            b_eq=model.row_lb[eq],
+            bounds=np.stack([model.lb, model.ub], axis=1),
+            method=self.params.get("method", "highs"),
+            options=self.options,
+        )
+        self.status = ScipyBackend._STATUS.get(res.status, "abnormal")
+        logger.info("Solver finish status=%s cost=%s", self.status, res.fun)
+        if self.status != "optimal" or res.x is None:
+            # No solution to read, status tells caller output is empty
+            return np.zeros(model.nb_vars), res.nit
+        return res.x, res.nit
+
+
+BACKENDS = ["GLOP", "PDLP", "CLP", "HIGHS", "SCIPY"]
+
+
+def create_backend(name: str = "GLOP", params: Dict = None) -> Backend:
+    """
+    Create backend by its name.
+
+    :param name: 'SCIPY' or an ortools solver id like 'GLOP', 'PDLP', 'CLP' or 'HIGHS'. default 'GLOP'
+    :param params: solver parameters. default None
+    :return: backend
+    """
+    if name.upper() == "SCIPY":
+        return ScipyBackend(params)
+    return OrToolsBackend(name.upper(), params)
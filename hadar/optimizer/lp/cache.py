@@ -0,0 +1,127 @@
+#  Copyright (c) 2019-2020, RTE (https://www.rte-france.com)
+#  See AUTHORS.txt
+#  This Source Code Form is subject to the terms of the Apache License, version 2.0.
+#  If a copy of the Apache License, version 2.0 was not distributed with this file, you can obtain one at http://www.apache.org/licenses/LICENSE-2.0.
+#  SPDX-License-Identifier: Apache-2.0
+#  This file is part of hadar-simulator, a python adequacy library for everyone.
+import hashlib
+import logging
+import os
+import tempfile
+from typing import List, Optional
+
+import numpy as np
+
+from hadar.optimizer.domain.input import Study
+from hadar.optimizer.fingerprint import structure_fingerprint, scenario_fingerprints
+
+__all__ = ["ResultCache"]
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    """
+    Content addressed cache of scenario outputs on local disk.
+
+    Each scenario output is stored as a .npy file named by a hash of the study structure, the scenario inputs
+    and the solve configuration. Therefore a study which shares scenarios with a cached one reads them
+    and solves only the new ones. File modification time records last access, least recently used files
+    are removed when cache grows over its maximum size.
+    """
+
+    def __init__(self, directory: str, max_size: int = 2 ** 30):
+        """
+        Open cache, directory is created if needed.
+
+        :param directory: cache directory
+        :param max_size: maximum cache size in bytes. default 1GB
+        """
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(directory, exist_ok=True)
+
+    def keys(self, study: Study, salt: str = "") -> List[str]:
+        """
+        Compute key of each study scenario.
+
+        :param study: study to read
+        :param salt: solve configuration which changes outputs, like backend or window
+        :return: key of each scenario
+        """
+        prefix = structure_fingerprint(study) + salt.encode()
+        return [
+            hashlib.blake2b(prefix + digest, digest_size=20).hexdigest()
+            for digest in scenario_fingerprints(study)
+        ]
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".npy")
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """
+        Read scenario output.
+
+        :param key: scenario key
+        :return: output quantities like (groups, horizon) or None if not cached
+        """
+        path = self._path(key)
+        try:
+            output = np.load(path, allow_pickle=False)
+            os.utime(path)
+            return output
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("Cache entry %s unreadable, removed: %s", key, e)
+            self._remove(path)
+            return None
+
+    def put(self, key: str, output: np.ndarray):
+        """
+        Write scenario output. File is written aside then renamed, a reader never sees a partial file.
+
+        :param key: scenario key
+        :param output: output quantities like (groups, horizon)
+        :return:
+        """
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as file:
+            np.save(file, np.ascontiguousarray(output), allow_pickle=False)
+        os.replace(tmp, self._path(key))
+
+    def evict(self):
+        """
+        Remove least recently used entries until cache size is under its maximum.
+
+        :return:
+        """
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".npy"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        size = sum(s for _, s, _ in entries)
+        for _, s, path in sorted(entries):
+            if size <= self.max_size:
+                break
+            self._remove(path)
+            size -= s
+
+    def clear(self):
+        """
+        Remove every entry.
+
+        :return:
+        """
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".npy"):
+                self._remove(entry.path)
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass  # Already removed by another process
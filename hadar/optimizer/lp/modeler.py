@@ -0,0 +1,594 @@
+#  Copyright (c) 2019-2020, RTE (https://www.rte-france.com)
+#  See AUTHORS.txt
+#  This Source Code Form is subject to the terms of the Apache License, version 2.0.
+#  If a copy of the Apache License, version 2.0 was not distributed with this file, you can obtain one at http://www.apache.org/licenses/LICENSE-2.0.
+#  SPDX-License-Identifier: Apache-2.0
+#  This file is part of hadar-simulator, a python adequacy library for everyone.
+import re
+from typing import Collection, List, Tuple, Union
+
+import numpy as np
+
+from hadar.optimizer.domain.input import Study
+from hadar.optimizer.lp.presolve import Reduction
+from hadar.optimizer.domain.numeric import NumericalValue, ScalarNumericalValue
+
+__all__ = [
+    "LPModel",
+    "MatrixModeler",
+    "build_layout",
+    "connected_components",
+    "component_groups",
+]
+
+
+def build_layout(
+    study: Study, nodes: Collection[Tuple[str, str]] = None
+) -> List[Tuple]:
+    """
+    Compute variable layout of study. Each element attribute optimized by solver is a group of horizon variables.
+    Order is fixed by study structure, therefore modeler and output mapper agree on it without exchanging it.
+
+    :param study: study to layout
+    :param nodes: (network, node) to layout with converters going to them. default None to layout whole study
+    :return: [(kind, network or converter, node or source, index, attribute), ...] one tuple by group
+    """
+    nodes = None if nodes is None else set(nodes)
+    layout = []
+    for name_network, network in study.networks.items():
+        for name_node, node in network.nodes.items():
+            if nodes is not None and (name_network, name_node) not in nodes:
+                continue
+            for i in range(len(node.consumptions)):
+                layout.append(("consumption", name_network, name_node, i, "quantity"))
+            for i in range(len(node.productions)):
+                layout.append(("production", name_network, name_node, i, "quantity"))
+            for i in range(len(node.storages)):
+                layout.append(("storage", name_network, name_node, i, "capacity"))
+                layout.append(("storage", name_network, name_node, i, "flow_in"))
+                layout.append(("storage", name_network, name_node, i, "flow_out"))
+            for i in range(len(node.links)):
+                layout.append(("link", name_network, name_node, i, "quantity"))
+
+    for name, conv in study.converters.items():
+        if nodes is not None and (conv.dest_network, conv.dest_node) not in nodes:
+            continue
+        for src in conv.src_ratios:
+            layout.append(("converter", name, src, 0, "flow_src"))
+        layout.append(("converter", name, None, 0, "flow_dest"))
+    return layout
+
+
+def connected_components(study: Study) -> List[List[Tuple[str, str]]]:
+    """
+    Find groups of nodes which don't share any link or converter. Each group is an independent linear problem.
+
+    :param study: study to split
+    :return: [[(network, node), ...], ...] nodes of each component in study order,
+    components sorted by their first node
+    """
+    nodes = [(n, m) for n, net in study.networks.items() for m in net.nodes]
+    parent = {node: node for node in nodes}
+
+    def find(node):
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    def union(a, b):
+        parent[find(a)] = find(b)
+
+    for name_network, network in study.networks.items():
+        for name_node, node in network.nodes.items():
+            for link in node.links:
+                union((name_network, name_node), (name_network, link.dest))
+    for conv in study.converters.values():
+        for src in conv.src_ratios:
+            union(src, (conv.dest_network, conv.dest_node))
+
+    components = dict()
+    for node in nodes:
+        components.setdefault(find(node), []).append(node)
+    return list(components.values())
+
+
+def component_groups(
+    study: Study, nodes: Collection[Tuple[str, str]] = None
+) -> np.ndarray:
+    """
+    Find where groups of some nodes are inside whole study layout.
+
+    :param study: study
+    :param nodes: (network, node) of component. default None for whole study
+    :return: sorted group indexes inside build_layout(study)
+    """
+    if nodes is None:
+        return np.arange(len(build_layout(study)))
+    selected = set(build_layout(study, nodes))
+    return np.array(
+        [i for i, g in enumerate(build_layout(study)) if g in selected], dtype=int
+    )
+
+
+def _scenario(
+    value: Union[NumericalValue, float], scn: int, horizon: int
+) -> np.ndarray:
+    """
+    Extract time series of one scenario without going through item access for each time step.
+
+    :param value: numerical value to read
+    :param scn: scenario index
+    :param horizon: study horizon
+    :return: array like (horizon, ), read-only
+    """
+    if isinstance(value, NumericalValue):
+        return value.scenario(scn)
+    return np.broadcast_to(float(value), (horizon,))
+
+
+def _name(*parts) -> str:
+    """
+    Join parts into a name usable inside LP and MPS files.
+
+    :param parts: name parts, tuples are flattened and None ignored
+    :return: name with only alphanumeric characters and underscores
+    """
+    flat = []
+    for part in parts:
+        flat += part if isinstance(part, tuple) else [part]
+    name = "_".join(str(p) for p in flat if p is not None)
+    return re.sub(r"[^0-9a-zA-Z]", "_", name)
+
+
+class LPModel:
+    """
+    Linear problem stored as arrays. Minimize cost.x with lb <= x <= ub and row_lb <= A.x <= row_ub.
+    A is a sparse matrix given by its coordinates (rows, cols, coeffs) sorted by row.
+    """
+
+    def __init__(
+        self,
+        lb: np.ndarray,
+        ub: np.ndarray,
+        cost: np.ndarray,
+        rows: np.ndarray,
+        cols: np.ndarray,
+        coeffs: np.ndarray,
+        row_lb: np.ndarray,
+        row_ub: np.ndarray,
+    ):
+        """
+        Create model.
+
+        :param lb: variables lower bound
+        :param ub: variables upper bound
+        :param cost: variables cost inside objective
+        :param rows: row index of each non zero coefficient
+        :param cols: variable index of each non zero coefficient
+        :param coeffs: non zero coefficient values
+        :param row_lb: constraints lower bound
+        :param row_ub: constraints upper bound
+        """
+        self.lb = lb
+        self.ub = ub
+        self.cost = cost
+        self.rows = rows
+        self.cols = cols
+        self.coeffs = coeffs
+        self.row_lb = row_lb
+        self.row_ub = row_ub
+
+    @property
+    def nb_vars(self) -> int:
+        return self.lb.size
+
+    @property
+    def nb_rows(self) -> int:
+        return self.row_lb.size
+
+
+class MatrixModeler:
+    """
+    Build linear problem of a study scenario as arrays.
+
+    Variables are grouped by element attribute (see build_layout), each group takes horizon contiguous columns.
+    Constraints are grouped the same way by horizon contiguous rows:
+    - adequacy constraint for each node
+    - volume constraint for each storage, built for all storages at once
+    - mix constraint for each converter source
+
+    Matrix structure depends only on study structure, so it's computed once. Only values are read by scenario.
+
+    Modeler can cover only a window of study horizon. Window start is given at build,
+    storage initial capacities can be replaced to continue a previous window.
+
+    Modeler can also cover only a connected component of study (see connected_components).
+    Its layout then keeps only component groups, in study layout order.
+
+    A reduction given by presolve leaves groups and row blocks out of model. Model columns are then only
+    kept groups, in layout order, but output is still given for every layout group.
+    """
+
+    def __init__(
+        self,
+        study: Study,
+        horizon: int = None,
+        nodes: Collection[Tuple[str, str]] = None,
+        reduction: Reduction = None,
+    ):
+        """
+        Compute matrix structure.
+
+        :param study: study to model
+        :param horizon: number of time steps modeled, default None to model whole study horizon
+        :param nodes: (network, node) of component to model, must be closed under links and converters.
+        default None to model whole study
+        :param reduction: groups and row blocks to leave out of model, given by presolve. default None to model all
+        """
+        self.study = study
+        self.horizon = horizon or study.horizon
+        self.layout = build_layout(study, nodes)
+        # Layout groups inside whole study layout
+        self.groups = component_groups(study, nodes)
+        self.reduction = reduction or Reduction()
+
+        # Model columns are layout groups neither removed nor merged into another one
+        index = {g: i for i, g in enumerate(self.layout)}
+        tails = {g for merged in self.reduction.merged.values() for g in merged[1:]}
+        self._columns = [
+            i
+            for i, g in enumerate(self.layout)
+            if g not in self.reduction.removed and g not in tails
+        ]  # layout group of each column group
+        columns = {self.layout[i]: c for c, i in enumerate(self._columns)}
+
+        selected = None if nodes is None else set(nodes)
+        nodes = [
+            (n, m)
+            for n, net in study.networks.items()
+            for m in net.nodes
+            if selected is None or (n, m) in selected
+        ]
+        selected = set(nodes)
+
+        self._bounds = []  # (group, NumericalValue)
+        self._costs = []  # (group, NumericalValue)
+        self._loads = []  # (row block, NumericalValue)
+        self._lol = (
+            []
+        )  # (layout group, NumericalValue) consumption asked, used to compute given
+        self._conv_bounds = []  # (group, max NumericalValue, ratio NumericalValue)
+        self._merged = (
+            []
+        )  # (group, [(layout group, quantity NumericalValue), ...]) merged productions
+        self._terms = []  # (row block, group, coeff or (factor, NumericalValue), shift)
+        self._storages = (
+            []
+        )  # (row block, capacity, flow_in, flow_out group or -1 if removed, eff NumericalValue)
+        self._init = []  # (row block, init capacity)
+        self._capacities = []  # storage capacity layout groups
+
+        self._blocks = []  # row block names
+        rows = dict()
+
+        def block(name: Tuple) -> bool:
+            if name in self.reduction.blocks:
+                return False
+            rows[name] = len(self._blocks)
+            self._blocks.append(name)
+            return True
+
+        def term(name: Tuple, key: Tuple, coeff, shift: int = 0):
+            if key in columns:
+                self._terms.append((rows[name], columns[key], coeff, shift))
+
+        def variable(key: Tuple, bound, cost=None):
+            if key in columns:
+                self._bounds.append((columns[key], bound))
+                if cost is not None:
+                    self._costs.append((columns[key], cost))
+
+        for node in nodes:
+            block(("adequacy",) + node)
+
+        for name_network, network in study.networks.items():
+            for name_node, node in network.nodes.items():
+                if (name_network, name_node) not in selected:
+                    continue
+                adequacy = ("adequacy", name_network, name_node)
+                for i, cons in enumerate(node.consumptions):
+                    key = ("consumption", name_network, name_node, i, "quantity")
+                    if key not in columns:
+                        continue  # Removed consumption asks nothing
+                    variable(key, cons.quantity, cons.cost)
+                    self._loads.append((rows[adequacy], cons.quantity))
+                    self._lol.append((index[key], cons.quantity))
+                    term(adequacy, key, 1.0)
+
+                for i, prod in enumerate(node.productions):
+                    key = ("production", name_network, name_node, i, "quantity")
+                    if key in self.reduction.merged:
+                        # Merged productions have the same cost, bound is their quantities sum
+                        merged = [
+                            (index[g], node.productions[g[3]].quantity)
+                            for g in self.reduction.merged[key]
+                        ]
+                        self._merged.append((columns[key], merged))
+                        self._costs.append((columns[key], prod.cost))
+                    else:
+                        variable(key, prod.quantity, prod.cost)
+                    term(adequacy, key, 1.0)
+
+                for i, stor in enumerate(node.storages):
+                    cap = ("storage", name_network, name_node, i, "capacity")
+                    flow_in = ("storage", name_network, name_node, i, "flow_in")
+                    flow_out = ("storage", name_network, name_node, i, "flow_out")
+                    variable(cap, stor.capacity, stor.cost)
+                    variable(flow_in, stor.flow_in)
+                    variable(flow_out, stor.flow_out)
+                    term(adequacy, flow_in, -1.0)
+                    term(adequacy, flow_out, 1.0)
+
+                    # capacity[t] - capacity[t-1] - eff * flow_in[t] + flow_out[t] = 0 (init_capacity at t=0)
+                    volume = ("storage", name_network, name_node, i)
+                    if block(volume):
+                        self._storages.append(
+                            (
+                                rows[volume],
+                                columns.get(cap, -1),
+                                columns.get(flow_in, -1),
+                                columns.get(flow_out, -1),
+                                stor.eff,
+                            )
+                        )
+                        self._init.append((rows[volume], stor.init_capacity))
+                        self._capacities.append(index[cap])
+
+                for i, link in enumerate(node.links):
+                    key = ("link", name_network, name_node, i, "quantity")
+                    variable(key, link.quantity, link.cost)
+                    term(adequacy, key, -1.0)  # Export from src
+                    term(
+                        ("adequacy", name_network, link.dest), key, 1.0
+                    )  # Import to dest
+
+        for name, conv in study.converters.items():
+            if (conv.dest_network, conv.dest_node) not in selected:
+                continue
+            dest = ("converter", name, None, 0, "flow_dest")
+            variable(dest, conv.max, conv.cost)
+            term(("adequacy", conv.dest_network, conv.dest_node), dest, 1.0)
+            for src, ratio in conv.src_ratios.items():
+                key = ("converter", name, src, 0, "flow_src")
+                if key in columns:
+                    self._conv_bounds.append((columns[key], conv.max, ratio))
+                term(("adequacy",) + src, key, -1.0)
+
+                # ratio * flow_src - flow_dest = 0
+                mix = ("converter", name) + src
+                if block(mix):
+                    term(mix, key, (1.0, ratio))
+                    term(mix, dest, -1.0)
+
+        self.nb_vars = len(self._columns) * self.horizon
+        self.nb_rows = len(self._blocks) * self.horizon
+        self._build_structure()
+
+    def _build_structure(self):
+        """
+        Compute sparse coordinates once. Keep position of coefficients which depend on scenario.
+
+        :return:
+        """
+        h = self.horizon
+        rows, cols, coeffs = [], [], []
+        self._dyn_coeffs = []  # (slice, NumericalValue, factor, shift)
+        start = 0
+        for row_block, group, coeff, shift in self._terms:
+            t = np.arange(shift, h)
+            rows.append(row_block * h + t)
+            cols.append(group * h + t - shift)
+            if isinstance(coeff, tuple):
+                factor, value = coeff
+                self._dyn_coeffs.append(
+                    (slice(start, start + t.size), value, factor, shift)
+                )
+                coeffs.append(np.zeros(t.size))
+            else:
+                coeffs.append(np.full(t.size, coeff))
+            start += t.size
+
+        # Volume constraints of every storage are built at once, like (storages, horizon) blocks
+        if self._storages:
+            blocks, caps, ins, outs = (
+                np.array(c, dtype=int) for c in list(zip(*self._storages))[:4]
+            )
+            t = np.arange(h)
+            block_rows = blocks[:, None] * h + t
+            eff_start = start + np.count_nonzero(caps >= 0) * (2 * h - 1)
+            for kept, block_cols, coeff, shift in [
+                (caps >= 0, caps[:, None] * h + t, 1.0, 0),
+                (caps >= 0, caps[:, None] * h + t, -1.0, 1),
+                (ins >= 0, ins[:, None] * h + t, 0.0, 0),  # -eff written by scenario
+                (outs >= 0, outs[:, None] * h + t, 1.0, 0),
+            ]:
+                r = block_rows[kept, shift:].ravel()
+                rows.append(r)
+                cols.append(block_cols[kept, : h - shift].ravel())
+                coeffs.append(np.full(r.size, coeff))
+                start += r.size
+            self._effs = np.flatnonzero(ins >= 0)  # storages with flow_in inside model
+            eff_index = eff_start + np.arange(self._effs.size * h).reshape(-1, h)
+        else:
+            self._effs = np.zeros(0, dtype=int)
+            eff_index = np.zeros((0, h), dtype=int)
+
+        rows = np.concatenate(rows) if rows else np.zeros(0, dtype=int)
+        cols = np.concatenate(cols) if cols else np.zeros(0, dtype=int)
+        coeffs = np.concatenate(coeffs) if coeffs else np.zeros(0)
+
+        # Sort coordinates by row, solvers load matrix row by row
+        order = np.argsort(rows, kind="stable")
+        position = np.empty_like(order)
+        position[order] = np.arange(order.size)
+        self.rows, self.cols, self.coeffs = rows[order], cols[order], coeffs[order]
+        self._dyn_coeffs = [
+            (position[sl], value, factor, shift)
+            for sl, value, factor, shift in self._dyn_coeffs
+        ]
+        self._eff_index = position[eff_index]
+        # Constant efficiencies are read once, others by scenario
+        effs = [self._storages[s][4] for s in self._effs]
+        self._eff_constant = np.array(
+            [isinstance(e, (ScalarNumericalValue, int, float)) for e in effs],
+            dtype=bool,
+        )
+        self._eff_values = np.array(
+            [getattr(e, "value", e) for e, c in zip(effs, self._eff_constant) if c],
+            dtype=float,
+        )
+
+        self.row_init = np.zeros(self.nb_rows)
+        for row_block, init in self._init:
+            self.row_init[row_block * h] = init
+        self._init_rows = np.array(
+            [row_block * h for row_block, _ in self._init], dtype=int
+        )
+
+    def _window(
+        self, value: Union[NumericalValue, float], scn: int, start: int
+    ) -> np.ndarray:
+        # Study may keep compact arrays like float32, model is always built in double
+        window = _scenario(value, scn, self.study.horizon)[start : start + self.horizon]
+        return np.asarray(window, dtype=float)
+
+    def _storage_effs(self, scn: int, start: int) -> np.ndarray:
+        """
+        Read efficiency of storages with flow_in inside model.
+
+        :param scn: scenario index
+        :param start: first time step modeled
+        :return: array like (storages, horizon)
+        """
+        effs = np.empty((self._effs.size, self.horizon))
+        effs[self._eff_constant] = self._eff_values[:, None]
+        for i in np.flatnonzero(~self._eff_constant):
+            effs[i] = self._window(self._storages[self._effs[i]][4], scn, start)
+        return effs
+
+    def build(self, scn: int, start: int = 0, init: np.ndarray = None) -> LPModel:
+        """
+        Build linear problem for one scenario.
+
+        :param scn: scenario index
+        :param start: first time step modeled. default 0
+        :param init: initial capacity of each storage. default None to use study init_capacity
+        :return: model ready to be loaded into a solver
+        """
+        h = self.horizon
+
+        ub = np.zeros(self.nb_vars)
+        for g, value in self._bounds:
+            ub[g * h : (g + 1) * h] = self._window(value, scn, start)
+        for g, merged in self._merged:
+            ub[g * h : (g + 1) * h] = sum(
+                self._window(quantity, scn, start) for _, quantity in merged
+            )
+        for g, conv_max, ratio in self._conv_bounds:
+            ub[g * h : (g + 1) * h] = self._window(conv_max, scn, start) / self._window(
+                ratio, scn, start
+            )
+
+        cost = np.zeros(self.nb_vars)
+        for g, value in self._costs:
+            cost[g * h : (g + 1) * h] = self._window(value, scn, start)
+
+        coeffs = self.coeffs.copy()
+        for index, value, factor, shift in self._dyn_coeffs:
+            coeffs[index] = factor * self._window(value, scn, start)[shift:]
+        coeffs[self._eff_index] = -self._storage_effs(scn, start)
+
+        bounds = self.row_init.copy()
+        if init is not None:
+            bounds[self._init_rows] = init
+        for row_block, value in self._loads:
+            bounds[row_block * h : (row_block + 1) * h] += self._window(
+                value, scn, start
+            )
+
+        return LPModel(
+            lb=np.zeros(self.nb_vars),
+            ub=ub,
+            cost=cost,
+            rows=self.rows,
+            cols=self.cols,
+            coeffs=coeffs,
+            row_lb=bounds,
+            row_ub=bounds,
+        )
+
+    def to_output(self, scn: int, solution: np.ndarray, start: int = 0) -> np.ndarray:
+        """
+        Convert solver solution to output quantities. Consumption variables are loss of load,
+        given consumption is asked quantity minus loss of load. Groups removed by presolve are zero.
+
+        :param scn: scenario index
+        :param solution: variables value found by solver
+        :param start: first time step modeled. default 0
+        :return: array like (groups, horizon) in layout order
+        """
+        h = self.horizon
+        solution = np.array(solution, dtype=float).reshape(len(self._columns), h)
+        if len(self._columns) == len(self.layout):
+            out = solution
+        else:
+            out = np.zeros((len(self.layout), h))
+            out[self._columns] = solution
+
+        # Merged productions share their flow in proportion to their quantities
+        for g, merged in self._merged:
+            total = solution[g]
+            quantities = [self._window(quantity, scn, start) for _, quantity in merged]
+            available = np.sum(quantities, axis=0)
+            for (i, _), quantity in zip(merged, quantities):
+                share = np.divide(
+                    quantity, available, out=np.zeros(h), where=available > 0
+                )
+                out[i] = total * share
+
+        for g, value in self._lol:
+            out[g] = self._window(value, scn, start) - out[g]
+        return out
+
+    def names(self, start: int = 0) -> Tuple[List[str], List[str]]:
+        """
+        Give readable names to variables and constraints. Solver doesn't need them, they're only used to dump model.
+
+        :param start: first time step modeled. default 0
+        :return: (variable names, constraint names) in model order
+        """
+        ts = range(start, start + self.horizon)
+        variables = []
+        for kind, parent, child, i, attribute in (
+            self.layout[g] for g in self._columns
+        ):
+            attribute = "lol" if kind == "consumption" else attribute
+            prefix = _name(kind, attribute, parent, child, i)
+            variables += ["%s_t%d" % (prefix, t) for t in ts]
+
+        constraints = []
+        for block in self._blocks:
+            prefix = _name(*block)
+            constraints += ["%s_t%d" % (prefix, t) for t in ts]
+        return variables, constraints
+
+    def capacities(self, output: np.ndarray, t: int) -> np.ndarray:
+        """
+        Read storage capacities inside output.
+
+        :param output: output given by to_output
+        :param t: time step inside modeled horizon
+        :return: capacity of each storage, in init order used by build
+        """
+        return output[self._capacities, t]
@@ -5,420 +5,415 @@
 #  SPDX-License-Identifier: Apache-2.0
 #  This file is part of hadar-simulator, a python adequacy library for everyone.
 import cProfile
+import contextlib
 import logging
-import multiprocessing
+import multiprocessing.pool
+import os
+import sys
+import threading
 import time
-from typing import List
+from typing import Callable, Dict, Iterator, List, Tuple, Union
 
-import msgpack
-from ortools.linear_solver.pywraplp import Solver, Constraint
+import numpy as np
+from ortools.linear_solver.linear_solver_pb2 import MPModelProto
+from ortools.linear_solver.pywraplp import Solver
 
 from hadar.optimizer.domain.input import Study
-from hadar.optimizer.lp.domain import (
-    LPNode,
-    LPProduction,
-    LPConsumption,
-    LPLink,
-    LPStorage,
-    LPTimeStep,
-    LPConverter,
+from hadar.optimizer.executor import Executor, create_executor
+from hadar.optimizer.lp.backend import Backend, create_backend, _encode_model
+from hadar.optimizer.lp.cache import ResultCache
+from hadar.optimizer.lp.mapper import OutputMapper
+from hadar.optimizer.lp.presolve import Reduction, presolve
+from hadar.optimizer.lp.modeler import (
+    LPModel,
+    MatrixModeler,
+    build_layout,
+    component_groups,
+    connected_components,
 )
-from hadar.optimizer.lp.mapper import InputMapper, OutputMapper
 from hadar.optimizer.domain.output import Result, Benchmark
-from hadar.optimizer.utils import JSON
+from hadar.optimizer.fingerprint import group_scenarios
+from hadar.optimizer.shared import attach, detach
+
+try:
+    import resource
+except ImportError:
+    resource = None  # Not available on Windows
 
 logger = logging.getLogger(__name__)
 
+CHUNK_VARIABLES = 100000  # Scenarios are grouped by task until this number of variables
 
-class ObjectiveBuilder:
-    """
-    Build objective cost function.
-    """
 
-    def __init__(self, solver: Solver):
-        """
-        Initiate new objective to minimize inside ortools solver.
+class ModelTemplate:
+    """
+    Model kept by a worker between scenarios of the same study. Matrix structure is encoded once,
+    then only values are written for each scenario: bounds, right hand sides, objective coefficients
+    and scenario dependent coefficients (storage efficiency, converter ratio).
 
-        :param solver: ortools solver instance to use
-        """
-        self.objective = solver.Objective()
-        self.objective.SetMinimization()
-        self.logger = logging.getLogger(__name__ + "." + self.__class__.__name__)
+    By default each scenario is loaded as a new model, so it's solved from scratch.
+    With warm start, if backend supports it, model is kept and only values which differ from previous scenario
+    are updated, therefore solver starts from the optimal basis of previous scenario.
+    """
 
-    def add_node(self, node: LPNode):
+    def __init__(
+        self, modeler: MatrixModeler, warm_start: bool = False, backend: Backend = None
+    ):
         """
-        Add cost in objective for each node element.
+        Create empty template.
 
-        :param node: node to add
-        :return:
+        :param modeler: modeler of study
+        :param warm_start: keep solver between scenarios. default False
+        :param backend: solver backend. default None to use GLOP
         """
-        self._add_consumption(node.consumptions)
-        self._add_productions(node.productions)
-        self._add_storages(node.storages)
-        self._add_links(node.links)
+        self.modeler = modeler
+        self.backend = backend or create_backend()
+        self.warm_start = warm_start and self.backend.warm_start
+        self.model = None
 
-    def _add_consumption(self, consumptions: List[LPConsumption]):
+    def load(self, model: LPModel):
         """
-        Add consumption cost. That mean we add cost of a loss of consumption.
+        Load model into backend.
 
-        :param consumptions: consumption with loss variable and cost
+        :param model: model to load, must be built by the same modeler
         :return:
         """
-        for cons in consumptions:
-            self.objective.SetCoefficient(cons.variable, cons.cost)
-            self.logger.debug("Add consumption %s into objective", cons.name)
+        if self.warm_start and self.model is not None:
+            self.backend.update(self.model, model)
+        else:
+            self.backend.load(model)
+        self.model = model
 
-    def _add_productions(self, prods: List[LPProduction]):
-        """
-        Add production cost. That mean the cost to use a production.
 
-        :param prods: production with cost to use and used quantity variable
-        :return:
-        """
-        for prod in prods:
-            self.objective.SetCoefficient(prod.variable, prod.cost)
-            self.logger.debug("Add production %s into objective", prod.name)
+# {(shared study name, horizon, component, backend, params, warm start, presolve, thread): ModelTemplate}
+# kept by each worker process. Threads of a thread executor have their own templates.
+_templates = dict()
 
-    def _add_storages(self, stors: List[LPStorage]):
-        """
-        Add storage cost. Cost of store for each time-step
-        :param stors: list of storages
-        :return:
-        """
-        for stor in stors:
-            self.objective.SetCoefficient(stor.var_capacity, stor.cost)
-            self.logger.debug("Add storage %s into objective", stor.name)
-
-    def _add_links(self, links: List[LPLink]):
-        """
-        Add link cost. That mean cost to use a link capacity.
 
-        :param links: links with cost to use and used quantity variable
-        :return:
-        """
-        for link in links:
-            self.objective.SetCoefficient(link.variable, link.cost)
-            self.logger.debug("Add link %s->%s to objective", link.src, link.dest)
-
-    def add_converter(self, conv: LPConverter):
-        """
-        Add converter. Apply cost on output of converter.
+def _release(name: str):
+    """
+    Drop templates and study of a solve ended in current worker. Called once by each worker.
 
-        :param conv: converter to cost
-        :return:
-        """
-        self.objective.SetCoefficient(conv.var_flow_dest, conv.cost)
-        self.logger.debug("Add converter %s to objective" % conv.name)
+    :param name: shared study name
+    :return:
+    """
+    for key in [k for k in list(_templates) if k[0] == name]:
+        _templates.pop(key, None)
+    detach(name)
+
+
+def _get_template(
+    name: str,
+    study: Study,
+    config: Dict,
+    horizon: int = None,
+    component: Tuple[int, List[Tuple[str, str]]] = None,
+) -> ModelTemplate:
+    """
+    Get template of study for this process and thread. Only templates of last study are kept.
+
+    :param name: shared study name
+    :param study: study
+    :param config: solve configuration given to solve_lp
+    :param horizon: number of time steps modeled. default None for whole study horizon
+    :param component: (component index, nodes) to model only a connected component. default None for whole study
+    :return: template
+    """
+    key = (
+        name,
+        horizon or study.horizon,
+        None if component is None else component[0],
+        config["backend"],
+        repr(sorted(config["solver_params"].items())),
+        config["warm_start"],
+        config["presolve"],
+        threading.get_ident(),
+    )
+    template = _templates.get(key)
+    if template is None:
+        if any(k[0] != name for k in list(_templates)):
+            _templates.clear()
+        template = _templates[key] = ModelTemplate(
+            MatrixModeler(
+                study,
+                horizon,
+                None if component is None else component[1],
+                config["reduction"],
+            ),
+            warm_start=config["warm_start"],
+            backend=create_backend(config["backend"], config["solver_params"]),
+        )
+    return template
 
-    def build(self):
-        pass  # Currently nothing are need at the end. But we keep builder pattern syntax
 
+def _dump_model(model: LPModel, modeler: MatrixModeler, start: int, path: str):
+    """
+    Write model with readable names into a file. Format is given by path extension: .lp or .mps
 
-class AdequacyBuilder:
+    :param model: model to write
+    :param modeler: modeler which builds model, used to name variables and constraints
+    :param start: first time step modeled
+    :param path: file path
+    :return:
     """
-    Build adequacy flow constraint.
+    proto = MPModelProto.FromString(_encode_model(model))
+    variables, constraints = modeler.names(start)
+    for var, name in zip(proto.variable, variables):
+        var.name = name
+    for cons, name in zip(proto.constraint, constraints):
+        cons.name = name
+
+    solver = Solver("hadar", Solver.GLOP_LINEAR_PROGRAMMING)
+    solver.LoadModelFromProtoKeepNames(proto)
+    if path.endswith(".mps"):
+        text = solver.ExportModelAsMpsFormat(False, False)
+    else:
+        text = solver.ExportModelAsLpFormat(False)
+    with open(path, "w") as file:
+        file.write(text)
+
+
+def _solve_scenario(
+    template: ModelTemplate,
+    i_scn: int,
+    start: int = 0,
+    init: np.ndarray = None,
+    dump: Tuple[str, str] = None,
+    component: int = None,
+) -> Tuple[np.ndarray, Dict]:
     """
+    Solve one scenario over template horizon.
+
+    :param template: template to load model into
+    :param i_scn: scenario index
+    :param start: first time step modeled. default 0
+    :param init: storage initial capacities. default None to use study values
+    :param dump: (directory, format) to write model before solving it. default None to not write it
+    :param component: index of connected component modeled by template, used to name dump.
+    default None if template models whole study
+    :return: (output quantities in layout order, stats) with stats keys modeler (time), solver (time since begin),
+    iterations, status, variables and constraints
+    """
+    begin = time.time()
+    model = template.modeler.build(i_scn, start=start, init=init)
+    template.load(model)
+    if dump is not None:
+        directory, fmt = dump
+        scn = "scn%d" % i_scn if component is None else "scn%d_c%d" % (i_scn, component)
+        path = os.path.join(directory, "%s_t%d.%s" % (scn, start, fmt))
+        _dump_model(model, template.modeler, start, path)
 
-    def __init__(self, solver: Solver):
-        """
-        Initiate.
-
-        :param solver: ortools solver instance to use
-        :param horizon: study horizon
-        """
-        self.constraints = dict()
-        self.importations = dict()
-        self.solver = solver
-        self.logger = logging.getLogger(__name__ + "." + self.__class__.__name__)
+    problem_build = time.time()
 
-    def add_node(self, name_network: str, name_node: str, node: LPNode, t: int):
-        """
-        Add flow constraint for a specific node.
+    logger.info("Problem build. Start solver")
+    solution, iterations = template.backend.solve()
 
-        :param name_network: network name. Used to differentiate each equation
-        :param name_node: node name. Used to differentiate each equation
-        :param node: node to map constraint
-        :return:
-        """
-        # Set forced consumption
-        load = sum([c.quantity for c in node.consumptions]) * 1.0
-        self.constraints[(t, name_network, name_node)] = self.solver.Constraint(
-            load, load
+    problem_solved = time.time()
+    if template.backend.status != "optimal":
+        logger.warning(
+            "Scenario %d from t=%d solved with status %s",
+            i_scn,
+            start,
+            template.backend.status,
         )
 
-        self._add_consumptions(name_network, name_node, t, node.consumptions)
-        self._add_productions(name_network, name_node, t, node.productions)
-        self._add_storages(name_network, name_node, t, node.storages)
-        self._add_links(name_network, name_node, t, node.links)
-
-    def _add_consumptions(
-        self,
-        name_network: str,
-        name_node: str,
-        t: int,
-        consumptions: List[LPConsumption],
-    ):
-        """
-        Add consumption flow. That mean loss of consumption is set a production to match
-        equation in case there are not enough production.
-
-        :param name_network: network's name
-        :param name_node: node's name
-        :param t: timestamp
-        :param consumptions: consumptions with loss as variable
-        :return:
-        """
-        for cons in consumptions:
-            self.constraints[(t, name_network, name_node)].SetCoefficient(
-                cons.variable, 1
-            )
-            self.logger.debug(
-                "Add lol %s for %s inside %s into adequacy constraint",
-                cons.name,
-                name_node,
-                name_network,
-            )
-
-    def _add_productions(
-        self, name_network: str, name_node: str, t: int, productions: List[LPProduction]
-    ):
-        """
-        Add production flow. That mean production use is like a production.
-
-        :param name_network: network's name
-        :param name_node: node's name
-        :param t: timestamp
-        :param productions: productions with production used as variable
-        :return:
-        """
-        for prod in productions:
-            self.constraints[(t, name_network, name_node)].SetCoefficient(
-                prod.variable, 1
-            )
-            self.logger.debug(
-                "Add prod %s for %s inside %s into adequacy constraint",
-                prod.name,
-                name_node,
-                name_network,
-            )
+    output = template.modeler.to_output(i_scn, solution, start=start)
+    stats = dict(
+        modeler=problem_build - begin,
+        solver=problem_solved - begin,
+        iterations=iterations,
+        status=template.backend.status,
+        variables=model.nb_vars,
+        constraints=model.nb_rows,
+    )
+    return output, stats
 
-    def _add_storages(
-        self, name_network: str, name_node: str, t: int, storages: List[LPStorage]
-    ):
-        """
-        Add storage flow. Flow in is like a consumption. Flow out is like a production.
 
-        :param name_network: network's name
-        :param name_node: node's name
-        :param t: timestamp
-        :param productions: storage with flow used as variable
-        :return:
-        """
-        for stor in storages:
-            self.constraints[(t, name_network, name_node)].SetCoefficient(
-                stor.var_flow_in, -1
-            )
-            self.constraints[(t, name_network, name_node)].SetCoefficient(
-                stor.var_flow_out, 1
-            )
-            self.logger.debug(
-                "Add storage %s for %s inside %s into adequacy constraint",
-                stor.name,
-                name_node,
-                name_network,
-            )
-
-    def _add_links(
-        self, name_network: str, name_node: str, t: int, links: List[LPLink]
-    ):
-        """
-        Add links. That mean the link export is like a consumption.
-        After all node added. The same export, become also an import for destination node.
-        Therefore link has to be set like production for destination node.
-
-        :param name_network: network's name
-        :param name_node: node's name
-        :param t: timestamp
-        :param links: link with export quantity as variable
-        :return:
-        """
-        for link in links:
-            self.constraints[(t, name_network, link.src)].SetCoefficient(
-                link.variable, -1
-            )  # Export from src
-            self.importations[
-                (t, name_network, link.src, link.dest)
-            ] = link.variable  # Import to dest
-            self.logger.debug(
-                "Add link %s for %s inside %s into adequacy constraint",
-                link.dest,
-                name_node,
-                name_network,
-            )
-
-    def add_converter(self, conv: LPConverter, t: int):
-        """
-        Add converter element in equation. Sources are like consumptions, destination like production
+def _merge_stats(total: Dict, stats: Dict) -> Dict:
+    """
+    Merge stats of two models solved for the same scenario, like two windows or two components.
+    Times, iterations and sizes are summed, status is the first one not optimal.
+    Worker stats queue, rss and transfer, if any, keep their maximum.
 
-        :param conv: converter element to add
-        :param t: time index to use
-        :return:
-        """
-        self.constraints[(t, conv.dest_network, conv.dest_node)].SetCoefficient(
-            conv.var_flow_dest, 1
+    :param total: stats to update
+    :param stats: stats to add
+    :return: total updated
+    """
+    for key in ["modeler", "solver", "iterations", "variables", "constraints"]:
+        total[key] += stats[key]
+    if total["status"] == "optimal":
+        total["status"] = stats["status"]
+    for key in ["queue", "rss", "transfer"]:
+        values = [v for v in [total.get(key), stats.get(key)] if v is not None]
+        if values:
+            total[key] = max(values)
+    return total
+
+
+def _solve_rolling(
+    get_template,
+    horizon: int,
+    i_scn: int,
+    window: int = None,
+    overlap: int = 0,
+    dump: Tuple[str, str] = None,
+    component: int = None,
+) -> Tuple[List[Tuple[int, np.ndarray]], Dict]:
+    """
+    Solve one scenario window after window. Each window is modeled with overlap next time steps,
+    only its first window time steps are kept. Next window starts with storage capacities kept.
+
+    :param get_template: function giving template for a number of time steps
+    :param horizon: study horizon
+    :param i_scn: scenario index
+    :param window: number of time steps kept by window. default None to solve whole horizon at once
+    :param overlap: number of time steps modeled after window. default 0
+    :param dump: (directory, format) to write model of each window. default None to not write them
+    :param component: index of connected component modeled, used to name dump. default None for whole study
+    :return: ([(window start, output quantities kept), ...], stats summed over windows).
+    Status is the one of first window not optimal, if any.
+    """
+    window = window or horizon
+    outputs, total = [], None
+    init = None
+    for start in range(0, horizon, window):
+        length = min(window + overlap, horizon - start)
+        kept = min(window, horizon - start)
+        template = get_template(length)
+        output, stats = _solve_scenario(
+            template, i_scn, start=start, init=init, dump=dump, component=component
         )
-        for (network, node), var in conv.var_flow_src.items():
-            self.constraints[(t, network, node)].SetCoefficient(var, -1)
-        self.logger.debug("Add converter %s" % conv.name)
+        init = template.modeler.capacities(output, kept - 1)
+        outputs.append((start, output[:, :kept]))
+        total = stats if total is None else _merge_stats(total, stats)
+    return outputs, total
 
-    def build(self):
-        """
-        Call when all node are added. Apply all import flow for each node.
 
-        :return:
-        """
-        # Apply import link in adequacy
-        for (t, net, src, dest), var in self.importations.items():
-            self.constraints[(t, net, dest)].SetCoefficient(var, 1)
-
-
-class StorageBuilder:
-    """
-    Build storage constraints
-    """
-
-    def __init__(self, solver: Solver):
-        self.capacities = dict()
-        self.solver = solver
-        self.logger = logging.getLogger(__name__ + "." + self.__class__.__name__)
-
-    def add_node(
-        self, name_network: str, name_node: str, node: LPNode, t: int
-    ) -> Constraint:
-        for stor in node.storages:
-            self.capacities[(t, name_network, name_node, stor.name)] = stor.var_capacity
-            if t == 0:
-                const = self.solver.Constraint(stor.init_capacity, stor.init_capacity)
-                const.SetCoefficient(stor.var_flow_in, -stor.eff)
-                const.SetCoefficient(stor.var_flow_out, 1)
-                const.SetCoefficient(stor.var_capacity, 1)
-                return const
-            else:
-                const = self.solver.Constraint(0, 0)
-                const.SetCoefficient(stor.var_flow_in, -stor.eff)
-                const.SetCoefficient(stor.var_flow_out, 1)
-                const.SetCoefficient(
-                    self.capacities[(t - 1, name_network, name_node, stor.name)], -1
-                )
-                const.SetCoefficient(stor.var_capacity, 1)
-                return const
+def _peak_rss() -> int:
+    """
+    Get peak resident memory of current process.
 
-    def build(self):
-        pass  # Currently nothing are need at the end. But we keep builder pattern syntax
+    :return: bytes or None if not available on this platform
+    """
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
 
 
-class ConverterMixBuilder:
+def _solve_batch(
+    params,
+) -> Tuple[List[int], int, List[Tuple[int, np.ndarray]], List[Dict]]:
     """
-    Build equation to determine ratio mix between sources converter.
+    Solve study scenario batch. Called by executor workers.
+    :param params: (shared study name, scenarios, solve configuration,
+    (dump directory, dump format) or None for each scenario, time when task was sent,
+    (part index, [(component index, nodes), ...]) or None to solve whole study as one model)
+    :return: (scenarios, part index or None, [(window start, output quantities), ...], stats of each scenario).
+    Output of a window is one contiguous float array like (scenarios, groups, window) pickled as raw buffer,
+    with only part groups in study layout order when study is split.
+    Besides _solve_scenario keys, stats give workers (pid), queue (time waited by task before starting),
+    rss (worker peak memory) and finished (time when task ended).
     """
-
-    def __init__(self, solver: Solver):
-        self.solver = solver
-        self.logger = logging.getLogger(__name__ + "." + self.__class__.__name__)
-
-    def add_converter(self, conv: LPConverter):
-        return [
-            ConverterMixBuilder._build_constraint(
-                self.solver, r, conv.var_flow_dest, conv.var_flow_src[src]
+    name, scenarios, config, dumps, sent, part = params
+    started = time.time()
+    study = attach(name)
+
+    def get_template(horizon: int, component=None) -> ModelTemplate:
+        if config["template"] or config["warm_start"]:
+            return _get_template(name, study, config, horizon, component)
+        backend = create_backend(config["backend"], config["solver_params"])
+        nodes = None if component is None else component[1]
+        modeler = MatrixModeler(study, horizon, nodes, config["reduction"])
+        return ModelTemplate(modeler, backend=backend)
+
+    # Each component is solved as its own model, then placed inside part groups
+    components = [None] if part is None else part[1]
+    groups = [component_groups(study, None if c is None else c[1]) for c in components]
+    part_groups = np.sort(np.concatenate(groups))
+    positions = [np.searchsorted(part_groups, g) for g in groups]
+
+    results = [
+        [
+            _solve_rolling(
+                lambda horizon: get_template(horizon, component),
+                study.horizon,
+                i_scn,
+                config["window"],
+                config["overlap"],
+                dump,
+                None if component is None else component[0],
             )
-            for src, r in conv.src_ratios.items()
+            for component in components
         ]
-
-    @staticmethod
-    def _build_constraint(solver, r, var_dest, var_src):
-        const = solver.Constraint(0, 0)
-        const.SetCoefficient(var_src, r)
-        const.SetCoefficient(var_dest, -1)
-        return const
-
-    def build(self):
-        pass  # Currently nothing are need at the end. But we keep builder pattern syntax
+        for i_scn, dump in zip(scenarios, dumps)
+    ]
+
+    # Every scenario has the same windows, they are stacked window by window
+    outputs = []
+    for w, (start, output) in enumerate(results[0][0][0]):
+        stacked = np.empty((len(scenarios), part_groups.size, output.shape[1]))
+        for res, out in zip(results, stacked):
+            for position, (windows, _) in zip(positions, res):
+                out[position] = windows[w][1]
+        outputs.append((start, stacked))
+
+    stats = []
+    for res in results:
+        total = res[0][1]
+        for _, other in res[1:]:
+            _merge_stats(total, other)
+        stats.append(total)
+
+    worker = dict(
+        workers=os.getpid(), queue=started - sent, rss=_peak_rss(), finished=time.time()
+    )
+    return (
+        scenarios,
+        None if part is None else part[0],
+        outputs,
+        [dict(s, **worker) for s in stats],
+    )
 
 
-def _solve_batch(params) -> bytes:
+def _chunk_size(study: Study, processes: int, nb_scn: int = None) -> int:
     """
-    Solve study scenario batch. Called by multiprocessing.
-    :param params: (study, scenarios) for main runtime OR (study, scenario, mock solver, mock objective
-    , mock adequacy, mock input mapper) only for test purpose.
-    :return: [t: {name: LPNode, ...},  ...]
-    """
-    start = time.time()
-    if len(params) == 2:  # Runtime
-        study, i_scn = params
-
-        solver = Solver("simple_lp_program", Solver.GLOP_LINEAR_PROGRAMMING)
-
-        objective = ObjectiveBuilder(solver=solver)
-        adequacy = AdequacyBuilder(solver=solver)
-        storage = StorageBuilder(solver=solver)
-        mix = ConverterMixBuilder(solver=solver)
-
-        in_mapper = InputMapper(solver=solver, study=study)
-    else:  # Test purpose only
-        study, i_scn, solver, objective, adequacy, storage, mix, in_mapper = params
-
-    variables = [LPTimeStep.create_like_study(study) for _ in range(study.horizon)]
+    Estimate number of scenarios solved by a task. Small models are grouped to amortize task dispatch,
+    but each worker should still receive a few tasks to balance load.
 
-    # Build equation
-    for t in range(0, study.horizon):
-
-        # Build node constraints
-        for name_network, network in study.networks.items():
-            for name_node, node in network.nodes.items():
-                node = in_mapper.get_node_var(
-                    network=name_network, node=name_node, t=t, scn=i_scn
-                )
-                variables[t].networks[name_network].nodes[name_node] = node
-                adequacy.add_node(
-                    name_network=name_network, name_node=name_node, node=node, t=t
-                )
-                storage.add_node(
-                    name_network=name_network, name_node=name_node, node=node, t=t
-                )
-                objective.add_node(node=node)
-
-        # Build converter constraints
-        for name in study.converters:
-            conv = in_mapper.get_conv_var(name=name, t=t, scn=i_scn)
-            variables[t].converters[name] = conv
-            adequacy.add_converter(conv=conv, t=t)
-            mix.add_converter(conv=conv)
-            objective.add_converter(conv=conv)
-
-    objective.build()
-    adequacy.build()
-    storage.build()
-    mix.build()
+    :param study: study to solve
+    :param processes: number of workers
+    :param nb_scn: number of scenarios to solve. default None to solve every study scenario
+    :return: number of scenarios by task
+    """
+    nb_vars = max(1, len(build_layout(study)) * study.horizon)
+    by_size = -(-CHUNK_VARIABLES // nb_vars)
+    by_balance = max(1, (nb_scn or study.nb_scn) // (4 * processes))
+    return max(1, min(by_size, by_balance))
 
-    problem_build = time.time()
 
-    logger.info("Problem build. Start solver")
-    solver.EnableOutput()
-    solver.Solve()
+def _split(study: Study, processes: int) -> List[Tuple[int, List]]:
+    """
+    Split study into connected components and spread them into parts of balanced size, one part by worker at most.
+    Each part is sent as a task, each component inside a part is solved as its own model.
 
-    problem_solved = time.time()
-    logger.info("Solver finish cost=%d", solver.Objective().Value())
-    logger.debug(
-        solver.ExportModelAsLpFormat(False).replace("\\", "").replace(",_", ",")
-    )
+    :param study: study to split
+    :param processes: number of workers
+    :return: [(part index, [(component index, nodes), ...]), ...] or [None] if study has only one component
+    """
+    components = connected_components(study)
+    if len(components) <= 1:
+        return [None]
 
-    # When multiprocessing handle response and serialize it with pickle,
-    # it's occur that ortools variables seem already erased.
-    # To fix this situation, serialization is handle inside 'job scope'
-    return msgpack.packb(
-        (JSON.convert(variables), problem_build - start, problem_solved - start),
-        use_bin_type=True,
-    )
+    sizes = [len(build_layout(study, nodes)) for nodes in components]
+    parts = [[] for _ in range(min(processes, len(components)))]
+    loads = [0] * len(parts)
+    # Biggest components first, each one into the lightest part
+    for i in sorted(range(len(components)), key=lambda i: -sizes[i]):
+        lightest = loads.index(min(loads))
+        parts[lightest].append((i, components[i]))
+        loads[lightest] += sizes[i]
+    return [(p, sorted(part)) for p, part in enumerate(parts)]
 
 
 def _wrap_profiler(param):
@@ -430,60 +425,374 @@ def _wrap_profiler(param):
     :return:
     """
     return cProfile.runctx(
-        "_solve_batch(param)", globals(), locals(), "prof%d.prof" % param[1]
+        "_solve_batch(param)", globals(), locals(), "prof%d.prof" % param[1][0]
     )
 
 
-def solve_lp(study: Study, out_mapper=None) -> Result:
+def solve_lp(
+    study: Study,
+    out_mapper=None,
+    pool: Union[Executor, multiprocessing.pool.Pool] = None,
+    template: bool = True,
+    warm_start: bool = False,
+    window: int = None,
+    overlap: int = 0,
+    dump_dir: str = None,
+    dump_scenarios: List[int] = None,
+    dump_format: str = "lp",
+    backend: str = "GLOP",
+    solver_params: Dict = None,
+    chunk_size: int = None,
+    dedup: bool = True,
+    cache: ResultCache = None,
+    dtype=None,
+    decompose: bool = True,
+    presolve: bool = True,
+) -> Result:
     """
     Solve adequacy flow problem with a linear optimizer.
 
     :param study: study to compute
     :param out_mapper: use only for test purpose to inject mock. Keep None as default.
+    :param pool: executor or multiprocessing pool to use, see hadar.optimizer.executor.
+    If None, a process executor is created and closed only for this call.
+    :param template: each worker keeps model between scenarios and updates only changed values. default True
+    :param warm_start: each worker starts solver from basis of its previous scenario, implies template. default False
+    :param window: solve horizon by rolling windows of this number of time steps. default None to solve at once
+    :param overlap: number of time steps modeled after each window but not kept. default 0
+    :param dump_dir: directory where models are written before solving, for debug purpose. default None to not write
+    :param dump_scenarios: scenarios to write. default None to write all scenarios
+    :param dump_format: 'lp' or 'mps'. default 'lp'
+    :param backend: solver backend, see hadar.optimizer.lp.backend.create_backend. default 'GLOP'
+    :param solver_params: backend parameters like time_limit, threads or tolerances. default None
+    :param chunk_size: number of scenarios solved by a worker task. default None to size it from model size
+    :param dedup: solve only once scenarios with identical inputs and copy result to the others. default True
+    :param cache: read scenario outputs from this cache and write solved ones into it. default None to not use cache
+    :param dtype: result arrays type, like np.float32 to halve result memory. Problems are still solved in double.
+    default None to use study dtype, float if study doesn't set one
+    :param decompose: solve each connected component of study (nodes without link or converter between them)
+    as its own model, components are spread over workers. default True
+    :param presolve: remove always zero variables and constraints left empty, merge productions of a node
+    with identical costs. default True
     :return: Result object with optimal solution
     """
+    config = _config(
+        template=template,
+        warm_start=warm_start,
+        window=window,
+        overlap=overlap,
+        dump_format=dump_format,
+        backend=backend,
+        solver_params=solver_params,
+        chunk_size=chunk_size,
+        dedup=dedup,
+        dtype=dtype,
+        decompose=decompose,
+        presolve=presolve,
+    )
+    args = (study, out_mapper, config, dump_dir, dump_scenarios, dump_format, cache)
+    if pool is None:
+        with create_executor() as executor:
+            return _solve_pool(executor, *args)
+    return _solve_pool(create_executor(pool), *args)
+
+
+def solve_lp_iter(
+    study: Study,
+    pool: Union[Executor, multiprocessing.pool.Pool] = None,
+    progress: Callable[[int, int], None] = None,
+    dump_dir: str = None,
+    dump_scenarios: List[int] = None,
+    cache: ResultCache = None,
+    **options
+) -> Iterator[Tuple[int, Result]]:
+    """
+    Solve adequacy flow problem and yield each scenario result as soon as a worker finishes it.
+    Scenarios come in completion order, not in index order.
+
+    :param study: study to compute
+    :param pool: executor or multiprocessing pool to use. If None, a process executor is created and closed
+    when iteration ends.
+    :param progress: function called with (number of scenarios done, number of scenarios) after each task.
+    default None
+    :param dump_dir: see solve_lp
+    :param dump_scenarios: see solve_lp
+    :param cache: see solve_lp
+    :param options: other solve_lp parameters like window, backend or chunk_size
+    :return: iterator of (scenario index, result with only this scenario)
+    """
+    config = _config(**options)
+    args = (study, config, dump_dir, dump_scenarios, options.get("dump_format", "lp"))
+    if pool is None:
+        with create_executor() as executor:
+            yield from _iter_pool(executor, *args, cache, progress)
+    else:
+        yield from _iter_pool(create_executor(pool), *args, cache, progress)
+
+
+def _config(
+    template: bool = True,
+    warm_start: bool = False,
+    window: int = None,
+    overlap: int = 0,
+    dump_format: str = "lp",
+    backend: str = "GLOP",
+    solver_params: Dict = None,
+    chunk_size: int = None,
+    dedup: bool = True,
+    dtype=None,
+    decompose: bool = True,
+    presolve: bool = True,
+) -> Dict:
+    """
+    Check solve parameters and gather ones sent to workers. See solve_lp for parameters.
+    """
+    if window is not None and window <= 0:
+        raise ValueError("window must be positive")
+    if overlap < 0:
+        raise ValueError("overlap must be positive or zero")
+    if dump_format not in ["lp", "mps"]:
+        raise ValueError("dump format must be 'lp' or 'mps'")
+    if chunk_size is not None and chunk_size <= 0:
+        raise ValueError("chunk size must be positive")
+
+    solver_params = solver_params or {}
+    create_backend(backend, solver_params)  # Check backend before sending it to workers
+    return dict(
+        template=template,
+        warm_start=warm_start,
+        window=window,
+        overlap=overlap,
+        backend=backend,
+        solver_params=solver_params,
+        chunk_size=chunk_size,
+        dedup=dedup,
+        dtype=None if dtype is None else np.dtype(dtype),
+        decompose=decompose,
+        presolve=presolve,
+    )
+
+
+def _solve_chunks(
+    pool: Executor,
+    study: Study,
+    config: Dict,
+    benchmark: Benchmark,
+    dump_dir: str = None,
+    dump_scenarios: List[int] = None,
+    dump_format: str = "lp",
+    cache: ResultCache = None,
+) -> Iterator[Tuple[List[int], List[Tuple[int, np.ndarray]]]]:
+    """
+    Solve all scenarios with worker pool, chunk by chunk in completion order. See solve_lp for parameters.
+
+    :param benchmark: benchmark to fill with solve times
+    :return: iterator of (scenarios, [(window start, output quantities like (scenarios, groups, window)), ...])
+    for each chunk solved or read from cache. Duplicate scenarios are included.
+    """
+
+    def dump(scn: int):
+        if dump_dir is None or (
+            dump_scenarios is not None and scn not in dump_scenarios
+        ):
+            return None
+        return dump_dir, dump_format
+
+    if dump_dir is not None:
+        os.makedirs(dump_dir, exist_ok=True)
+
+    # Reduction is found once for whole study and sent with configuration to every worker
+    reduction = presolve(study) if config["presolve"] else Reduction()
+    config = dict(config, reduction=reduction)
+    benchmark.removed_variables = reduction.nb_groups * study.horizon
+    benchmark.removed_constraints = reduction.nb_blocks * study.horizon
+
+    # Only first scenario of each group with identical inputs is solved, its output is copied to the others
+    if config["dedup"]:
+        groups = group_scenarios(study)
+    else:
+        groups = {scn: [scn] for scn in range(study.nb_scn)}
+    # Scenarios asked to be dumped are solved by themselves to get their model
+    for scns in list(groups.values()):
+        for scn in [scn for scn in scns[1:] if dump(scn) is not None]:
+            scns.remove(scn)
+            groups[scn] = [scn]
+    unique = sorted(groups)
+    benchmark.saved = study.nb_scn - len(unique)
+
+    def with_duplicates(scenarios: List[int], outputs: List[Tuple[int, np.ndarray]]):
+        copies = [len(groups[scn]) for scn in scenarios]
+        targets = [dup for scn in scenarios for dup in groups[scn]]
+        if len(targets) > len(scenarios):
+            outputs = [(t, np.repeat(out, copies, axis=0)) for t, out in outputs]
+        return targets, outputs
+
+    # Cached scenarios come first, a scenario to dump is always solved
+    if cache is not None:
+        salt = repr(
+            (
+                config["backend"],
+                sorted(config["solver_params"].items()),
+                config["window"],
+                config["overlap"],
+                config["presolve"],
+            )
+        )
+        keys = cache.keys(study, salt)
+        for scn in [scn for scn in unique if dump(scn) is None]:
+            output = cache.get(keys[scn])
+            if output is not None:
+                unique.remove(scn)
+                benchmark.cached += 1
+                yield with_duplicates([scn], [(0, output[None])])
+
+        if not unique:
+            # Every scenario is cached, study isn't sent to workers
+            cache.evict()
+            return
+
+    size = config["chunk_size"] or _chunk_size(study, pool.processes, len(unique))
+    chunks = [unique[i : i + size] for i in range(0, len(unique), size)]
+
+    # Each chunk is sent once by part, a chunk is complete when all its parts are received
+    parts = _split(study, pool.processes) if config["decompose"] else [None]
+    if parts[0] is not None:
+        nb_groups = len(build_layout(study))
+        part_groups = [
+            component_groups(study, [n for _, nodes in part for n in nodes])
+            for _, part in parts
+        ]
+    pending = (
+        dict()
+    )  # {first chunk scenario: (outputs, stats, number of parts received)}
+
+    # Study is shared once by executor, tasks carry only its name.
+    # Results are consumed as soon as they come, parent keeps only a few chunks in memory.
+    sharing = time.time()
+    with pool.share(study) as shared:
+        benchmark.sharing = time.time() - sharing
+        results = pool.imap_unordered(
+            _solve_batch,
+            (
+                (
+                    shared.name,
+                    chunk,
+                    config,
+                    [dump(scn) for scn in chunk],
+                    time.time(),
+                    part,
+                )
+                for chunk in chunks
+                for part in parts
+            ),
+        )
+        try:
+            for scenarios, part, outputs, stats in results:
+                received = time.time()
+                for record in stats:
+                    record["transfer"] = received - record.pop("finished")
+
+                if part is not None:
+                    whole, total, done = pending.pop(scenarios[0], (None, None, 0))
+                    if whole is None:
+                        whole = [
+                            (t, np.empty((len(scenarios), nb_groups, out.shape[2])))
+                            for t, out in outputs
+                        ]
+                        total = stats
+                    else:
+                        total = [_merge_stats(a, b) for a, b in zip(total, stats)]
+                    for (_, w), (_, out) in zip(whole, outputs):
+                        w[:, part_groups[part]] = out
+                    if done + 1 < len(parts):
+                        pending[scenarios[0]] = (whole, total, done + 1)
+                        continue
+                    outputs, stats = whole, total
+
+                for scn, record in zip(scenarios, stats):
+                    benchmark.add(scenarios=scn, **record)
+                if cache is not None:
+                    whole = np.concatenate([output for _, output in outputs], axis=2)
+                    for scn, output, record in zip(scenarios, whole, stats):
+                        # Only optimal outputs are reused, others are solved again
+                        if record["status"] == "optimal":
+                            cache.put(keys[scn], output)
+                yield with_duplicates(scenarios, outputs)
+        finally:
+            # Tasks left by an early stop are cancelled before study is released.
+            # Workers forget study and its templates, then study is released by executor at exit
+            results.close()
+            pool.broadcast(_release, shared.name)
+
+    if cache is not None:
+        cache.evict()
+
+
+def _solve_pool(
+    pool: Executor,
+    study: Study,
+    out_mapper,
+    config: Dict,
+    dump_dir: str,
+    dump_scenarios: List[int],
+    dump_format: str,
+    cache: ResultCache,
+) -> Result:
+    """
+    Solve all scenarios with worker pool and map them into one result. See solve_lp for parameters.
+    """
     start = time.time()
     benchmark = Benchmark()
 
-    out_mapper = out_mapper or OutputMapper(study)
+    out_mapper = out_mapper or OutputMapper(study, dtype=config["dtype"])
 
-    pool = multiprocessing.Pool()
-    serialized_out = pool.map(
-        _solve_batch, ((study, i_scn) for i_scn in range(study.nb_scn))
+    mapping = 0
+    chunks = _solve_chunks(
+        pool, study, config, benchmark, dump_dir, dump_scenarios, dump_format, cache
     )
-
-    compute_finished = time.time()
-    for scn in range(0, study.nb_scn):
-        variables, modeler, solver = msgpack.unpackb(
-            serialized_out[scn], use_list=False, raw=False
-        )
-        benchmark.modeler.append(modeler)
-        benchmark.solver.append(solver)
-
-        variables = [LPTimeStep.from_json(v) for v in variables]
-        for t in range(0, study.horizon):
-            # Set node elements
-            for name_network, network in study.networks.items():
-                for name_node in network.nodes.keys():
-                    out_mapper.set_node_var(
-                        network=name_network,
-                        node=name_node,
-                        t=t,
-                        scn=scn,
-                        vars=variables[t].networks[name_network].nodes[name_node],
-                    )
-            # Set converters
-            for name_conv in study.converters:
-                out_mapper.set_converter_var(
-                    name=name_conv,
-                    t=t,
-                    scn=scn,
-                    vars=variables[t].converters[name_conv],
+    with contextlib.closing(chunks):
+        for scenarios, outputs in chunks:
+            mapping_start = time.time()
+            for window_start, output in outputs:
+                out_mapper.set_scenarios(
+                    scns=scenarios, output=output, start=window_start
                 )
+            mapping += time.time() - mapping_start
 
     benchmark.total = time.time() - start
-    benchmark.mapper = time.time() - compute_finished
+    benchmark.mapper = mapping
 
     res = out_mapper.get_result()
     res.benchmark = benchmark
     return res
+
+
+def _iter_pool(
+    pool: Executor,
+    study: Study,
+    config: Dict,
+    dump_dir: str,
+    dump_scenarios: List[int],
+    dump_format: str,
+    cache: ResultCache,
+    progress: Callable[[int, int], None],
+) -> Iterator[Tuple[int, Result]]:
+    """
+    Solve all scenarios with worker pool and give a result for each one. See solve_lp_iter for parameters.
+    """
+    done = 0
+    chunks = _solve_chunks(
+        pool, study, config, Benchmark(), dump_dir, dump_scenarios, dump_format, cache
+    )
+    # Chunks are closed as soon as iteration stops, before executor is closed by caller
+    with contextlib.closing(chunks):
+        for scenarios, outputs in chunks:
+            done += len(scenarios)
+            if progress is not None:
+                progress(done, study.nb_scn)
+
+            whole = np.concatenate([output for _, output in outputs], axis=2)
+            for scn, output in zip(scenarios, whole):
+                out_mapper = OutputMapper(study, nb_scn=1, dtype=config["dtype"])
+                out_mapper.set_scenario(0, output)
+                yield scn, out_mapper.get_result()
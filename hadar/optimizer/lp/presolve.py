@@ -0,0 +1,162 @@
+#  Copyright (c) 2019-2020, RTE (https://www.rte-france.com)
+#  See AUTHORS.txt
+#  This Source Code Form is subject to the terms of the Apache License, version 2.0.
+#  If a copy of the Apache License, version 2.0 was not distributed with this file, you can obtain one at http://www.apache.org/licenses/LICENSE-2.0.
+#  SPDX-License-Identifier: Apache-2.0
+#  This file is part of hadar-simulator, a python adequacy library for everyone.
+from typing import Dict, List, Set, Tuple, Union
+
+import numpy as np
+
+from hadar.optimizer.domain.input import Study
+from hadar.optimizer.domain.numeric import NumericalValue
+
+__all__ = ["Reduction", "presolve"]
+
+
+def _zero(value: Union[NumericalValue, float]) -> bool:
+    """
+    Check if a value is zero for every scenario and time step.
+    """
+    return not np.any(getattr(value, "value", value))
+
+
+def _same(
+    a: Union[NumericalValue, float], b: Union[NumericalValue, float], study: Study
+) -> bool:
+    """
+    Check if two values are equal for every scenario and time step, whatever their shape.
+    """
+    shape = (study.nb_scn, study.horizon)
+    return np.array_equal(
+        np.broadcast_to(getattr(a, "value", a), shape),
+        np.broadcast_to(getattr(b, "value", b), shape),
+    )
+
+
+class Reduction:
+    """
+    Model reduction found by presolve, shared by every scenario and time step so matrix structure stays the same.
+    Groups are named by their build_layout tuple, row blocks by their MatrixModeler block tuple.
+    """
+
+    def __init__(
+        self,
+        removed: Set[Tuple] = None,
+        merged: Dict[Tuple, List[Tuple]] = None,
+        blocks: Set[Tuple] = None,
+    ):
+        """
+        Create reduction.
+
+        :param removed: groups always zero, removed from model and given zero in output
+        :param merged: {kept group: [groups modeled by kept one, kept one first]} productions of the same node
+        with identical costs, modeled as one variable bounded by their quantities sum
+        :param blocks: row blocks left without variable, removed from model
+        """
+        self.removed = removed or set()
+        self.merged = merged or dict()
+        self.blocks = blocks or set()
+
+    @property
+    def nb_groups(self) -> int:
+        """
+        Number of groups removed from model, removed or merged into another one.
+        """
+        return len(self.removed) + sum(len(g) - 1 for g in self.merged.values())
+
+    @property
+    def nb_blocks(self) -> int:
+        """
+        Number of row blocks removed from model.
+        """
+        return len(self.blocks)
+
+
+def presolve(study: Study) -> Reduction:
+    """
+    Find groups and constraints which add nothing to linear problem:
+    - consumptions, productions, links, storage attributes and converters whose quantity is always zero
+    - productions of the same node with identical cost, merged into one variable
+    - constraints left without variable
+
+    :param study: study to reduce
+    :return: reduction to apply when modeling
+    """
+    removed = set()
+    merged = dict()
+    terms = dict()  # {row block: groups inside}
+    fixed = set()  # Row blocks with a right hand side, kept even without variable
+
+    for name_network, network in study.networks.items():
+        for name_node, node in network.nodes.items():
+            adequacy = terms.setdefault(("adequacy", name_network, name_node), [])
+
+            for i, cons in enumerate(node.consumptions):
+                g = ("consumption", name_network, name_node, i, "quantity")
+                if _zero(cons.quantity):
+                    removed.add(g)
+                adequacy.append(g)
+
+            heads = []  # (group, cost) of kept productions with distinct costs
+            for i, prod in enumerate(node.productions):
+                g = ("production", name_network, name_node, i, "quantity")
+                adequacy.append(g)
+                if _zero(prod.quantity):
+                    removed.add(g)
+                    continue
+                head = next(
+                    (h for h, cost in heads if _same(cost, prod.cost, study)), None
+                )
+                if head is None:
+                    heads.append((g, prod.cost))
+                    merged[g] = [g]
+                else:
+                    merged[head].append(g)
+
+            for i, stor in enumerate(node.storages):
+                block = ("storage", name_network, name_node, i)
+                groups = [
+                    ("storage", name_network, name_node, i, attribute)
+                    for attribute in ["capacity", "flow_in", "flow_out"]
+                ]
+                for g, value in zip(
+                    groups, [stor.capacity, stor.flow_in, stor.flow_out]
+                ):
+                    if _zero(value):
+                        removed.add(g)
+                terms[block] = groups
+                adequacy += groups[1:]
+                if stor.init_capacity != 0:
+                    fixed.add(block)
+
+            for i, link in enumerate(node.links):
+                g = ("link", name_network, name_node, i, "quantity")
+                if _zero(link.quantity):
+                    removed.add(g)
+                adequacy.append(g)
+                terms.setdefault(("adequacy", name_network, link.dest), []).append(g)
+
+    for name, conv in study.converters.items():
+        g_dest = ("converter", name, None, 0, "flow_dest")
+        zero = _zero(conv.max)
+        if zero:
+            removed.add(g_dest)
+        dest = ("adequacy", conv.dest_network, conv.dest_node)
+        terms.setdefault(dest, []).append(g_dest)
+        for src in conv.src_ratios:
+            g_src = ("converter", name, src, 0, "flow_src")
+            if zero:
+                removed.add(g_src)
+            terms.setdefault(("adequacy",) + src, []).append(g_src)
+            terms[("converter", name) + src] = [g_src, g_dest]
+
+    return Reduction(
+        removed=removed,
+        merged={head: groups for head, groups in merged.items() if len(groups) > 1},
+        blocks={
+            block
+            for block, groups in terms.items()
+            if block not in fixed and all(g in removed for g in groups)
+        },
+    )
@@ -5,14 +5,28 @@
 #  SPDX-License-Identifier: Apache-2.0
 #  This file is part of hadar-simulator, a python adequacy library for everyone.
 
+import asyncio
+import logging
 from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterator, List, Tuple, Union
+
+import pandas as pd
 
 from hadar.optimizer.domain.input import Study
-from hadar.optimizer.lp.optimizer import solve_lp
+from hadar.optimizer.executor import Executor, create_executor
+from hadar.optimizer.lp.backend import BACKENDS, create_backend
+from hadar.optimizer.lp.cache import ResultCache
+from hadar.optimizer.lp.optimizer import solve_lp, solve_lp_iter
 from hadar.optimizer.domain.output import Result
-from hadar.optimizer.remote.optimizer import solve_remote
+from hadar.optimizer.remote.optimizer import (
+    solve_remote,
+    solve_remote_async,
+    solve_many_async,
+)
+
+__all__ = ["LPOptimizer", "RemoteOptimizer", "compare_backends"]
 
-__all__ = ["LPOptimizer", "RemoteOptimizer"]
+logger = logging.getLogger(__name__)
 
 
 class Optimizer(ABC):
@@ -26,8 +40,114 @@ class Optimizer(ABC):
 class LPOptimizer(Optimizer):
     """
     Basic Optimizer works with linear programming.
+
+    Optimizer owns an executor, started at first solve and reused by next ones.
+    Use it as context manager or call close() to stop workers.
     """
 
+    def __init__(
+        self,
+        processes: int = None,
+        template: bool = True,
+        warm_start: bool = False,
+        window: int = None,
+        overlap: int = 0,
+        dump_dir: str = None,
+        dump_scenarios: List[int] = None,
+        dump_format: str = "lp",
+        backend: str = "GLOP",
+        solver_params: Dict = None,
+        chunk_size: int = None,
+        dedup: bool = True,
+        cache_dir: str = None,
+        cache_size: int = 2 ** 30,
+        dtype=None,
+        decompose: bool = True,
+        presolve: bool = True,
+        executor: Union[str, Executor] = "process",
+    ):
+        """
+        Set up optimizer.
+
+        :param processes: number of workers. default None to use number of cpu
+        :param template: keep model inside workers between scenarios, update only changed values. default True
+        :param warm_start: start each scenario from basis of previous scenario solved by the same worker.
+        Useful when scenarios are close. default False
+        :param window: solve horizon by rolling windows of this number of time steps,
+        storage capacities are carried from a window to the next one. default None to solve whole horizon at once
+        :param overlap: number of time steps modeled after each window to anticipate, but not kept. default 0
+        :param dump_dir: directory where models are written as files before solving, for debug purpose.
+        default None to not write them
+        :param dump_scenarios: scenarios to write. default None to write all scenarios
+        :param dump_format: file format 'lp' or 'mps'. default 'lp'
+        :param backend: solver backend: 'SCIPY' or an ortools solver like 'GLOP', 'PDLP', 'CLP', 'HIGHS'. default 'GLOP'
+        :param solver_params: backend parameters: time_limit (seconds), threads, primal_tolerance, dual_tolerance,
+        presolve and backend specific ones. default None
+        :param chunk_size: number of scenarios solved by a worker task. default None to size it from model size
+        :param dedup: solve only once scenarios with identical inputs, like scenarios resampled from the same source.
+        default True
+        :param cache_dir: directory where scenario outputs are cached, a scenario already solved with the same inputs
+        and configuration is read instead of solved. default None to not use cache
+        :param cache_size: maximum cache size in bytes, least recently used outputs are removed above. default 1GB
+        :param dtype: result arrays type, like np.float32 to halve result memory.
+        default None to use study dtype, float if study doesn't set one
+        :param decompose: solve separately and in parallel parts of study without link or converter between them,
+        like islands. default True
+        :param presolve: remove from model elements which add nothing, like productions or links always at zero,
+        and merge productions of a node with identical costs. Results are still given for every element. default True
+        :param executor: how scenarios are spread over workers: 'serial' inside current process to debug or profile,
+        'thread', 'process' or an executor like SocketExecutor to use several hosts (see hadar.optimizer.executor).
+        An executor given is not closed by optimizer. default 'process'
+        """
+        self.processes = processes
+        self.template = template
+        self.warm_start = warm_start
+        self.window = window
+        self.overlap = overlap
+        self.dump_dir = dump_dir
+        self.dump_scenarios = dump_scenarios
+        self.dump_format = dump_format
+        self.backend = backend
+        self.solver_params = solver_params
+        self.chunk_size = chunk_size
+        self.dedup = dedup
+        self.dtype = dtype
+        self.decompose = decompose
+        self.presolve = presolve
+        self.executor = executor
+        self.cache = None if cache_dir is None else ResultCache(cache_dir, cache_size)
+        self._pool = None
+
+    @property
+    def pool(self) -> Executor:
+        """
+        Get executor, start it if needed.
+
+        :return: executor
+        """
+        if self._pool is None:
+            self._pool = create_executor(self.executor, self.processes)
+        return self._pool
+
+    def _options(self) -> Dict:
+        return dict(
+            template=self.template,
+            warm_start=self.warm_start,
+            window=self.window,
+            overlap=self.overlap,
+            dump_dir=self.dump_dir,
+            dump_scenarios=self.dump_scenarios,
+            dump_format=self.dump_format,
+            backend=self.backend,
+            solver_params=self.solver_params,
+            chunk_size=self.chunk_size,
+            dedup=self.dedup,
+            cache=self.cache,
+            dtype=self.dtype,
+            decompose=self.decompose,
+            presolve=self.presolve,
+        )
+
     def solve(self, study: Study) -> Result:
         """
         Solve adequacy study.
@@ -35,7 +155,38 @@ class LPOptimizer(Optimizer):
         :param study: study to resolve
         :return: study's result
         """
-        return solve_lp(study)
+        return solve_lp(study, pool=self.pool, **self._options())
+
+    def solve_iter(
+        self, study: Study, progress: Callable[[int, int], None] = None
+    ) -> Iterator[Tuple[int, Result]]:
+        """
+        Solve adequacy study and yield each scenario result as soon as it's solved, in completion order.
+
+        :param study: study to resolve
+        :param progress: function called with (number of scenarios done, number of scenarios). default None
+        :return: iterator of (scenario index, result with only this scenario)
+        """
+        return solve_lp_iter(
+            study, pool=self.pool, progress=progress, **self._options()
+        )
+
+    def close(self):
+        """
+        Stop workers. Optimizer can still be used, a new executor will be started at next solve.
+
+        :return:
+        """
+        if self._pool is not None:
+            if not isinstance(self.executor, Executor):
+                self._pool.close()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
 
 class RemoteOptimizer(Optimizer):
@@ -43,15 +194,36 @@ class RemoteOptimizer(Optimizer):
     Use a remote optimizer to compute on cloud.
     """
 
-    def __init__(self, url: str, token: str = ""):
+    def __init__(
+        self,
+        url: str,
+        token: str = "",
+        concurrency: int = 8,
+        poll: float = 0.5,
+        max_poll: float = 10,
+        binary: bool = False,
+        compression: str = None,
+    ):
         """
         Server optimizer parameter.
 
         :param url: server url
         :param token: server token if needed. default ''
+        :param concurrency: maximum number of studies sent or polled at the same time by solve_many. default 8
+        :param poll: first delay between two polls of async client (s), doubled while job doesn't move.
+        default 0.5
+        :param max_poll: maximum delay between two polls of async client (s). default 10
+        :param binary: send studies and ask results in binary format, much smaller than json for big studies.
+        Json is used if server doesn't accept it. default False
+        :param compression: compression of binary studies: None, 'gzip' or 'zstd'. default None
         """
         self.url = url
         self.token = token
+        self.concurrency = concurrency
+        self.poll = poll
+        self.max_poll = max_poll
+        self.binary = binary
+        self.compression = compression
 
     def solve(self, study: Study) -> Result:
         """
@@ -60,4 +232,101 @@ class RemoteOptimizer(Optimizer):
         :param study: study to resolve
         :return: study's result
         """
-        return solve_remote(study, url=self.url, token=self.token)
+        return solve_remote(
+            study,
+            url=self.url,
+            token=self.token,
+            binary=self.binary,
+            compression=self.compression,
+        )
+
+    async def solve_async(self, study: Study, session=None) -> Result:
+        """
+        Solve adequacy study without blocking event loop. Needs aiohttp.
+
+        :param study: study to resolve
+        :param session: aiohttp ClientSession to reuse. default None to open one for this study
+        :return: study's result
+        """
+        return await solve_remote_async(
+            study,
+            url=self.url,
+            token=self.token,
+            session=session,
+            poll=self.poll,
+            max_poll=self.max_poll,
+            binary=self.binary,
+            compression=self.compression,
+        )
+
+    async def solve_many_async(self, studies: List[Study]) -> List[Result]:
+        """
+        Solve adequacy studies concurrently with a pool of keep-alive connections. Needs aiohttp.
+
+        :param studies: studies to resolve
+        :return: results in studies order
+        """
+        return await solve_many_async(
+            studies,
+            url=self.url,
+            token=self.token,
+            concurrency=self.concurrency,
+            poll=self.poll,
+            max_poll=self.max_poll,
+            binary=self.binary,
+            compression=self.compression,
+        )
+
+    def solve_many(self, studies: List[Study]) -> List[Result]:
+        """
+        Solve adequacy studies concurrently, see solve_many_async. Must not be called inside a running event loop.
+
+        :param studies: studies to resolve
+        :return: results in studies order
+        """
+        return asyncio.run(self.solve_many_async(studies))
+
+
+def compare_backends(
+    study: Study,
+    backends: List[str] = None,
+    solver_params: Dict[str, Dict] = None,
+    processes: int = None,
+) -> pd.DataFrame:
+    """
+    Solve the same study with each backend to compare them.
+
+    :param study: study to solve
+    :param backends: backends to compare. default None to use every backend available on this computer
+    :param solver_params: parameters by backend name. default None
+    :param processes: number of workers. default None to use number of cpu
+    :return: dataframe with a row by backend and columns total, modeler, solver, mapper (seconds)
+    and iterations (sum over scenarios)
+    """
+    solver_params = solver_params or {}
+    if backends is None:
+        backends = []
+        for name in BACKENDS:
+            try:
+                create_backend(name, solver_params.get(name))
+                backends.append(name)
+            except (ImportError, ValueError) as e:
+                logger.warning("Backend %s skipped: %s", name, e)
+
+    rows = []
+    with LPOptimizer(processes=processes) as optimizer:
+        for name in backends:
+            optimizer.backend = name
+            optimizer.solver_params = solver_params.get(name)
+            bench = optimizer.solve(study).benchmark
+            rows.append(
+                dict(
+                    backend=name,
+                    total=bench.total,
+                    modeler=sum(bench.modeler),
+                    solver=sum(bench.solver),
+                    mapper=bench.mapper,
+                    iterations=sum(bench.iterations),
+                )
+            )
+    return pd.DataFrame(rows).set_index("backend")
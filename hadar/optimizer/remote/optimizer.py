@@ -4,9 +4,13 @@
 #  If a copy of the Apache License, version 2.0 was not distributed with this file, you can obtain one at http://www.apache.org/licenses/LICENSE-2.0.
 #  SPDX-License-Identifier: Apache-2.0
 #  This file is part of hadar-simulator, a python adequacy library for everyone.
+import asyncio
+import json
 import logging
 import sys
+import time
 from time import sleep
+from typing import List
 
 import requests
 from progress.bar import Bar
@@ -14,6 +18,7 @@ from progress.spinner import Spinner
 
 from hadar.optimizer.domain.input import Study
 from hadar.optimizer.domain.output import Result
+from hadar.optimizer.remote.wire import encode, decode, headers, is_binary
 
 logger = logging.getLogger(__name__)
 
@@ -23,32 +28,87 @@ class ServerError(Exception):
         super().__init__(mes)
 
 
+UNSUPPORTED = 415  # Server doesn't know binary format, body is sent again as json
+
+
 def check_code(code):
     if code == 404:
         raise ValueError("Can't find server url")
     if code == 403:
         raise ValueError("Wrong token given")
+    if code == UNSUPPORTED:
+        raise ValueError("Server doesn't accept study format")
     if code == 500:
         raise IOError("Error has occurred on remote server")
 
 
-def solve_remote(study: Study, url: str, token: str = "none") -> Result:
+def _encode(study: Study, binary: bool, compression: str) -> bytes:
+    """
+    Encode study as request body.
+
+    :param study: study to send
+    :param binary: use binary format, else json
+    :param compression: compression of binary format
+    :return: body
+    """
+    start = time.time()
+    if binary:
+        body = encode(study, compression)
+    else:
+        body = json.dumps(study.to_json()).encode()
+    logger.info(
+        "Study encoded in %.3fs, %d bytes %s",
+        time.time() - start,
+        len(body),
+        "binary" if binary else "json",
+    )
+    return body
+
+
+def _decode(resp_headers, content: bytes) -> dict:
+    """
+    Decode response body, binary or json according to its content type.
+
+    :param resp_headers: response headers
+    :param content: response body
+    :return: response
+    """
+    return decode(content) if is_binary(resp_headers) else json.loads(content)
+
+
+def solve_remote(
+    study: Study,
+    url: str,
+    token: str = "none",
+    binary: bool = False,
+    compression: str = None,
+) -> Result:
     """
     Send study to remote server.
 
     :param study: study to resolve
     :param url: server url
     :param token: authorized token (default server config doesn't use token)
+    :param binary: send study and ask result in binary format, numerical values are sent as raw arrays.
+    Json is used if server doesn't accept it. default False
+    :param compression: compression of binary study: None, 'gzip' or 'zstd'. default None
     :return: result received from server
     """
     # Send study
-    resp = requests.post(
-        url="%s/api/v1/study" % url, json=study.to_json(), params={"token": token}
-    )
+    for binary in [True, False] if binary else [False]:
+        resp = requests.post(
+            url="%s/api/v1/study" % url,
+            data=_encode(study, binary, compression),
+            params={"token": token},
+            headers=headers(binary, compression),
+        )
+        if resp.status_code != UNSUPPORTED or not binary:
+            break
+        logger.info("Server doesn't accept binary format, study sent as json")
     check_code(resp.status_code)
 
     # Deserialize
-    resp = resp.json()
+    resp = _decode(resp.headers, resp.content)
     id = resp["job"]
 
     Bar.check_tty = Spinner.check_tty = False
@@ -58,10 +118,12 @@ def solve_remote(study: Study, url: str, token: str = "none") -> Result:
 
     while resp["status"] in ["QUEUED", "COMPUTING"]:
         resp = requests.get(
-            url="%s/api/v1/result/%s" % (url, id), params={"token": token}
+            url="%s/api/v1/result/%s" % (url, id),
+            params={"token": token},
+            headers=headers(binary),
         )
         check_code(resp.status_code)
-        resp = resp.json()
+        resp = _decode(resp.headers, resp.content)
 
         if resp["status"] == "QUEUED":
             bar.goto(resp["progress"])
@@ -77,4 +139,147 @@ def solve_remote(study: Study, url: str, token: str = "none") -> Result:
     if resp["status"] == "ERROR":
         raise ServerError(resp["message"])
 
-    return Result.from_json(resp["result"])
+    start = time.time()
+    result = Result.from_json(resp["result"])
+    logger.info("Result read in %.3fs", time.time() - start)
+    return result
+
+
+def _aiohttp():
+    """
+    Import aiohttp, an optional dependency used only by async client.
+
+    :return: aiohttp module
+    """
+    try:
+        import aiohttp
+    except ImportError:
+        raise ImportError("async remote client needs aiohttp, please install it")
+    return aiohttp
+
+
+async def solve_remote_async(
+    study: Study,
+    url: str,
+    token: str = "none",
+    session=None,
+    poll: float = 0.5,
+    max_poll: float = 10,
+    binary: bool = False,
+    compression: str = None,
+) -> Result:
+    """
+    Send study to remote server without blocking event loop. Job status is polled with exponential backoff:
+    delay starts at poll, doubles at each unchanged status until max_poll and goes back to poll
+    when job moves forward.
+
+    :param study: study to resolve
+    :param url: server url
+    :param token: authorized token (default server config doesn't use token)
+    :param session: aiohttp ClientSession to reuse its keep-alive connections. default None to open one for this job
+    :param poll: first delay between two polls (s). default 0.5
+    :param max_poll: maximum delay between two polls (s). default 10
+    :param binary: see solve_remote. default False
+    :param compression: see solve_remote. default None
+    :return: result received from server
+    """
+    if session is None:
+        async with _aiohttp().ClientSession() as session:
+            return await solve_remote_async(
+                study,
+                url,
+                token,
+                session,
+                poll=poll,
+                max_poll=max_poll,
+                binary=binary,
+                compression=compression,
+            )
+
+    # Conversions are done by a thread to let other jobs go on
+    loop = asyncio.get_running_loop()
+    for binary in [True, False] if binary else [False]:
+        body = await loop.run_in_executor(None, _encode, study, binary, compression)
+        async with session.post(
+            "%s/api/v1/study" % url,
+            data=body,
+            params={"token": token},
+            headers=headers(binary, compression),
+        ) as r:
+            if r.status == UNSUPPORTED and binary:
+                logger.info("Server doesn't accept binary format, study sent as json")
+                continue
+            check_code(r.status)
+            resp = _decode(r.headers, await r.read())
+            break
+    id = resp["job"]
+
+    delay = poll
+    state = (resp["status"], resp.get("progress"))
+    while resp["status"] in ["QUEUED", "COMPUTING"]:
+        await asyncio.sleep(delay)
+        async with session.get(
+            "%s/api/v1/result/%s" % (url, id),
+            params={"token": token},
+            headers=headers(binary),
+        ) as r:
+            check_code(r.status)
+            content = await r.read()
+        resp = await loop.run_in_executor(None, _decode, r.headers, content)
+
+        previous, state = state, (resp["status"], resp.get("progress"))
+        delay = poll if state != previous else min(delay * 2, max_poll)
+        logger.info("Job %s %s progress=%s", id, *state)
+
+    if resp["status"] == "ERROR":
+        raise ServerError(resp["message"])
+
+    start = time.time()
+    result = await loop.run_in_executor(None, Result.from_json, resp["result"])
+    logger.info("Result read in %.3fs", time.time() - start)
+    return result
+
+
+async def solve_many_async(
+    studies: List[Study],
+    url: str,
+    token: str = "none",
+    concurrency: int = 8,
+    poll: float = 0.5,
+    max_poll: float = 10,
+    binary: bool = False,
+    compression: str = None,
+) -> List[Result]:
+    """
+    Send studies to remote server and wait their results concurrently.
+    Jobs share one session, therefore a pool of at most concurrency keep-alive connections.
+
+    :param studies: studies to resolve
+    :param url: server url
+    :param token: authorized token (default server config doesn't use token)
+    :param concurrency: maximum number of studies sent or polled at the same time. default 8
+    :param poll: first delay between two polls (s). default 0.5
+    :param max_poll: maximum delay between two polls (s). default 10
+    :param binary: see solve_remote. default False
+    :param compression: see solve_remote. default None
+    :return: results in studies order
+    """
+    aiohttp = _aiohttp()
+    semaphore = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+
+        async def solve(study: Study) -> Result:
+            async with semaphore:
+                return await solve_remote_async(
+                    study,
+                    url,
+                    token,
+                    session,
+                    poll=poll,
+                    max_poll=max_poll,
+                    binary=binary,
+                    compression=compression,
+                )
+
+        return list(await asyncio.gather(*(solve(study) for study in studies)))
@@ -0,0 +1,141 @@
+#  Copyright (c) 2019-2020, RTE (https://www.rte-france.com)
+#  See AUTHORS.txt
+#  This Source Code Form is subject to the terms of the Apache License, version 2.0.
+#  If a copy of the Apache License, version 2.0 was not distributed with this file, you can obtain one at http://www.apache.org/licenses/LICENSE-2.0.
+#  SPDX-License-Identifier: Apache-2.0
+#  This file is part of hadar-simulator, a python adequacy library for everyone.
+import gzip
+from typing import Dict, Union
+
+import msgpack
+import numpy as np
+
+from hadar.optimizer.utils import JSON, keep_arrays
+
+__all__ = [
+    "MEDIA_TYPE",
+    "JSON_TYPE",
+    "COMPRESSIONS",
+    "encode",
+    "decode",
+    "headers",
+    "is_binary",
+]
+
+MEDIA_TYPE = "application/x-hadar-msgpack"
+JSON_TYPE = "application/json"
+
+COMPRESSIONS = ["gzip", "zstd"]
+
+_ARRAY = 1  # msgpack extension code of numpy arrays
+
+
+def _zstd():
+    """
+    Import zstandard, an optional dependency used only by zstd compression.
+
+    :return: zstandard module
+    """
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("zstd compression needs zstandard, please install it")
+    return zstandard
+
+
+def _default(obj):
+    """
+    Encode objects unknown by msgpack. Numpy arrays are written as (dtype, shape) then raw little-endian buffer.
+    """
+    if isinstance(obj, np.ndarray) and not obj.dtype.hasobject:
+        array = np.ascontiguousarray(obj, dtype=obj.dtype.newbyteorder("<"))
+        header = msgpack.packb((array.dtype.str, array.shape))
+        return msgpack.ExtType(_ARRAY, header + array.tobytes())
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError("Can't encode %s" % type(obj))
+
+
+def _ext_hook(code: int, data: bytes):
+    if code != _ARRAY:
+        return msgpack.ExtType(code, data)
+    unpacker = msgpack.Unpacker()
+    unpacker.feed(data)
+    dtype, shape = unpacker.unpack()
+    offset = unpacker.tell()
+    # Copy so array is writable and aligned, buffer is dropped with payload
+    return np.frombuffer(data, dtype=dtype, offset=offset).reshape(shape).copy()
+
+
+def encode(obj: Union[JSON, Dict], compression: str = None) -> bytes:
+    """
+    Encode object into binary format: to_json tree packed by msgpack with numpy arrays kept as raw buffers.
+
+    :param obj: object like Study or Result, or dict already given by to_json
+    :param compression: None, 'gzip' or 'zstd' (needs zstandard). default None
+    :return: payload
+    """
+    with keep_arrays():
+        tree = obj.to_json() if isinstance(obj, JSON) else obj
+    payload = msgpack.packb(tree, default=_default, use_bin_type=True)
+    if compression is None:
+        return payload
+    if compression == "gzip":
+        return gzip.compress(payload, compresslevel=1)
+    if compression == "zstd":
+        return _zstd().ZstdCompressor().compress(payload)
+    raise ValueError(
+        "Unknown compression %s, use one of %s" % (compression, COMPRESSIONS)
+    )
+
+
+def decode(payload: bytes, compression: str = None) -> Dict:
+    """
+    Decode binary payload given by encode.
+
+    :param payload: payload
+    :param compression: compression used by encode. default None
+    :return: to_json tree with numpy arrays, to give to from_json
+    """
+    if compression == "gzip":
+        payload = gzip.decompress(payload)
+    elif compression == "zstd":
+        payload = _zstd().ZstdDecompressor().decompress(payload)
+    elif compression not in [None, "identity"]:
+        raise ValueError(
+            "Unknown compression %s, use one of %s" % (compression, COMPRESSIONS)
+        )
+    return msgpack.unpackb(payload, ext_hook=_ext_hook, raw=False, strict_map_key=False)
+
+
+def headers(binary: bool, compression: str = None) -> Dict[str, str]:
+    """
+    Build request headers which announce encoding of body and ask the same one for response.
+    Server which doesn't know binary format answers 415, or answers JSON to GET.
+    Response compression is left to HTTP client which asks and decodes it by itself.
+
+    :param binary: send and ask binary format, else json
+    :param compression: compression of binary body. default None
+    :return: headers
+    """
+    if not binary:
+        return {"Content-Type": JSON_TYPE, "Accept": JSON_TYPE}
+    res = {
+        "Content-Type": MEDIA_TYPE,
+        "Accept": "%s, %s;q=0.5" % (MEDIA_TYPE, JSON_TYPE),
+    }
+    if compression is not None:
+        res["Content-Encoding"] = compression
+    return res
+
+
+def is_binary(headers) -> bool:
+    """
+    Check if a response is encoded in binary format.
+
+    :param headers: response headers
+    :return: True if binary format
+    """
+    return headers.get("Content-Type", "").split(";")[0].strip() == MEDIA_TYPE
@@ -0,0 +1,201 @@
+#  Copyright (c) 2019-2020, RTE (https://www.rte-france.com)
+#  See AUTHORS.txt
+#  This Source Code Form is subject to the terms of the Apache License, version 2.0.
+#  If a copy of the Apache License, version 2.0 was not distributed with this file, you can obtain one at http://www.apache.org/licenses/LICENSE-2.0.
+#  SPDX-License-Identifier: Apache-2.0
+#  This file is part of hadar-simulator, a python adequacy library for everyone.
+import io
+import pickle
+import struct
+import sys
+import threading
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from hadar.optimizer.domain.input import Study
+
+__all__ = ["SharedStudy", "attach", "detach", "register"]
+
+ALIGN = 64
+HEADER = struct.Struct("<QQ")  # (structure offset, structure size)
+
+
+class _ArrayPickler(pickle.Pickler):
+    """
+    Pickler which keeps numpy arrays outside of pickle stream. Arrays are only referenced by their position.
+    """
+
+    def __init__(self, file):
+        pickle.Pickler.__init__(self, file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.arrays = []
+        self.size = HEADER.size
+
+    def persistent_id(self, obj):
+        if not isinstance(obj, np.ndarray) or obj.dtype.hasobject:
+            return None
+        offset = -(-self.size // ALIGN) * ALIGN
+        self.arrays.append((offset, obj))
+        self.size = offset + obj.nbytes
+        return offset, obj.shape, obj.dtype.str
+
+
+class _ArrayUnpickler(pickle.Unpickler):
+    """
+    Unpickler which rebuilds numpy arrays as read-only views on a buffer.
+    """
+
+    def __init__(self, file, buffer):
+        pickle.Unpickler.__init__(self, file)
+        self.buffer = buffer
+
+    def persistent_load(self, pid):
+        offset, shape, dtype = pid
+        array = np.ndarray(shape, dtype=dtype, buffer=self.buffer, offset=offset)
+        array.flags.writeable = False
+        return array
+
+
+class SharedStudy:
+    """
+    Study stored once in shared memory. Workers attach it by name and read numerical arrays without copy.
+    """
+
+    def __init__(self, study: Study):
+        """
+        Copy study inside a new shared memory block.
+
+        :param study: study to share
+        """
+        file = io.BytesIO()
+        pickler = _ArrayPickler(file)
+        pickler.dump(study)
+        structure = file.getvalue()
+
+        offset = -(-pickler.size // ALIGN) * ALIGN
+        self.shm = SharedMemory(create=True, size=offset + len(structure))
+        buffer = self.shm.buf
+        HEADER.pack_into(buffer, 0, offset, len(structure))
+        for start, array in pickler.arrays:
+            view = np.ndarray(
+                array.shape, dtype=array.dtype, buffer=buffer, offset=start
+            )
+            view[...] = array
+            del view
+        buffer[offset : offset + len(structure)] = structure
+        del buffer
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def close(self):
+        """
+        Release shared memory block and its mapping by current process.
+        Other processes still attached keep their mapping until they detach.
+
+        :return:
+        """
+        if self.shm is not None:
+            detach(self.shm.name)
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+_attached = dict()  # {name: (shared memory or None, study)} kept by each worker process
+_lock = threading.Lock()  # Threads of a worker process attach the same study
+_own_tracker = (
+    False  # Resource tracker of this process isn't the one of SharedStudy process
+)
+
+
+def attach(name: str) -> Study:
+    """
+    Get study shared under name. Study is loaded only once by process then kept in cache.
+    Only last study is kept, an older one is detached when a new one comes.
+
+    :param name: shared memory name
+    :return: study with numerical arrays mapped on shared memory
+    """
+    with _lock:
+        if name not in _attached:
+            _detach_all()
+            shm = _open(name)
+            offset, size = HEADER.unpack_from(shm.buf, 0)
+            structure = io.BytesIO(bytes(shm.buf[offset : offset + size]))
+            _attached[name] = shm, _ArrayUnpickler(structure, shm.buf).load()
+        return _attached[name][1]
+
+
+def register(name: str, study: Study):
+    """
+    Keep a study received by another way than shared memory, like a socket, so attach gives it under name.
+    Like attach, only last study is kept.
+
+    :param name: study name
+    :param study: study
+    :return:
+    """
+    with _lock:
+        _detach_all()
+        _attached[name] = None, study
+
+
+def detach(name: str):
+    """
+    Forget study attached or registered under name and release its mapping in current process.
+
+    :param name: shared memory or study name
+    :return:
+    """
+    with _lock:
+        if name in _attached:
+            _detach(name)
+
+
+def _open(name: str) -> SharedMemory:
+    """
+    Open an existing shared memory block. Block is owned by SharedStudy which unlinks it,
+    a worker must not unlink it at exit (see https://bugs.python.org/issue39959).
+
+    A worker which inherits resource tracker of its parent shares it with SharedStudy, block is already
+    registered there and unregistered by unlink. A worker started before that tracker opens its own one,
+    which would unlink block at exit: block is unregistered from it once opened.
+
+    :param name: shared memory name
+    :return: shared memory
+    """
+    global _own_tracker
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+    if resource_tracker._resource_tracker._fd is None:
+        _own_tracker = (
+            True  # Tracker will be started by this open, only for this process
+        )
+    shm = SharedMemory(name=name)
+    if _own_tracker:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+def _detach(name: str):
+    shm, _ = _attached.pop(name)
+    if shm is None:
+        return
+    try:
+        shm.close()
+    except BufferError:
+        pass  # Arrays still referenced somewhere, mapping will be released with them
+
+
+def _detach_all():
+    for name in list(_attached):
+        _detach(name)
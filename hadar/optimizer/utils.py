@@ -4,9 +4,28 @@
 #  If a copy of the Apache License, version 2.0 was not distributed with this file, you can obtain one at http://www.apache.org/licenses/LICENSE-2.0.
 #  SPDX-License-Identifier: Apache-2.0
 #  This file is part of hadar-simulator, a python adequacy library for everyone.
+import contextlib
+import contextvars
 from abc import ABC, abstractmethod
 import numpy as np
 
+# When set, JSON.convert keeps numpy arrays instead of converting them into lists. Used by binary encodings.
+_keep_arrays = contextvars.ContextVar("keep_arrays", default=False)
+
+
+@contextlib.contextmanager
+def keep_arrays():
+    """
+    Context where to_json keeps numpy arrays as they are, to be encoded as raw buffers.
+
+    :return:
+    """
+    token = _keep_arrays.set(True)
+    try:
+        yield
+    finally:
+        _keep_arrays.reset(token)
+
 
 class DTO:
     """
@@ -52,7 +71,7 @@ class JSON(DTO, ABC):
         elif isinstance(value, np.float64):
             return float(value)
         elif isinstance(value, np.ndarray):
-            return value.tolist()
+            return value if _keep_arrays.get() else value.tolist()
         return value
 
     def to_json(self):
@@ -4,12 +4,11 @@
 #  If a copy of the Apache License, version 2.0 was not distributed with this file, you can obtain one at http://www.apache.org/licenses/LICENSE-2.0.
 #  SPDX-License-Identifier: Apache-2.0
 #  This file is part of hadar-simulator, a python adequacy library for everyone.
-import multiprocessing
-
 import numpy as np
 import pandas as pd
 from numpy.random import randint
 
+from hadar.optimizer.executor import Executor, create_executor
 from hadar.workflow.pipeline import Pipeline, TO_SHUFFLER, Stage
 
 __all__ = ["Shuffler", "Timeline"]
@@ -85,7 +84,7 @@ class TimelinePipeline(Timeline):
 
 def compute(params):
     """
-    Wrapper method to call Timeline.sample used by multiprocessing.Pool.
+    Wrapper method to call Timeline.sample used by executor.
 
     :param params: (timeline, number of scenarios, timeline name)
     :return: (name, sampling)
@@ -135,16 +134,18 @@ class Shuffler:
 
         self.timelines[name] = TimelinePipeline(data, pipeline, sampler=self.sampler)
 
-    def shuffle(self, nb_scn):
+    def shuffle(self, nb_scn, executor: Executor = None):
         """
         Start pipeline generation and shuffle result to create scenario sampling.
 
         :param nb_scn: number of scenarios to sample
+        :param executor: executor computing pipelines, see hadar.optimizer.executor.
+        default None to use a process executor closed at the end
         :return:
         """
+        params = [(tl, nb_scn, name) for name, tl in self.timelines.items()]
         # Compute pipelines
-        pool = multiprocessing.Pool()
-        res = pool.map(
-            compute, ((tl, nb_scn, name) for name, tl in self.timelines.items())
-        )
-        return dict(res)
+        if executor is None:
+            with create_executor() as executor:
+                return dict(executor.map(compute, params))
+        return dict(executor.map(compute, params))
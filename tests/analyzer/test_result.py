@@ -473,6 +473,16 @@ class TestLinkAnalyzer(unittest.TestCase):
             [[-10, -1, -1], [-1, -10, -10]], agg.get_balance(node="b")
         )
 
+    def test_dtype(self):
+        agg = ResultAnalyzer(study=self.study, result=self.result, dtype=np.float32)
+        self.assertEqual(np.float32, agg.link["used"].dtype)
+        self.assertEqual(np.float32, agg.link["avail"].dtype)
+        self.assertEqual(np.float64, agg.link["t"].dtype)
+        self.assertEqual(np.float32, agg.get_balance(node="a").dtype)
+        np.testing.assert_array_equal(
+            [[30, 3, 3], [3, 30, 30]], agg.get_balance(node="a")
+        )
+
     def test_get_elements_inside(self):
         agg = ResultAnalyzer(study=self.study, result=self.result)
         np.testing.assert_array_equal((0, 0, 0, 2, 0, 0), agg.get_elements_inside("a"))
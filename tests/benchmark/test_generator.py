@@ -0,0 +1,59 @@
+#  Copyright (c) 2019-2020, RTE (https://www.rte-france.com)
+#  See AUTHORS.txt
+#  This Source Code Form is subject to the terms of the Apache License, version 2.0.
+#  If a copy of the Apache License, version 2.0 was not distributed with this file, you can obtain one at http://www.apache.org/licenses/LICENSE-2.0.
+#  SPDX-License-Identifier: Apache-2.0
+#  This file is part of hadar-simulator, a python adequacy library for everyone.
+
+import unittest
+
+import numpy as np
+
+from hadar.benchmark.generator import generate_study
+from hadar.optimizer.optimizer import LPOptimizer
+
+
+class TestGenerateStudy(unittest.TestCase):
+    def test_size(self):
+        study = generate_study(
+            nodes=3, link_density=1, horizon=24, nb_scn=2, storages=2, networks=2
+        )
+        self.assertEqual(24, study.horizon)
+        self.assertEqual(2, study.nb_scn)
+        self.assertEqual(["default", "net1"], list(study.networks))
+        for network in study.networks.values():
+            self.assertEqual(["n0", "n1", "n2"], list(network.nodes))
+            # Full density gives both ways links between each pair
+            self.assertEqual(6, sum(len(n.links) for n in network.nodes.values()))
+            for node in network.nodes.values():
+                self.assertEqual(2, len(node.storages))
+                self.assertEqual((2, 24), node.consumptions[0].quantity.value.shape)
+
+    def test_seed(self):
+        a = generate_study(nodes=4, horizon=10, nb_scn=3, seed=1)
+        b = generate_study(nodes=4, horizon=10, nb_scn=3, seed=1)
+        c = generate_study(nodes=4, horizon=10, nb_scn=3, seed=2)
+
+        def load(study):
+            return study.networks["default"].nodes["n0"].consumptions[0].quantity.value
+
+        np.testing.assert_array_equal(load(a), load(b))
+        self.assertFalse(np.array_equal(load(a), load(c)))
+
+    def test_converters(self):
+        study = generate_study(nodes=2, horizon=10, nb_scn=1, converters=3, networks=3)
+        self.assertEqual(["conv0", "conv1", "conv2"], sorted(study.converters))
+
+    def test_wrong_params(self):
+        self.assertRaises(ValueError, lambda: generate_study(nodes=0))
+        self.assertRaises(ValueError, lambda: generate_study(link_density=2))
+        self.assertRaises(ValueError, lambda: generate_study(converters=1))
+
+    def test_solve(self):
+        study = generate_study(
+            nodes=3, horizon=24, nb_scn=2, converters=1, networks=2, link_density=1
+        )
+        result = LPOptimizer(processes=1).solve(study)
+        self.assertEqual(["optimal"] * 2, result.benchmark.status)
+        cons = result.networks["default"].nodes["n0"].consumptions[0]
+        np.testing.assert_array_less(-1e-6, cons.quantity)
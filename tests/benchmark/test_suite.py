@@ -0,0 +1,54 @@
+#  Copyright (c) 2019-2020, RTE (https://www.rte-france.com)
+#  See AUTHORS.txt
+#  This Source Code Form is subject to the terms of the Apache License, version 2.0.
+#  If a copy of the Apache License, version 2.0 was not distributed with this file, you can obtain one at http://www.apache.org/licenses/LICENSE-2.0.
+#  SPDX-License-Identifier: Apache-2.0
+#  This file is part of hadar-simulator, a python adequacy library for everyone.
+
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from hadar.benchmark.suite import measure, run_case, run_scaling, write_tables
+
+
+class TestSuite(unittest.TestCase):
+    def test_measure(self):
+        res, elapsed, peak = measure(lambda: [0] * 10 ** 5, repeat=2)
+        self.assertEqual(10 ** 5, len(res))
+        self.assertGreater(elapsed, 0)
+        self.assertGreaterEqual(peak, 8 * 10 ** 5)
+
+        _, _, peak = measure(lambda: 1, memory=False)
+        self.assertIsNone(peak)
+
+    def test_run_case(self):
+        row = run_case(dict(nodes=2, horizon=12, nb_scn=3), processes=1)
+        self.assertEqual(2, row["nodes"])
+        for col in ["optimizer", "analyzer", "shuffler"]:
+            self.assertGreater(row[col], 0)
+            self.assertGreater(row[col + "_memory"], 0)
+        self.assertGreater(row["variables"], 0)
+
+    def test_run_scaling(self):
+        df = run_scaling(
+            grid=dict(nb_scn=[1, 2], nodes=[1, 2]),
+            base=dict(horizon=6),
+            processes=1,
+            memory=False,
+        )
+        self.assertEqual(4, df.shape[0])
+        self.assertEqual([1, 1, 2, 2], df["nb_scn"].tolist())
+        self.assertEqual([1, 2, 1, 2], df["nodes"].tolist())
+        self.assertTrue((df["horizon"] == 6).all())
+
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = write_tables(df, os.path.join(tmp, "bench"))
+            timing = pd.read_csv(paths["timing"])
+            memory = pd.read_csv(paths["memory"])
+        self.assertIn("optimizer", timing.columns)
+        self.assertNotIn("optimizer_memory", timing.columns)
+        self.assertIn("optimizer_memory", memory.columns)
+        self.assertEqual(df["nb_scn"].tolist(), memory["nb_scn"].tolist())
@@ -0,0 +1,68 @@
+#  Copyright (c) 2019-2020, RTE (https://www.rte-france.com)
+#  See AUTHORS.txt
+#  This Source Code Form is subject to the terms of the Apache License, version 2.0.
+#  If a copy of the Apache License, version 2.0 was not distributed with this file, you can obtain one at http://www.apache.org/licenses/LICENSE-2.0.
+#  SPDX-License-Identifier: Apache-2.0
+#  This file is part of hadar-simulator, a python adequacy library for everyone.
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from hadar.optimizer.domain.input import Study
+
+
+class TestArchive(unittest.TestCase):
+    def setUp(self) -> None:
+        self.study = (
+            Study(horizon=3, nb_scn=2)
+            .network()
+            .node("a")
+            .consumption(name="load", cost=10 ** 6, quantity=[[1, 2, 3], [4, 5, 6]])
+            .production(name="prod", cost=[1, 2, 3], quantity=12)
+            .storage(
+                name="cell", capacity=10, flow_in=1, flow_out=1, eff=[[0.5], [0.6]]
+            )
+            .to_converter(name="conv", ratio=[0.5, 0.6, 0.7])
+            .network("gas")
+            .node("b")
+            .converter(name="conv", to_network="gas", to_node="b", max=10)
+            .build()
+        )
+
+    def test_save_load(self):
+        with tempfile.TemporaryDirectory() as path:
+            path = os.path.join(path, "study.hdr")
+            self.study.save(path)
+
+            res = Study.load(path)
+            self.assertEqual(self.study.to_json(), res.to_json())
+
+            quantity = res.networks["default"].nodes["a"].consumptions[0].quantity
+            self.assertIsInstance(quantity.value, np.memmap)
+            self.assertFalse(quantity.value.flags.writeable)
+            self.assertTrue(quantity.value.flags.aligned)
+            self.assertEqual(0, quantity.value.ctypes.data % 64)
+            np.testing.assert_array_equal([[1, 2, 3], [4, 5, 6]], quantity.value)
+
+            ratio = res.converters["conv"].src_ratios[("default", "a")]
+            np.testing.assert_array_equal([0.5, 0.6, 0.7], ratio.value)
+            eff = res.networks["default"].nodes["a"].storages[0].eff
+            np.testing.assert_array_equal([[0.5], [0.6]], eff.value)
+
+            # Arrays are npy members, file is also readable by numpy
+            with np.load(path) as npz:
+                self.assertIn("study.json", npz.files)
+
+            del res, quantity, ratio, eff
+
+    def test_load_without_mmap(self):
+        with tempfile.TemporaryDirectory() as path:
+            path = os.path.join(path, "study.hdr")
+            self.study.save(path)
+
+            res = Study.load(path, mmap=False)
+            quantity = res.networks["default"].nodes["a"].consumptions[0].quantity
+            self.assertNotIsInstance(quantity.value, np.memmap)
+            self.assertEqual(self.study.to_json(), res.to_json())
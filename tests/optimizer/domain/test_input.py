@@ -6,6 +6,7 @@
 #  This file is part of hadar-simulator, a python adequacy library for everyone.
 import json
 import unittest
+import numpy as np
 
 from hadar.optimizer.domain.input import (
     Study,
@@ -283,3 +284,21 @@ class TestStudy(unittest.TestCase):
         s = json.loads(j)
         s = Study.from_json(s)
         self.assertEqual(self.study, s)
+
+    def test_dtype(self):
+        study = (
+            Study(horizon=2, dtype=np.float32)
+            .network()
+            .node("a")
+            .consumption(name="load", quantity=[10, 20], cost=1)
+            .build()
+        )
+        cons = study.networks["default"].nodes["a"].consumptions[0]
+        self.assertEqual(np.float32, cons.quantity.value.dtype)
+
+        s = Study.from_json(json.loads(json.dumps(study.to_json())))
+        self.assertEqual("float32", s.dtype)
+        parsed = s.networks["default"].nodes["a"].consumptions[0]
+        self.assertEqual(np.float32, parsed.quantity.value.dtype)
+        np.testing.assert_array_equal(cons.quantity.value, parsed.quantity.value)
+        np.testing.assert_array_equal(cons.cost.value, parsed.cost.value)
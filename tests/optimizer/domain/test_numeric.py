@@ -58,3 +58,54 @@ class TestNumericalValue(unittest.TestCase):
         np.testing.assert_array_equal(
             [0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 2, 2, 2, 2, 2], v.flatten()
         )
+
+    def test_dtype(self):
+        factory = NumericalValueFactory(5, 3, dtype=np.float32)
+        self.assertEqual(np.float32, factory.create([0, 1, 2, 3, 4]).value.dtype)
+        self.assertEqual(42, factory.create(42).value)
+
+        # Arrays already in right type are not copied
+        value = np.ones((3, 5), dtype=np.float32)
+        self.assertIs(value, factory.create(value).value)
+
+        self.assertNotEqual(NumericalValueFactory(5, 3), factory)
+        self.assertEqual(np.int64, self.factory.create(np.arange(5)).value.dtype)
+
+    def test_scenario(self):
+        v = self.factory.create(42)
+        np.testing.assert_array_equal([42] * 5, v.scenario(2))
+        self.assertRaises(IndexError, lambda: v.scenario(3))
+
+        v = self.factory.create(np.arange(5))
+        np.testing.assert_array_equal(range(5), v.scenario(1))
+        self.assertTrue(np.shares_memory(v.value, v.scenario(1)))
+        self.assertRaises(IndexError, lambda: v.scenario(3))
+
+        v = self.factory.create(np.arange(3).reshape(3, 1))
+        np.testing.assert_array_equal([2] * 5, v.scenario(2))
+        self.assertTrue(np.shares_memory(v.value, v.scenario(2)))
+
+        v = self.factory.create(np.arange(15).reshape(3, 5))
+        np.testing.assert_array_equal([5, 6, 7, 8, 9], v.scenario(1))
+        self.assertTrue(np.shares_memory(v.value, v.scenario(1)))
+
+    def test_block(self):
+        v = self.factory.create(42)
+        np.testing.assert_array_equal([[42] * 3] * 2, v.block([0, 2], slice(1, 4)))
+        self.assertEqual((3, 5), v.block(slice(None), slice(None)).shape)
+        self.assertRaises(IndexError, lambda: v.block([3], slice(None)))
+
+        v = self.factory.create(np.arange(5))
+        np.testing.assert_array_equal([[1, 2, 3]] * 2, v.block([0, 2], slice(1, 4)))
+        self.assertTrue(np.shares_memory(v.value, v.block(slice(0, 2), slice(1, 4))))
+        self.assertRaises(IndexError, lambda: v.block([3], slice(None)))
+
+        v = self.factory.create(np.arange(3).reshape(3, 1))
+        np.testing.assert_array_equal([[0] * 3, [2] * 3], v.block([0, 2], [1, 2, 3]))
+        self.assertRaises(IndexError, lambda: v.block([0], [5]))
+
+        v = self.factory.create(np.arange(15).reshape(3, 5))
+        np.testing.assert_array_equal(
+            [[1, 2, 3], [11, 12, 13]], v.block([0, 2], slice(1, 4))
+        )
+        self.assertTrue(np.shares_memory(v.value, v.block(slice(1, 3), slice(1, 4))))
@@ -8,6 +8,7 @@ import json
 import unittest
 
 from hadar.optimizer.domain.output import *
+from hadar.optimizer.domain.output import Benchmark
 
 
 class TestResult(unittest.TestCase):
@@ -44,3 +45,29 @@ class TestResult(unittest.TestCase):
         string = json.dumps(result.to_json())
         r = Result.from_json(json.loads(string))
         self.assertEqual(result, r)
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_records(self):
+        bench = Benchmark()
+        bench.add(scenarios=1, modeler=0.1, solver=0.3, iterations=4, status="optimal")
+        bench.add(scenarios=0, modeler=0.2, solver=0.5, iterations=6, rss=1024)
+
+        df = bench.to_df()
+
+        self.assertEqual([1, 0], list(df.index))
+        self.assertEqual("scenario", df.index.name)
+        self.assertEqual(Benchmark.RECORDS[1:], list(df.columns))
+        self.assertEqual([4, 6], list(df["iterations"]))
+        self.assertEqual(["optimal", None], list(df["status"]))
+        self.assertRaises(ValueError, lambda: bench.add(unknown=1))
+        self.assertEqual(2, len(bench.scenarios))
+
+    def test_json(self):
+        bench = Benchmark(sharing=0.5, saved=2)
+        bench.add(scenarios=0, modeler=0.1, workers=12)
+
+        res = Benchmark.from_json(json.loads(json.dumps(bench.to_json())))
+
+        self.assertEqual(bench, res)
+        self.assertEqual(12, res.workers[0])
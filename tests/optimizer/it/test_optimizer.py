@@ -25,6 +25,9 @@ class TestOptimizer(unittest.TestCase):
     def setUp(self) -> None:
         self.optimizer = hd.LPOptimizer()
 
+    def tearDown(self) -> None:
+        self.optimizer.close()
+
     def test_merit_order(self):
         """
         Capacity
@@ -448,6 +451,38 @@ class TestOptimizer(unittest.TestCase):
             res,
         )
 
+    def test_storage_rolling_horizon(self):
+        study = (
+            hd.Study(horizon=6, nb_scn=2)
+            .network()
+            .node("a")
+            .production(
+                name="nuclear",
+                cost=[20, 21, 22, 23, 24, 25],
+                quantity=[10, 10, 10, 0, 5, 10],
+            )
+            .consumption(
+                name="load",
+                cost=10 ** 6,
+                quantity=[[20, 10, 0, 10, 15, 5], [0, 0, 5, 10, 10, 15]],
+            )
+            .storage(
+                name="cell",
+                capacity=30,
+                flow_in=20,
+                flow_out=20,
+                init_capacity=15,
+                eff=0.5,
+            )
+            .build()
+        )
+
+        # Overlap covers the remaining horizon, rolling gives the same result than a whole solve
+        with hd.LPOptimizer(window=2, overlap=4) as optimizer:
+            res = optimizer.solve(study)
+
+        assert_result(self, self.optimizer.solve(study), res)
+
     def test_multi_energies(self):
         study = (
             hd.Study(horizon=1)
@@ -0,0 +1,181 @@
+#  Copyright (c) 2019-2020, RTE (https://www.rte-france.com)
+#  See AUTHORS.txt
+#  This Source Code Form is subject to the terms of the Apache License, version 2.0.
+#  If a copy of the Apache License, version 2.0 was not distributed with this file, you can obtain one at http://www.apache.org/licenses/LICENSE-2.0.
+#  SPDX-License-Identifier: Apache-2.0
+#  This file is part of hadar-simulator, a python adequacy library for everyone.
+import unittest
+
+import numpy as np
+from ortools.linear_solver.linear_solver_pb2 import MPModelProto
+
+from hadar.optimizer.domain.input import Study
+from hadar.optimizer.lp.backend import (
+    _encode_model,
+    create_backend,
+    OrToolsBackend,
+    ProtoModel,
+    ScipyBackend,
+)
+from hadar.optimizer.lp.modeler import LPModel, MatrixModeler
+
+try:
+    import scipy
+except ImportError:
+    scipy = None
+
+
+class TestEncodeModel(unittest.TestCase):
+    def test_encode(self):
+        # Input, 200 variables to have multi bytes varint for index
+        model = LPModel(
+            lb=np.zeros(200),
+            ub=np.arange(200) + 0.5,
+            cost=np.arange(200) * 2.0,
+            rows=np.array([0, 0, 2, 2, 2]),
+            cols=np.array([1, 199, 0, 150, 3]),
+            coeffs=np.array([1.0, -1.0, 0.5, 2.0, -3.0]),
+            row_lb=np.array([1.0, 0.0, -5.0]),
+            row_ub=np.array([1.0, 0.0, 7.0]),
+        )
+
+        # Test
+        proto = MPModelProto.FromString(_encode_model(model))
+
+        self.assertEqual(200, len(proto.variable))
+        self.assertEqual(199.5, proto.variable[199].upper_bound)
+        self.assertEqual(0, proto.variable[199].lower_bound)
+        self.assertEqual(398, proto.variable[199].objective_coefficient)
+
+        self.assertEqual(3, len(proto.constraint))
+        self.assertEqual([1, 199], list(proto.constraint[0].var_index))
+        self.assertEqual([1.0, -1.0], list(proto.constraint[0].coefficient))
+        self.assertEqual([], list(proto.constraint[1].var_index))
+        self.assertEqual([0, 150, 3], list(proto.constraint[2].var_index))
+        self.assertEqual([0.5, 2.0, -3.0], list(proto.constraint[2].coefficient))
+        self.assertEqual(-5, proto.constraint[2].lower_bound)
+        self.assertEqual(7, proto.constraint[2].upper_bound)
+
+
+class TestProtoModel(unittest.TestCase):
+    def test_update(self):
+        # Input
+        rows, cols = np.array([0, 0, 1, 2]), np.array([0, 2, 1, 200])
+        model = LPModel(
+            lb=np.zeros(201),
+            ub=np.ones(201),
+            cost=np.zeros(201),
+            rows=rows,
+            cols=cols,
+            coeffs=np.array([1.0, 2.0, 3.0, 4.0]),
+            row_lb=np.zeros(3),
+            row_ub=np.zeros(3),
+        )
+        other = LPModel(
+            lb=np.arange(201.0),
+            ub=np.arange(201.0) + 1,
+            cost=np.arange(201.0) * 3,
+            rows=rows,
+            cols=cols,
+            coeffs=np.array([-1.0, 0.5, 7.0, -4.0]),
+            row_lb=np.array([1.0, 2.0, 3.0]),
+            row_ub=np.array([4.0, 5.0, 6.0]),
+        )
+
+        # Test
+        proto = ProtoModel(model)
+        proto.update(other)
+        self.assertEqual(_encode_model(other), proto.tobytes())
+
+
+class TestBackend(unittest.TestCase):
+    def setUp(self) -> None:
+        study = (
+            Study(horizon=3)
+            .network()
+            .node("a")
+            .consumption(
+                name="load",
+                cost=[10 ** 6, 2 * 10 ** 6, 3 * 10 ** 6],
+                quantity=[10, 20, 30],
+            )
+            .production(name="prod", cost=10, quantity=[15, 15, 15])
+            .storage(name="cell", capacity=10, flow_in=5, flow_out=5, eff=0.9)
+            .build()
+        )
+        self.modeler = MatrixModeler(study)
+        self.model = self.modeler.build(0)
+
+    def solve(self, backend):
+        backend.load(self.model)
+        solution, iterations = backend.solve()
+        return self.modeler.to_output(0, solution)
+
+    def test_ortools(self):
+        exp = self.solve(create_backend())
+        for name in ["PDLP", "CLP"]:
+            np.testing.assert_array_almost_equal(
+                exp, self.solve(create_backend(name)), decimal=3
+            )
+
+    def test_ortools_params(self):
+        backend = OrToolsBackend(
+            "GLOP",
+            params=dict(
+                time_limit=10,
+                threads=1,
+                primal_tolerance=1e-7,
+                dual_tolerance=1e-7,
+                presolve=False,
+                lp_algorithm="primal",
+            ),
+        )
+        np.testing.assert_array_almost_equal(
+            self.solve(create_backend()), self.solve(backend)
+        )
+
+        self.assertRaises(ValueError, lambda: OrToolsBackend(params=dict(foo=1)))
+        self.assertRaises(ValueError, lambda: OrToolsBackend("FOO"))
+
+    def infeasible(self, backend):
+        # Storage can't hold its initial capacity
+        study = (
+            Study(horizon=3)
+            .network()
+            .node("a")
+            .storage(name="cell", capacity=10, flow_in=5, flow_out=5, init_capacity=20)
+            .build()
+        )
+        model = MatrixModeler(study).build(0)
+        backend.load(model)
+        solution, _ = backend.solve()
+        self.assertEqual("infeasible", backend.status)
+        np.testing.assert_array_equal(np.zeros(model.nb_vars), solution)
+
+    def test_ortools_infeasible(self):
+        self.infeasible(create_backend())
+
+    @unittest.skipIf(scipy is None, "scipy not installed")
+    def test_scipy(self):
+        np.testing.assert_array_almost_equal(
+            self.solve(create_backend()), self.solve(create_backend("scipy"))
+        )
+
+    @unittest.skipIf(scipy is None, "scipy not installed")
+    def test_scipy_infeasible(self):
+        self.infeasible(create_backend("scipy"))
+
+    @unittest.skipIf(scipy is None, "scipy not installed")
+    def test_default_update(self):
+        # Backend without its own update loads new model again
+        backend = create_backend("scipy")
+        backend.load(self.modeler.build(0))
+        backend.update(self.model, self.model)
+        self.assertIs(self.model, backend.model)
+        np.testing.assert_array_almost_equal(
+            self.solve(create_backend()),
+            self.modeler.to_output(0, backend.solve()[0]),
+        )
+
+    def test_scipy_params(self):
+        self.assertRaises(ValueError, lambda: ScipyBackend(params=dict(threads=1)))
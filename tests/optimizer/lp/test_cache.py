@@ -0,0 +1,120 @@
+#  Copyright (c) 2019-2020, RTE (https://www.rte-france.com)
+#  See AUTHORS.txt
+#  This Source Code Form is subject to the terms of the Apache License, version 2.0.
+#  If a copy of the Apache License, version 2.0 was not distributed with this file, you can obtain one at http://www.apache.org/licenses/LICENSE-2.0.
+#  SPDX-License-Identifier: Apache-2.0
+#  This file is part of hadar-simulator, a python adequacy library for everyone.
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from hadar.optimizer.domain.input import Study
+from hadar.optimizer.executor import SerialExecutor
+from hadar.optimizer.lp.cache import ResultCache
+from hadar.optimizer.lp.optimizer import solve_lp
+
+
+def build_study(quantity):
+    return (
+        Study(horizon=2, nb_scn=len(quantity))
+        .network()
+        .node("a")
+        .consumption(name="load", cost=10 ** 6, quantity=quantity)
+        .production(name="prod", cost=10, quantity=[15, 15])
+        .build()
+    )
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(self.directory.name, max_size=1000)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_get_put(self):
+        self.assertIsNone(self.cache.get("abc"))
+        self.cache.put("abc", np.array([[1.0, 2.0]]))
+        np.testing.assert_array_equal([[1, 2]], self.cache.get("abc"))
+
+    def test_corrupted(self):
+        with open(os.path.join(self.directory.name, "abc.npy"), "wb") as file:
+            file.write(b"garbage")
+        self.assertIsNone(self.cache.get("abc"))
+        self.assertEqual([], os.listdir(self.directory.name))
+
+    def test_evict(self):
+        for i, key in enumerate(["a", "b", "c"]):
+            self.cache.put(
+                key, np.zeros(40)
+            )  # 320 bytes of data plus 128 bytes of header
+            path = os.path.join(self.directory.name, key + ".npy")
+            os.utime(path, (i, i))
+        self.cache.get("a")  # a becomes most recently used
+
+        self.cache.evict()
+
+        self.assertEqual(["a.npy", "c.npy"], sorted(os.listdir(self.directory.name)))
+
+    def test_keys(self):
+        keys = self.cache.keys(build_study([[1, 2], [3, 4], [1, 2]]))
+        self.assertEqual(keys[0], keys[2])
+        self.assertNotEqual(keys[0], keys[1])
+
+        # Same scenario inside another study gives same key
+        other = self.cache.keys(build_study([[5, 6], [3, 4]]))
+        self.assertEqual(keys[1], other[1])
+        self.assertNotEqual(keys[0], other[0])
+
+        # Solve configuration changes key
+        self.assertNotEqual(
+            keys, self.cache.keys(build_study([[1, 2], [3, 4], [1, 2]]), "HIGHS")
+        )
+
+    def test_solve_lp(self):
+        cache = ResultCache(self.directory.name)
+
+        res = solve_lp(build_study([[10, 20], [5, 5]]), cache=cache)
+        self.assertEqual(0, res.benchmark.cached)
+        self.assertEqual(2, len(os.listdir(self.directory.name)))
+
+        res = solve_lp(build_study([[5, 5], [10, 20], [30, 0]]), cache=cache)
+        self.assertEqual(2, res.benchmark.cached)
+        self.assertEqual(1, len(res.benchmark.solver))
+        np.testing.assert_array_equal(
+            [[5, 5], [10, 15], [15, 0]],
+            res.networks["default"].nodes["a"].consumptions[0].quantity,
+        )
+
+    def test_solve_lp_all_cached(self):
+        cache = ResultCache(self.directory.name)
+        study = build_study([[10, 20], [5, 5]])
+        solve_lp(study, cache=cache)
+
+        # Study isn't shared when nothing is left to solve
+        executor = SerialExecutor()
+        with mock.patch.object(executor, "share") as share:
+            res = solve_lp(study, pool=executor, cache=cache)
+        share.assert_not_called()
+        self.assertEqual(2, res.benchmark.cached)
+        np.testing.assert_array_equal(
+            [[10, 15], [5, 5]],
+            res.networks["default"].nodes["a"].consumptions[0].quantity,
+        )
+
+    def test_solve_lp_infeasible(self):
+        cache = ResultCache(self.directory.name)
+        study = (
+            Study(horizon=2)
+            .network()
+            .node("a")
+            .storage(name="cell", capacity=10, flow_in=5, flow_out=5, init_capacity=20)
+            .build()
+        )
+
+        solve_lp(study, cache=cache)
+        self.assertEqual([], os.listdir(self.directory.name))
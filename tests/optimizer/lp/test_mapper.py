@@ -7,16 +7,10 @@
 
 import unittest
 
+import numpy as np
+
 from hadar.optimizer.domain.input import Study
-from hadar.optimizer.lp.domain import (
-    LPLink,
-    LPConsumption,
-    LPProduction,
-    LPNode,
-    LPStorage,
-    LPConverter,
-)
-from hadar.optimizer.lp.mapper import InputMapper, OutputMapper
+from hadar.optimizer.lp.mapper import OutputMapper
 from hadar.optimizer.domain.output import (
     OutputConsumption,
     OutputLink,
@@ -27,11 +21,10 @@ from hadar.optimizer.domain.output import (
     OutputStorage,
     OutputConverter,
 )
-from tests.optimizer.lp.ortools_mock import MockSolver, MockNumVar
 from tests.utils import assert_result
 
 
-class TestInputMapper(unittest.TestCase):
+class TestOutputMapper(unittest.TestCase):
     def test_map_consumption(self):
         # Input
         study = (
@@ -46,298 +39,61 @@ class TestInputMapper(unittest.TestCase):
             .build()
         )
 
-        s = MockSolver()
-
-        mapper = InputMapper(solver=s, study=study)
-
-        # Expected
-        suffix = "inside network=default on node=a at t=0 for scn=0"
-        out_cons_0 = [
-            LPConsumption(
-                name="load",
-                cost=0.01,
-                quantity=10,
-                variable=MockNumVar(0, 10, "lol=load %s" % suffix),
-            )
-        ]
-        out_node_0 = LPNode(
-            consumptions=out_cons_0, productions=[], storages=[], links=[]
-        )
-
-        self.assertEqual(
-            out_node_0, mapper.get_node_var(network="default", node="a", t=0, scn=0)
-        )
-
-        suffix = "inside network=default on node=a at t=1 for scn=1"
-        out_cons_1 = [
-            LPConsumption(
-                name="load",
-                cost=0.2,
-                quantity=2,
-                variable=MockNumVar(0, 2, "lol=load %s" % suffix),
-            )
-        ]
-        out_node_1 = LPNode(
-            consumptions=out_cons_1, productions=[], storages=[], links=[]
-        )
-
-        self.assertEqual(
-            out_node_1, mapper.get_node_var(network="default", node="a", t=1, scn=1)
-        )
-
-    def test_map_production(self):
-        # Input
-        study = (
-            Study(horizon=2, nb_scn=2)
-            .network()
-            .node("a")
-            .production(
-                name="nuclear",
-                quantity=[[12, 2], [21, 20]],
-                cost=[[0.12, 0.2], [0.21, 0.02]],
-            )
-            .build()
-        )
-
-        s = MockSolver()
-
-        mapper = InputMapper(solver=s, study=study)
+        mapper = OutputMapper(study=study)
+        mapper.set_scenario(scn=0, output=[[5, 1]])
+        mapper.set_scenario(scn=1, output=[[15, 2]])
 
         # Expected
-        suffix = "inside network=default on node=a at t=0 for scn=0"
-        out_prod_0 = [
-            LPProduction(
-                name="nuclear",
-                cost=0.12,
-                quantity=12,
-                variable=MockNumVar(0, 12.0, "prod=nuclear %s" % suffix),
-            )
-        ]
-        out_node_0 = LPNode(
-            consumptions=[], productions=out_prod_0, storages=[], links=[]
-        )
-
-        self.assertEqual(
-            out_node_0, mapper.get_node_var(network="default", node="a", t=0, scn=0)
-        )
-
-        suffix = "inside network=default on node=a at t=1 for scn=1"
-
-        out_prod_1 = [
-            LPProduction(
-                name="nuclear",
-                cost=0.02,
-                quantity=20,
-                variable=MockNumVar(0, 20.0, "prod=nuclear %s" % suffix),
-            )
-        ]
-        out_node_1 = LPNode(
-            consumptions=[], productions=out_prod_1, storages=[], links=[]
+        cons = OutputConsumption(name="load", quantity=[[5, 1], [15, 2]])
+        nodes = {
+            "a": OutputNode(consumptions=[cons], productions=[], storages=[], links=[])
+        }
+        expected = Result(
+            networks={"default": OutputNetwork(nodes=nodes)}, converters={}
         )
 
-        self.assertEqual(
-            out_node_1, mapper.get_node_var(network="default", node="a", t=1, scn=1)
-        )
+        assert_result(self, expected=expected, result=mapper.get_result())
 
-    def test_map_storage(self):
+    def test_map_window(self):
         # Input
         study = (
-            Study(horizon=2, nb_scn=2)
+            Study(horizon=3, nb_scn=1)
             .network()
             .node("a")
-            .storage(
-                name="cell",
-                capacity=10,
-                flow_in=1,
-                flow_out=1,
-                cost=1,
-                init_capacity=2,
-                eff=0.9,
-            )
+            .consumption(name="load", quantity=10, cost=1)
             .build()
         )
 
-        s = MockSolver()
-
-        mapper = InputMapper(solver=s, study=study)
-
-        # Expected
-        suffix = "inside network=default on node=a at t=0 for scn=0"
-        out_stor_0 = [
-            LPStorage(
-                name="cell",
-                capacity=10,
-                var_capacity=MockNumVar(0, 10, "storage_capacity=cell %s" % suffix),
-                flow_in=1,
-                var_flow_in=MockNumVar(0, 1, "storage_flow_in=cell %s" % suffix),
-                flow_out=1,
-                var_flow_out=MockNumVar(0, 1, "storage_flow_out=cell %s" % suffix),
-                cost=1,
-                init_capacity=2,
-                eff=0.9,
-            )
-        ]
-        out_node_0 = LPNode(
-            consumptions=[], productions=[], storages=out_stor_0, links=[]
-        )
-
-        self.assertEqual(
-            out_node_0, mapper.get_node_var(network="default", node="a", t=0, scn=0)
-        )
-
-        suffix = "inside network=default on node=a at t=1 for scn=1"
-        out_stor_1 = [
-            LPStorage(
-                name="cell",
-                capacity=10,
-                var_capacity=MockNumVar(0, 10, "storage_capacity=cell %s" % suffix),
-                flow_in=1,
-                var_flow_in=MockNumVar(0, 1, "storage_flow_in=cell %s" % suffix),
-                flow_out=1,
-                var_flow_out=MockNumVar(0, 1, "storage_flow_out=cell %s" % suffix),
-                cost=1,
-                init_capacity=2,
-                eff=0.9,
-            )
-        ]
-        out_node_1 = LPNode(
-            consumptions=[], productions=[], storages=out_stor_1, links=[]
-        )
-
-        self.assertEqual(
-            out_node_1, mapper.get_node_var(network="default", node="a", t=1, scn=1)
-        )
-
-    def test_map_links(self):
-        # Input
-        study = (
-            Study(horizon=2, nb_scn=2)
-            .network()
-            .node("a")
-            .node("be")
-            .link(
-                src="a",
-                dest="be",
-                quantity=[[10, 3], [20, 30]],
-                cost=[[0.01, 0.3], [0.02, 0.03]],
-            )
-            .build()
-        )
-
-        s = MockSolver()
-
-        mapper = InputMapper(solver=s, study=study)
-
-        # Expected
-        suffix = "inside network=default on node=a at t=0 for scn=0"
-        out_link_0 = [
-            LPLink(
-                src="a",
-                dest="be",
-                cost=0.01,
-                quantity=10,
-                variable=MockNumVar(0, 10.0, "link=be %s" % suffix),
-            )
-        ]
-        out_node_0 = LPNode(
-            consumptions=[], productions=[], storages=[], links=out_link_0
-        )
-
-        self.assertEqual(
-            out_node_0, mapper.get_node_var(network="default", node="a", t=0, scn=0)
-        )
-
-        suffix = "inside network=default on node=a at t=1 for scn=1"
-        out_link_1 = [
-            LPLink(
-                src="a",
-                dest="be",
-                cost=0.03,
-                quantity=30,
-                variable=MockNumVar(0, 30.0, "link=be %s" % suffix),
-            )
-        ]
-        out_node_1 = LPNode(
-            consumptions=[], productions=[], storages=[], links=out_link_1
-        )
-
-        self.assertEqual(
-            out_node_1, mapper.get_node_var(network="default", node="a", t=1, scn=1)
-        )
-
-    def test_map_converter(self):
-        # Mock
-        s = MockSolver()
-
-        # Input
-        study = (
-            Study(horizon=1)
-            .network("gas")
-            .node("a")
-            .to_converter(name="conv", ratio=0.5)
-            .network()
-            .node("b")
-            .converter(name="conv", to_network="default", to_node="b", max=100)
-            .build()
-        )
-
-        mapper = InputMapper(solver=s, study=study)
+        mapper = OutputMapper(study=study)
+        mapper.set_scenario(scn=0, output=[[5, 1]], start=0)
+        mapper.set_scenario(scn=0, output=[[7]], start=2)
 
         # Expected
-        suffix = "at t=0 for scn=0"
-        out_conv_0 = LPConverter(
-            name="conv",
-            src_ratios={("gas", "a"): 0.5},
-            dest_network="default",
-            dest_node="b",
-            cost=0,
-            max=100,
-            var_flow_dest=MockNumVar(0, 100, "flow_dest conv %s" % suffix),
-            var_flow_src={
-                ("gas", "a"): MockNumVar(0, 200, "flow_src conv gas:a %s" % suffix)
-            },
+        cons = OutputConsumption(name="load", quantity=[[5, 1, 7]])
+        nodes = {
+            "a": OutputNode(consumptions=[cons], productions=[], storages=[], links=[])
+        }
+        expected = Result(
+            networks={"default": OutputNetwork(nodes=nodes)}, converters={}
         )
 
-        self.assertEqual(out_conv_0, mapper.get_conv_var(name="conv", t=0, scn=0))
-
+        assert_result(self, expected=expected, result=mapper.get_result())
 
-class TestOutputMapper(unittest.TestCase):
-    def test_map_consumption(self):
+    def test_map_scenarios(self):
         # Input
         study = (
-            Study(horizon=2, nb_scn=2)
+            Study(horizon=2, nb_scn=3)
             .network()
             .node("a")
-            .consumption(
-                name="load",
-                quantity=[[10, 1], [20, 2]],
-                cost=[[0.01, 0.1], [0.02, 0.2]],
-            )
+            .consumption(name="load", quantity=10, cost=1)
             .build()
         )
 
         mapper = OutputMapper(study=study)
-
-        out_cons_0 = [LPConsumption(name="load", cost=0.01, quantity=10, variable=5)]
-        mapper.set_node_var(
-            network="default",
-            node="a",
-            t=0,
-            scn=0,
-            vars=LPNode(consumptions=out_cons_0, productions=[], storages=[], links=[]),
-        )
-
-        out_cons_1 = [LPConsumption(name="load", cost=0.2, quantity=20, variable=5)]
-        mapper.set_node_var(
-            network="default",
-            node="a",
-            t=1,
-            scn=1,
-            vars=LPNode(consumptions=out_cons_1, productions=[], storages=[], links=[]),
-        )
+        mapper.set_scenarios(scns=[0, 2], output=[[[5, 1]], [[7, 8]]])
 
         # Expected
-        cons = OutputConsumption(name="load", quantity=[[5, 0], [0, 15]])
+        cons = OutputConsumption(name="load", quantity=[[5, 1], [0, 0], [7, 8]])
         nodes = {
             "a": OutputNode(consumptions=[cons], productions=[], storages=[], links=[])
         }
@@ -362,27 +118,10 @@ class TestOutputMapper(unittest.TestCase):
         )
 
         mapper = OutputMapper(study=study)
-
-        out_prod_0 = [LPProduction(name="nuclear", cost=0.12, quantity=12, variable=12)]
-        mapper.set_node_var(
-            network="default",
-            node="a",
-            t=0,
-            scn=0,
-            vars=LPNode(consumptions=[], productions=out_prod_0, storages=[], links=[]),
-        )
-
-        out_prod_1 = [LPProduction(name="nuclear", cost=0.21, quantity=2, variable=112)]
-        mapper.set_node_var(
-            network="default",
-            node="a",
-            t=1,
-            scn=1,
-            vars=LPNode(consumptions=[], productions=out_prod_1, storages=[], links=[]),
-        )
+        mapper.set_scenario(scn=1, output=[[0, 112]])
 
         # Expected
-        prod = OutputProduction(name="nuclear", quantity=[[12, 0], [0, 112]])
+        prod = OutputProduction(name="nuclear", quantity=[[0, 0], [0, 112]])
         nodes = {
             "a": OutputNode(consumptions=[], productions=[prod], storages=[], links=[])
         }
@@ -411,57 +150,15 @@ class TestOutputMapper(unittest.TestCase):
         )
 
         mapper = OutputMapper(study=study)
-
-        out_stor_0 = [
-            LPStorage(
-                name="cell",
-                capacity=10,
-                flow_in=1,
-                flow_out=1,
-                init_capacity=2,
-                eff=0.9,
-                cost=1,
-                var_capacity=5,
-                var_flow_in=2,
-                var_flow_out=4,
-            )
-        ]
-        mapper.set_node_var(
-            network="default",
-            node="a",
-            t=0,
-            scn=0,
-            vars=LPNode(consumptions=[], productions=[], storages=out_stor_0, links=[]),
-        )
-
-        out_stor_1 = [
-            LPStorage(
-                name="cell",
-                capacity=10,
-                flow_in=1,
-                flow_out=1,
-                init_capacity=2,
-                eff=0.9,
-                cost=1,
-                var_capacity=55,
-                var_flow_in=22,
-                var_flow_out=44,
-            )
-        ]
-        mapper.set_node_var(
-            network="default",
-            node="a",
-            t=1,
-            scn=1,
-            vars=LPNode(consumptions=[], productions=[], storages=out_stor_1, links=[]),
-        )
+        mapper.set_scenario(scn=0, output=[[5, 6], [2, 3], [4, 5]])
+        mapper.set_scenario(scn=1, output=[[55, 66], [22, 33], [44, 55]])
 
         # Expected
         stor = OutputStorage(
             name="cell",
-            capacity=[[5, 0], [0, 55]],
-            flow_in=[[2, 0], [0, 22]],
-            flow_out=[[4, 0], [0, 44]],
+            capacity=[[5, 6], [55, 66]],
+            flow_in=[[2, 3], [22, 33]],
+            flow_out=[[4, 5], [44, 55]],
         )
         nodes = {
             "a": OutputNode(consumptions=[], productions=[], storages=[stor], links=[])
@@ -489,24 +186,8 @@ class TestOutputMapper(unittest.TestCase):
         )
 
         mapper = OutputMapper(study=study)
-
-        out_link_0 = [LPLink(src="a", dest="be", cost=0.01, quantity=10, variable=8)]
-        mapper.set_node_var(
-            network="default",
-            node="a",
-            t=0,
-            scn=0,
-            vars=LPNode(consumptions=[], productions=[], storages=[], links=out_link_0),
-        )
-
-        out_link_1 = [LPLink(src="a", dest="be", cost=0.02, quantity=10, variable=18)]
-        mapper.set_node_var(
-            network="default",
-            node="a",
-            t=1,
-            scn=1,
-            vars=LPNode(consumptions=[], productions=[], storages=[], links=out_link_1),
-        )
+        mapper.set_scenario(scn=0, output=[[8, 0]])
+        mapper.set_scenario(scn=1, output=[[0, 18]])
 
         # Expected
         link = OutputLink(dest="be", quantity=[[8, 0], [0, 18]])
@@ -539,17 +220,7 @@ class TestOutputMapper(unittest.TestCase):
         )
         blank_node = OutputNode(consumptions=[], productions=[], storages=[], links=[])
         mapper = OutputMapper(study=study)
-        vars = LPConverter(
-            name="conv",
-            src_ratios={("gas", "a"): 0.5},
-            dest_network="default",
-            dest_node="b",
-            cost=0,
-            max=100,
-            var_flow_dest=100,
-            var_flow_src={("gas", "a"): 200},
-        )
-        mapper.set_converter_var(name="conv", t=0, scn=0, vars=vars)
+        mapper.set_scenario(scn=0, output=[[200], [100]])
 
         res = mapper.get_result()
         self.assertEqual(
@@ -562,3 +233,40 @@ class TestOutputMapper(unittest.TestCase):
             ),
             res,
         )
+
+    def test_buffer(self):
+        study = (
+            Study(horizon=2, nb_scn=2)
+            .network()
+            .node("a")
+            .consumption(name="load", quantity=10, cost=1)
+            .storage(name="cell", capacity=10, flow_in=1, flow_out=1)
+            .build()
+        )
+
+        mapper = OutputMapper(study=study, dtype=np.float32)
+        mapper.set_scenarios(scns=[0, 1], output=np.arange(16).reshape(2, 4, 2))
+
+        self.assertEqual((4, 2, 2), mapper.buffer.shape)
+        self.assertEqual(np.float32, mapper.buffer.dtype)
+        node = mapper.get_result().networks["default"].nodes["a"]
+        self.assertTrue(np.shares_memory(mapper.buffer, node.consumptions[0].quantity))
+        np.testing.assert_array_equal([[0, 1], [8, 9]], node.consumptions[0].quantity)
+        np.testing.assert_array_equal([[6, 7], [14, 15]], node.storages[0].flow_out)
+
+    def test_study_dtype(self):
+        study = (
+            Study(horizon=2, dtype=np.float32)
+            .network()
+            .node("a")
+            .consumption(name="load", quantity=[10, 20], cost=1)
+            .build()
+        )
+
+        mapper = OutputMapper(study=study)
+        mapper.set_scenario(0, np.array([[5, 6]]))
+
+        self.assertEqual(np.float32, mapper.buffer.dtype)
+        self.assertEqual(np.float64, OutputMapper(study, dtype=float).buffer.dtype)
+        node = mapper.get_result().networks["default"].nodes["a"]
+        np.testing.assert_array_equal([[5, 6]], node.consumptions[0].quantity)
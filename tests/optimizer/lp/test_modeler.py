@@ -0,0 +1,340 @@
+#  Copyright (c) 2019-2020, RTE (https://www.rte-france.com)
+#  See AUTHORS.txt
+#  This Source Code Form is subject to the terms of the Apache License, version 2.0.
+#  If a copy of the Apache License, version 2.0 was not distributed with this file, you can obtain one at http://www.apache.org/licenses/LICENSE-2.0.
+#  SPDX-License-Identifier: Apache-2.0
+#  This file is part of hadar-simulator, a python adequacy library for everyone.
+import unittest
+
+import numpy as np
+
+from hadar.optimizer.domain.input import Study
+from hadar.optimizer.lp.modeler import (
+    MatrixModeler,
+    build_layout,
+    component_groups,
+    connected_components,
+)
+from hadar.optimizer.lp.presolve import presolve
+
+
+def dense(model) -> np.ndarray:
+    a = np.zeros((model.nb_rows, model.nb_vars))
+    a[model.rows, model.cols] = model.coeffs
+    return a
+
+
+class TestLayout(unittest.TestCase):
+    def test_layout(self):
+        study = (
+            Study(horizon=1)
+            .network()
+            .node("a")
+            .consumption(name="load", cost=10, quantity=10)
+            .production(name="prod", cost=10, quantity=10)
+            .storage(name="cell", capacity=10, flow_in=1, flow_out=1)
+            .to_converter(name="conv")
+            .node("b")
+            .link(src="a", dest="b", cost=1, quantity=10)
+            .converter(name="conv", to_network="default", to_node="b", max=10)
+            .build()
+        )
+
+        expected = [
+            ("consumption", "default", "a", 0, "quantity"),
+            ("production", "default", "a", 0, "quantity"),
+            ("storage", "default", "a", 0, "capacity"),
+            ("storage", "default", "a", 0, "flow_in"),
+            ("storage", "default", "a", 0, "flow_out"),
+            ("link", "default", "a", 0, "quantity"),
+            ("converter", "conv", ("default", "a"), 0, "flow_src"),
+            ("converter", "conv", None, 0, "flow_dest"),
+        ]
+        self.assertEqual(expected, build_layout(study))
+
+
+def islands() -> Study:
+    return (
+        Study(horizon=2)
+        .network()
+        .node("a")
+        .consumption(name="load", cost=10 ** 6, quantity=[10, 20])
+        .node("b")
+        .production(name="prod", cost=10, quantity=[30, 30])
+        .link(src="b", dest="a", cost=1, quantity=30)
+        .node("c")
+        .consumption(name="load", cost=10 ** 6, quantity=[5, 5])
+        .production(name="prod", cost=20, quantity=[2, 2])
+        .network("gas")
+        .node("d")
+        .production(name="prod", cost=1, quantity=[10, 10])
+        .to_converter(name="conv", ratio=1)
+        .network("other")
+        .node("e")
+        .converter(name="conv", to_network="default", to_node="c", max=10)
+        .build()
+    )
+
+
+class TestComponents(unittest.TestCase):
+    def test_connected_components(self):
+        expected = [
+            [("default", "a"), ("default", "b")],
+            [("default", "c"), ("gas", "d")],
+            [("other", "e")],
+        ]
+        self.assertEqual(expected, connected_components(islands()))
+
+    def test_component_groups(self):
+        study = islands()
+        nodes = [("default", "c"), ("gas", "d")]
+        layout = build_layout(study)
+        groups = component_groups(study, nodes)
+
+        self.assertEqual(build_layout(study, nodes), [layout[g] for g in groups])
+        self.assertEqual(
+            [
+                ("consumption", "default", "c", 0, "quantity"),
+                ("production", "default", "c", 0, "quantity"),
+                ("production", "gas", "d", 0, "quantity"),
+                ("converter", "conv", ("gas", "d"), 0, "flow_src"),
+                ("converter", "conv", None, 0, "flow_dest"),
+            ],
+            build_layout(study, nodes),
+        )
+        np.testing.assert_array_equal(np.arange(len(layout)), component_groups(study))
+
+    def test_modeler(self):
+        study = islands()
+        modeler = MatrixModeler(study, nodes=[("default", "a"), ("default", "b")])
+        model = modeler.build(scn=0)
+
+        # Variables: lol a, prod b, link b->a. Constraints: adequacy a and b
+        self.assertEqual(6, model.nb_vars)
+        self.assertEqual(4, model.nb_rows)
+        np.testing.assert_array_equal([0, 1, 2], modeler.groups)
+        np.testing.assert_array_equal([10, 20, 0, 0], model.row_lb)
+
+
+class TestMatrixModeler(unittest.TestCase):
+    def test_consumption_production(self):
+        study = (
+            Study(horizon=2, nb_scn=2)
+            .network()
+            .node("a")
+            .consumption(name="load", cost=10 ** 6, quantity=[[10, 1], [20, 2]])
+            .production(name="prod", cost=[[1, 2], [3, 4]], quantity=[30, 40])
+            .build()
+        )
+
+        model = MatrixModeler(study).build(scn=1)
+
+        np.testing.assert_array_equal([0, 0, 0, 0], model.lb)
+        np.testing.assert_array_equal([20, 2, 30, 40], model.ub)
+        np.testing.assert_array_equal([10 ** 6, 10 ** 6, 3, 4], model.cost)
+        np.testing.assert_array_equal([[1, 0, 1, 0], [0, 1, 0, 1]], dense(model))
+        np.testing.assert_array_equal([20, 2], model.row_lb)
+        np.testing.assert_array_equal([20, 2], model.row_ub)
+
+    def test_storage(self):
+        study = (
+            Study(horizon=3)
+            .network()
+            .node("a")
+            .storage(
+                name="cell",
+                capacity=10,
+                flow_in=2,
+                flow_out=3,
+                cost=1,
+                init_capacity=4,
+                eff=[0.5, 0.6, 0.7],
+            )
+            .build()
+        )
+
+        model = MatrixModeler(study).build(scn=0)
+
+        np.testing.assert_array_equal([10, 10, 10, 2, 2, 2, 3, 3, 3], model.ub)
+        np.testing.assert_array_equal([1, 1, 1, 0, 0, 0, 0, 0, 0], model.cost)
+        a = dense(model)
+        # adequacy: - flow_in + flow_out
+        np.testing.assert_array_equal(
+            [
+                [0, 0, 0, -1, 0, 0, 1, 0, 0],
+                [0, 0, 0, 0, -1, 0, 0, 1, 0],
+                [0, 0, 0, 0, 0, -1, 0, 0, 1],
+            ],
+            a[:3],
+        )
+        # storage: capacity[t] - capacity[t-1] - eff * flow_in[t] + flow_out[t]
+        np.testing.assert_array_almost_equal(
+            [
+                [1, 0, 0, -0.5, 0, 0, 1, 0, 0],
+                [-1, 1, 0, 0, -0.6, 0, 0, 1, 0],
+                [0, -1, 1, 0, 0, -0.7, 0, 0, 1],
+            ],
+            a[3:],
+        )
+        np.testing.assert_array_equal([0, 0, 0, 4, 0, 0], model.row_lb)
+
+    def test_storages(self):
+        study = (
+            Study(horizon=2)
+            .network()
+            .node("a")
+            .storage(name="cell", capacity=10, flow_in=2, flow_out=3, init_capacity=4)
+            .storage(name="hydro", capacity=20, flow_in=5, flow_out=5, eff=[0.5, 0.6])
+            .storage(name="empty", capacity=10, flow_in=0, flow_out=1, init_capacity=1)
+            .build()
+        )
+
+        modeler = MatrixModeler(study, reduction=presolve(study))
+        model = modeler.build(scn=0)
+
+        # Variables: 3 storages of (capacity, flow_in, flow_out) but flow_in of empty. Constraints: adequacy, volumes
+        self.assertEqual(16, model.nb_vars)
+        self.assertEqual(8, model.nb_rows)
+        a = dense(model)
+        np.testing.assert_array_almost_equal(
+            [
+                [1, 0, -0.99, 0, 1, 0] + [0] * 10,
+                [-1, 1, 0, -0.99, 0, 1] + [0] * 10,
+                [0] * 6 + [1, 0, -0.5, 0, 1, 0] + [0] * 4,
+                [0] * 6 + [-1, 1, 0, -0.6, 0, 1] + [0] * 4,
+                [0] * 12 + [1, 0, 1, 0],
+                [0] * 12 + [-1, 1, 0, 1],
+            ],
+            a[2:],
+        )
+        np.testing.assert_array_equal([0, 0, 4, 0, 0, 0, 1, 0], model.row_lb)
+
+    def test_window(self):
+        study = (
+            Study(horizon=4)
+            .network()
+            .node("a")
+            .consumption(name="load", cost=10 ** 6, quantity=[10, 20, 30, 40])
+            .storage(name="cell", capacity=10, flow_in=2, flow_out=3, init_capacity=4)
+            .build()
+        )
+
+        modeler = MatrixModeler(study, horizon=2)
+        model = modeler.build(scn=0, start=2, init=np.array([7]))
+
+        self.assertEqual(2, modeler.horizon)
+        self.assertEqual(8, model.nb_vars)
+        np.testing.assert_array_equal([30, 40, 7, 0], model.row_lb)
+
+        out = modeler.to_output(
+            scn=0, solution=np.array([1, 2, 5, 6, 0, 0, 0, 0]), start=2
+        )
+        np.testing.assert_array_equal([29, 38], out[0])
+        np.testing.assert_array_equal([6], modeler.capacities(out, 1))
+
+    def test_names(self):
+        study = (
+            Study(horizon=2)
+            .network()
+            .node("a")
+            .consumption(name="load", cost=10, quantity=10)
+            .storage(name="cell", capacity=10, flow_in=1, flow_out=1)
+            .build()
+        )
+
+        variables, constraints = MatrixModeler(study).names(start=3)
+
+        self.assertEqual(
+            [
+                "consumption_lol_default_a_0_t3",
+                "consumption_lol_default_a_0_t4",
+                "storage_capacity_default_a_0_t3",
+                "storage_capacity_default_a_0_t4",
+                "storage_flow_in_default_a_0_t3",
+                "storage_flow_in_default_a_0_t4",
+                "storage_flow_out_default_a_0_t3",
+                "storage_flow_out_default_a_0_t4",
+            ],
+            variables,
+        )
+        self.assertEqual(
+            [
+                "adequacy_default_a_t3",
+                "adequacy_default_a_t4",
+                "storage_default_a_0_t3",
+                "storage_default_a_0_t4",
+            ],
+            constraints,
+        )
+
+    def test_link(self):
+        study = (
+            Study(horizon=1)
+            .network()
+            .node("a")
+            .node("b")
+            .link(src="a", dest="b", cost=2, quantity=10)
+            .build()
+        )
+
+        model = MatrixModeler(study).build(scn=0)
+
+        np.testing.assert_array_equal([10], model.ub)
+        np.testing.assert_array_equal([2], model.cost)
+        np.testing.assert_array_equal([[-1], [1]], dense(model))
+
+    def test_converter(self):
+        study = (
+            Study(horizon=1)
+            .network("gas")
+            .node("a")
+            .to_converter(name="conv", ratio=0.5)
+            .network()
+            .node("b")
+            .converter(name="conv", to_network="default", to_node="b", max=100, cost=3)
+            .build()
+        )
+
+        model = MatrixModeler(study).build(scn=0)
+
+        # variables: flow_src, flow_dest
+        np.testing.assert_array_equal([200, 100], model.ub)
+        np.testing.assert_array_equal([0, 3], model.cost)
+        np.testing.assert_array_equal([[-1, 0], [0, 1], [0.5, -1]], dense(model))
+
+    def test_to_output(self):
+        study = (
+            Study(horizon=2)
+            .network()
+            .node("a")
+            .consumption(name="load", cost=10 ** 6, quantity=[10, 20])
+            .production(name="prod", cost=1, quantity=[30, 40])
+            .build()
+        )
+
+        out = MatrixModeler(study).to_output(scn=0, solution=np.array([1, 2, 9, 18]))
+
+        np.testing.assert_array_equal([[9, 18], [9, 18]], out)
+
+    def test_reduction(self):
+        study = (
+            Study(horizon=2)
+            .network()
+            .node("a")
+            .consumption(name="load", cost=10 ** 6, quantity=[10, 20])
+            .production(name="nuclear", cost=10, quantity=[12, 12])
+            .production(name="off", cost=5, quantity=0)
+            .production(name="solar", cost=10, quantity=[4, 0])
+            .build()
+        )
+
+        modeler = MatrixModeler(study, reduction=presolve(study))
+        model = modeler.build(scn=0)
+
+        # Variables: lol, nuclear with solar
+        np.testing.assert_array_equal([10, 20, 16, 12], model.ub)
+        np.testing.assert_array_equal([10 ** 6, 10 ** 6, 10, 10], model.cost)
+        np.testing.assert_array_equal([[1, 0, 1, 0], [0, 1, 0, 1]], dense(model))
+
+        out = modeler.to_output(scn=0, solution=np.array([2, 8, 8, 12]))
+        np.testing.assert_array_equal([[8, 12], [6, 12], [0, 0], [2, 0]], out)
@@ -4,31 +4,34 @@
 #  If a copy of the Apache License, version 2.0 was not distributed with this file, you can obtain one at http://www.apache.org/licenses/LICENSE-2.0.
 #  SPDX-License-Identifier: Apache-2.0
 #  This file is part of hadar-simulator, a python adequacy library for everyone.
+import multiprocessing
+import os
+import tempfile
+import time
 import unittest
-from unittest.mock import MagicMock, call, ANY, Mock
+from unittest.mock import MagicMock, call, ANY
 
-import msgpack
+import numpy as np
 
 from hadar.optimizer.domain.input import Study
-from hadar.optimizer.lp.domain import (
-    LPConsumption,
-    LPProduction,
-    LPLink,
-    LPNode,
-    LPStorage,
-    LPConverter,
-    LPTimeStep,
-    LPNetwork,
-)
-from hadar.optimizer.lp.mapper import InputMapper, OutputMapper
+from hadar.optimizer.lp.mapper import OutputMapper
+from hadar.optimizer.lp.modeler import MatrixModeler
+from hadar.optimizer.lp.presolve import Reduction
 from hadar.optimizer.lp.optimizer import (
-    ObjectiveBuilder,
-    AdequacyBuilder,
+    _solve_scenario,
+    _solve_rolling,
     _solve_batch,
-    StorageBuilder,
-    ConverterMixBuilder,
+    _chunk_size,
+    _split,
+    _merge_stats,
+    _dump_model,
+    _templates,
+    solve_lp,
+    solve_lp_iter,
+    ModelTemplate,
 )
-from hadar.optimizer.lp.optimizer import solve_lp
+from hadar.optimizer.executor import ProcessExecutor, ThreadExecutor, create_executor
+from hadar.optimizer.shared import SharedStudy, _detach_all
 from hadar.optimizer.domain.output import (
     OutputConsumption,
     OutputNode,
@@ -36,457 +39,531 @@ from hadar.optimizer.domain.output import (
     OutputNetwork,
     OutputConverter,
 )
-from tests.optimizer.lp.ortools_mock import (
-    MockConstraint,
-    MockNumVar,
-    MockObjective,
-    MockSolver,
-)
-
 
-class TestObjectiveBuilder(unittest.TestCase):
-    def test_add_node(self):
-        # Mock
-        objective = MockObjective()
-        solver = MockSolver()
 
+class TestModelTemplate(unittest.TestCase):
+    def test_load(self):
         # Input
-        consumptions = [
-            LPConsumption(
-                name="load", quantity=10, cost=10, variable=MockNumVar(0, 10, "load")
-            )
-        ]
-        productions = [
-            LPProduction(
-                name="solar", quantity=10, cost=20, variable=MockNumVar(0, 20, "solar")
+        study = (
+            Study(horizon=3, nb_scn=3)
+            .network()
+            .node("a")
+            .consumption(
+                name="load",
+                cost=10 ** 6,
+                quantity=[[10, 20, 30], [30, 5, 20], [0, 40, 10]],
             )
-        ]
-        storages = [
-            LPStorage(
+            .production(name="prod", cost=[[1], [2], [3]], quantity=[20, 20, 20])
+            .storage(
                 name="cell",
-                capacity=10,
-                var_capacity=MockNumVar(0, 10, "cell_capacity"),
-                cost=1,
-                flow_in=1,
-                var_flow_in=MockNumVar(0, 1, "cell_flow_in"),
-                flow_out=10,
-                var_flow_out=MockNumVar(0, 10, "cell_flow_out"),
-                init_capacity=2,
-                eff=1.2,
-            )
-        ]
-        links = [
-            LPLink(
-                src="fr",
-                dest="be",
-                quantity=10,
-                cost=30,
-                variable=MockNumVar(0, 30, "be"),
+                capacity=50,
+                flow_in=20,
+                flow_out=20,
+                init_capacity=5,
+                eff=[[0.9], [0.5], [0.8]],
             )
-        ]
-        node = LPNode(
-            consumptions=consumptions,
-            productions=productions,
-            storages=storages,
-            links=links,
+            .build()
         )
-
-        # Expected
-        coeffs = {
-            MockNumVar(0, 10, "load"): 10,
-            MockNumVar(0, 20, "solar"): 20,
-            MockNumVar(0, 30, "be"): 30,
-            MockNumVar(0, 10, "cell_capacity"): 1,
-        }
-        expected = MockObjective(min=True, coeffs=coeffs)
+        modeler = MatrixModeler(study)
+        template = ModelTemplate(modeler)
+        warm = ModelTemplate(modeler, warm_start=True)
 
         # Test
-        builder = ObjectiveBuilder(solver=solver)
-        builder.add_node(node)
-        builder.build()
-
-        self.assertEqual(expected, builder.objective)
-
-    def test_add_converter(self):
-        # Mock
-        solver = MockSolver()
+        for scn in range(study.nb_scn):
+            exp = _solve_scenario(ModelTemplate(modeler), scn)[0]
+            np.testing.assert_array_almost_equal(exp, _solve_scenario(template, scn)[0])
+            np.testing.assert_array_almost_equal(exp, _solve_scenario(warm, scn)[0])
 
+    def test_warm_start(self):
         # Input
-        conv = LPConverter(
-            name="conv",
-            src_ratios={("gas", "a"): 0.5},
-            dest_network="default",
-            dest_node="b",
-            cost=10,
-            max=100,
-            var_flow_dest=MockNumVar(0, 100, "flow_dest conv %s"),
-            var_flow_src={("gas", "a"): MockNumVar(0, 200, "flow_src conv gas:a %s")},
-        )
-
-        # Expected
-        expected = MockObjective(
-            min=True, coeffs={MockNumVar(0, 100, "flow_dest conv %s"): 10}
+        load = np.random.default_rng(0).uniform(10, 30, 24)
+        study = (
+            Study(horizon=24, nb_scn=2)
+            .network()
+            .node("a")
+            .consumption(name="load", cost=10 ** 6, quantity=[load, load + 0.1])
+            .production(name="cheap", cost=1, quantity=20)
+            .production(name="expensive", cost=10, quantity=30)
+            .storage(name="cell", capacity=50, flow_in=10, flow_out=10, cost=0.1)
+            .build()
         )
+        modeler = MatrixModeler(study)
 
         # Test
-        builder = ObjectiveBuilder(solver=solver)
-        builder.add_converter(conv)
-        builder.build()
+        cold, warm = ModelTemplate(modeler), ModelTemplate(modeler, warm_start=True)
+        it_cold = [_solve_scenario(cold, s)[1]["iterations"] for s in range(2)]
+        it_warm = [_solve_scenario(warm, s)[1]["iterations"] for s in range(2)]
 
-        self.assertEqual(expected, builder.objective)
+        self.assertEqual(it_cold[0], it_warm[0])
+        self.assertEqual(it_cold[0], it_cold[1])
+        self.assertLess(it_warm[1], it_cold[1])
 
 
-class TestAdequacyBuilder(unittest.TestCase):
-    def test_add_node(self):
-        # Mock
-        solver = MockSolver()
+class TestDump(unittest.TestCase):
+    def setUp(self) -> None:
+        self.study = (
+            Study(horizon=2, nb_scn=2)
+            .network()
+            .node("a")
+            .consumption(name="load", cost=10 ** 6, quantity=[10, 20])
+            .production(name="prod", cost=10, quantity=[15, 15])
+            .build()
+        )
 
-        # Input
-        fr_consumptions = [
-            LPConsumption(
-                name="load", quantity=10, cost=10, variable=MockNumVar(0, 10, "load")
-            )
-        ]
-        fr_productions = [
-            LPProduction(
-                name="solar", quantity=10, cost=20, variable=MockNumVar(0, 20, "solar")
-            )
-        ]
-        fr_storages = [
-            LPStorage(
-                name="cell",
-                capacity=10,
-                var_capacity=MockNumVar(0, 10, "cell_capacity"),
-                cost=1,
-                flow_in=1,
-                var_flow_in=MockNumVar(0, 1, "cell_flow_in"),
-                flow_out=10,
-                var_flow_out=MockNumVar(0, 10, "cell_flow_out"),
-                init_capacity=2,
-                eff=1.2,
-            )
-        ]
-        fr_links = [
-            LPLink(
-                src="fr",
-                dest="be",
-                quantity=10,
-                cost=30,
-                variable=MockNumVar(0, 30, "be"),
+    def test_dump_model(self):
+        modeler = MatrixModeler(self.study)
+        with tempfile.TemporaryDirectory() as directory:
+            for fmt in ["lp", "mps"]:
+                path = os.path.join(directory, "model." + fmt)
+                _dump_model(modeler.build(0), modeler, 0, path)
+                with open(path) as file:
+                    text = file.read()
+                self.assertIn("production_quantity_default_a_0_t1", text)
+                self.assertIn("adequacy_default_a_t0", text)
+
+    def test_solve_lp(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "dump")
+            solve_lp(self.study, dump_dir=path, dump_scenarios=[1], window=1)
+            self.assertEqual(["scn1_t0.lp", "scn1_t1.lp"], sorted(os.listdir(path)))
+
+
+class TestRolling(unittest.TestCase):
+    def setUp(self) -> None:
+        self.study = (
+            Study(horizon=5)
+            .network()
+            .node("a")
+            .consumption(name="load", cost=10 ** 6, quantity=[10, 10, 10, 30, 30])
+            .production(name="prod", cost=1, quantity=20)
+            .storage(
+                name="cell", capacity=50, flow_in=20, flow_out=20, cost=-0.1, eff=1
             )
-        ]
-        fr_node = LPNode(
-            consumptions=fr_consumptions,
-            productions=fr_productions,
-            storages=fr_storages,
-            links=fr_links,
+            .build()
         )
 
-        be_node = LPNode(consumptions=[], productions=[], storages=[], links=[])
-
-        # Expected
-        fr_coeffs = {
-            MockNumVar(0, 10, "load"): 1,
-            MockNumVar(0, 20, "solar"): 1,
-            MockNumVar(0, 1, "cell_flow_in"): -1,
-            MockNumVar(0, 10, "cell_flow_out"): 1,
-            MockNumVar(0, 30, "be"): -1,
-        }
-        fr_constraint = MockConstraint(10, 10, coeffs=fr_coeffs)
-
-        be_coeffs = {MockNumVar(0, 30, "be"): 1}
-        be_constraint = MockConstraint(0, 0, coeffs=be_coeffs)
-
-        # Test
-        builder = AdequacyBuilder(solver=solver)
-        builder.add_node(name_network="default", name_node="fr", node=fr_node, t=0)
-        builder.add_node(name_network="default", name_node="be", node=be_node, t=0)
-        builder.build()
+    def get_template(self, horizon: int) -> ModelTemplate:
+        return ModelTemplate(MatrixModeler(self.study, horizon))
 
-        self.assertEqual(fr_constraint, builder.constraints[(0, "default", "fr")])
-        self.assertEqual(be_constraint, builder.constraints[(0, "default", "be")])
-
-    def test_add_converter(self):
-        # Mock
-        solver = MockSolver()
+    def test_whole_horizon(self):
+        outputs, _ = _solve_rolling(self.get_template, 5, 0)
 
-        # Input
-        conv = LPConverter(
-            name="conv",
-            src_ratios={("gas", "a"): 0.5},
-            dest_network="default",
-            dest_node="b",
-            cost=10,
-            max=100,
-            var_flow_dest=MockNumVar(0, 100, "flow_dest conv %s"),
-            var_flow_src={("gas", "a"): MockNumVar(0, 200, "flow_src conv gas:a %s")},
+        self.assertEqual(1, len(outputs))
+        self.assertEqual(0, outputs[0][0])
+        np.testing.assert_array_almost_equal(
+            _solve_scenario(self.get_template(5), 0)[0], outputs[0][1]
         )
 
-        adequacy = AdequacyBuilder(solver=solver)
-        adequacy.constraints[(0, "gas", "a")] = MockConstraint(10, 10, coeffs={})
-        adequacy.constraints[(0, "default", "b")] = MockConstraint(10, 10, coeffs={})
-
-        # Test
-        adequacy.add_converter(conv=conv, t=0)
+    def test_windows(self):
+        outputs, stats = _solve_rolling(self.get_template, 5, 0, window=2)
 
-        self.assertEqual(
-            {MockNumVar(0, 100, "flow_dest conv %s"): 1},
-            adequacy.constraints[(0, "default", "b")].coeffs,
+        self.assertEqual([0, 2, 4], [start for start, _ in outputs])
+        self.assertEqual([(5, 2), (5, 2), (5, 1)], [o.shape for _, o in outputs])
+        # layout: load, prod, capacity, flow_in, flow_out
+        load, _, capacity, flow_in, flow_out = np.concatenate(
+            [o for _, o in outputs], axis=1
         )
-        self.assertEqual(
-            {MockNumVar(0, 200, "flow_src conv gas:a %s"): -1},
-            adequacy.constraints[(0, "gas", "a")].coeffs,
+        # Without overlap each window empties storage at its end
+        np.testing.assert_array_almost_equal([10, 10, 10, 30, 20], load)
+        np.testing.assert_array_almost_equal([10, 0, 10, 0, 0], capacity)
+        # Capacity is carried from a window to the next one
+        np.testing.assert_array_almost_equal(np.cumsum(flow_in - flow_out), capacity)
+        # Model sizes are summed over windows
+        self.assertEqual(25, stats["variables"])
+        self.assertEqual(10, stats["constraints"])
+        self.assertEqual("optimal", stats["status"])
+
+    def test_overlap(self):
+        outputs, _ = _solve_rolling(self.get_template, 5, 0, window=2, overlap=2)
+
+        self.assertEqual([(5, 2), (5, 2), (5, 1)], [o.shape for _, o in outputs])
+        np.testing.assert_array_almost_equal(
+            _solve_scenario(self.get_template(5), 0)[0],
+            np.concatenate([o for _, o in outputs], axis=1),
         )
 
 
-class TestStorageBuilder(unittest.TestCase):
-    def test_t0(self):
-        # Mock
-        solver = MockSolver()
+class TestSolve(unittest.TestCase):
+    def setUp(self) -> None:
+        self.config = dict(
+            template=True,
+            warm_start=False,
+            window=None,
+            overlap=0,
+            backend="GLOP",
+            solver_params={},
+            presolve=False,
+            reduction=Reduction(),
+        )
 
+    def test_solve_scenario(self):
         # Input
-        c0 = MockNumVar(0, 10, "cell_capacity")
-        storages = [
-            LPStorage(
-                name="cell",
-                capacity=10,
-                var_capacity=c0,
-                cost=1,
-                flow_in=1,
-                var_flow_in=MockNumVar(0, 1, "cell_flow_in"),
-                flow_out=10,
-                var_flow_out=MockNumVar(0, 10, "cell_flow_out"),
-                init_capacity=2,
-                eff=1.2,
-            )
-        ]
-        node = LPNode(consumptions=[], productions=[], storages=storages, links=[])
-
-        # Expected
-        coeffs = {
-            MockNumVar(0, 1, "cell_flow_in"): -1.2,
-            MockNumVar(0, 10, "cell_flow_out"): 1,
-            c0: 1,
-        }
-        constraint = MockConstraint(2, 2, coeffs=coeffs)
+        study = (
+            Study(horizon=2, nb_scn=1)
+            .network()
+            .node("a")
+            .consumption(name="load", cost=10 ** 6, quantity=[10, 20])
+            .production(name="prod", cost=10, quantity=[15, 15])
+            .build()
+        )
 
         # Test
-        builder = StorageBuilder(solver=solver)
-        res = builder.add_node(name_network="default", name_node="fr", node=node, t=0)
-
-        self.assertEqual(constraint, res)
-        self.assertEqual(builder.capacities[(0, "default", "fr", "cell")], c0)
+        output, stats = _solve_scenario(ModelTemplate(MatrixModeler(study)), 0)
 
-    def test(self):
-        # Mock
-        solver = MockSolver()
+        np.testing.assert_array_almost_equal([[10, 15], [10, 15]], output)
+        self.assertTrue(stats["modeler"] > 0)
+        self.assertTrue(stats["solver"] > 0)
+        self.assertEqual("optimal", stats["status"])
+        self.assertEqual(4, stats["variables"])
+        self.assertEqual(2, stats["constraints"])
 
+    def test_solve_batch(self):
         # Input
-        storages = [
-            LPStorage(
-                name="cell",
-                capacity=10,
-                var_capacity=MockNumVar(0, 10, "cell_capacity at 1"),
-                cost=1,
-                flow_in=1,
-                var_flow_in=MockNumVar(0, 1, "cell_flow_in"),
-                flow_out=10,
-                var_flow_out=MockNumVar(0, 10, "cell_flow_out"),
-                init_capacity=2,
-                eff=1.2,
-            )
-        ]
-        node = LPNode(consumptions=[], productions=[], storages=storages, links=[])
-
-        c0 = MockNumVar(0, 11, "cell_capacity at 0")
-        c1 = MockNumVar(0, 10, "cell_capacity at 1")
-
-        # Expected
-        coeffs = {
-            MockNumVar(0, 1, "cell_flow_in"): -1.2,
-            MockNumVar(0, 10, "cell_flow_out"): 1,
-            c0: -1,
-            c1: 1,
-        }
-        constraint = MockConstraint(0, 0, coeffs=coeffs)
+        study = (
+            Study(horizon=2, nb_scn=2)
+            .network()
+            .node("a")
+            .consumption(name="load", cost=10 ** 6, quantity=[[10, 20], [5, 5]])
+            .production(name="prod", cost=10, quantity=[15, 15])
+            .build()
+        )
 
         # Test
-        builder = StorageBuilder(solver=solver)
-        builder.capacities[(0, "default", "fr", "cell")] = c0
-        res = builder.add_node(name_network="default", name_node="fr", node=node, t=1)
+        with SharedStudy(study) as shared:
+            scenarios, part, outputs, stats = _solve_batch(
+                (shared.name, [0, 1], self.config, [None, None], time.time(), None)
+            )
+            _templates.clear()
+            _detach_all()
+
+        self.assertEqual([0, 1], scenarios)
+        self.assertIsNone(part)
+        self.assertEqual(2, len(stats))
+        self.assertEqual(os.getpid(), stats[0]["workers"])
+        self.assertTrue(stats[0]["queue"] >= 0)
+        self.assertTrue(stats[0]["finished"] > 0)
+        self.assertEqual(1, len(outputs))
+        start, output = outputs[0]
+        self.assertEqual(0, start)
+        self.assertTrue(output.flags.c_contiguous)
+        np.testing.assert_array_almost_equal(
+            [[[10, 15], [10, 15]], [[5, 5], [5, 5]]], output
+        )
+
+    def test_chunk_size(self):
+        study = (
+            Study(horizon=10, nb_scn=1000)
+            .network()
+            .node("a")
+            .consumption(name="load", cost=10, quantity=10)
+            .build()
+        )
 
-        self.assertEqual(constraint, res)
-        self.assertEqual(c1, builder.capacities[(1, "default", "fr", "cell")])
+        # Small model: chunks are limited by load balance
+        self.assertEqual(31, _chunk_size(study, processes=8))
+        # Big model: chunks are limited by size
+        study = (
+            Study(horizon=10 ** 6, nb_scn=1000)
+            .network()
+            .node("a")
+            .consumption(name="load", cost=10, quantity=10)
+            .build()
+        )
+        self.assertEqual(1, _chunk_size(study, processes=8))
 
+    def test_solve_chunks(self):
+        study = (
+            Study(horizon=2, nb_scn=5)
+            .network()
+            .node("a")
+            .consumption(
+                name="load", cost=10 ** 6, quantity=[[i, 2 * i] for i in range(5)]
+            )
+            .production(name="prod", cost=10, quantity=[15, 15])
+            .build()
+        )
 
-class TestConverterMixBuilder(unittest.TestCase):
-    def test(self):
-        # Mock
-        solver = MockSolver()
+        res = solve_lp(study, chunk_size=2)
 
-        # Input
-        conv = LPConverter(
-            name="conv",
-            src_ratios={("gas", "a"): 0.5},
-            dest_network="default",
-            dest_node="b",
-            cost=10,
-            max=100,
-            var_flow_dest=MockNumVar(0, 100, "flow_dest conv %s"),
-            var_flow_src={("gas", "a"): MockNumVar(0, 200, "flow_src conv gas:a %s")},
+        np.testing.assert_array_equal(
+            [[i, 2 * i] for i in range(5)],
+            res.networks["default"].nodes["a"].consumptions[0].quantity,
         )
+        self.assertEqual(5, len(res.benchmark.solver))
 
-        # Expected
-        expected = MockConstraint(
-            0,
-            0,
-            coeffs={
-                MockNumVar(0, 100, "flow_dest conv %s"): -1,
-                MockNumVar(0, 200, "flow_src conv gas:a %s"): 0.5,
-            },
+        df = res.benchmark.to_df()
+        self.assertEqual(list(range(5)), sorted(df.index))
+        self.assertEqual(["optimal"] * 5, list(df["status"]))
+        self.assertEqual([4] * 5, list(df["variables"]))
+        self.assertTrue((df["rss"] > 0).all())
+        self.assertTrue((df["transfer"] >= 0).all())
+        self.assertTrue(res.benchmark.sharing > 0)
+
+    def test_solve_lp_iter(self):
+        study = (
+            Study(horizon=2, nb_scn=3)
+            .network()
+            .node("a")
+            .consumption(
+                name="load", cost=10 ** 6, quantity=[[i, 2 * i] for i in range(3)]
+            )
+            .production(name="prod", cost=10, quantity=[15, 15])
+            .build()
         )
 
-        # Test
-        builder = ConverterMixBuilder(solver=solver)
-        res = builder.add_converter(conv)
-        self.assertEqual([expected], res)
+        results = sorted(solve_lp_iter(study, window=1), key=lambda r: r[0])
 
+        self.assertEqual([0, 1, 2], [scn for scn, _ in results])
+        for scn, res in results:
+            np.testing.assert_array_equal(
+                [[scn, 2 * scn]],
+                res.networks["default"].nodes["a"].consumptions[0].quantity,
+            )
 
-class TestSolve(unittest.TestCase):
-    def test_solve_batch(self):
-        # Input
+    def test_solve_lp_iter_break(self):
         study = (
-            Study(horizon=1, nb_scn=1)
+            Study(horizon=2, nb_scn=40)
             .network()
             .node("a")
-            .consumption(name="load", cost=10, quantity=10)
-            .to_converter(name="conv")
-            .network("gas")
+            .consumption(
+                name="load", cost=10 ** 6, quantity=[[i, 2 * i] for i in range(40)]
+            )
+            .production(name="prod", cost=10, quantity=[100, 100])
+            .build()
+        )
+        shm = set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else set()
+
+        # Temporary pool is stopped with pending tasks
+        for _ in solve_lp_iter(study, chunk_size=1):
+            break
+
+        # Executors given are still usable once pending tasks are cancelled
+        with multiprocessing.Pool(2) as pool:
+            for executor in [ProcessExecutor(2), ThreadExecutor(2), pool]:
+                for _ in solve_lp_iter(study, pool=executor, chunk_size=1):
+                    break
+                res = solve_lp(study, pool=executor)
+                np.testing.assert_array_equal(
+                    [[39, 78]],
+                    res.networks["default"].nodes["a"].consumptions[0].quantity[39:],
+                )
+                create_executor(executor).close()
+
+        # Shared studies are unlinked
+        if os.path.isdir("/dev/shm"):
+            self.assertEqual(set(), set(os.listdir("/dev/shm")) - shm)
+
+    def islands(self) -> Study:
+        return (
+            Study(horizon=2, nb_scn=3)
+            .network()
+            .node("a")
+            .consumption(name="load", cost=10 ** 6, quantity=[[10, 20], [5, 5], [1, 2]])
+            .storage(name="cell", capacity=10, flow_in=5, flow_out=5, init_capacity=5)
             .node("b")
-            .converter(name="conv", to_network="gas", to_node="b", max=10, cost=1)
+            .production(name="prod", cost=10, quantity=[15, 15])
+            .link(src="b", dest="a", cost=1, quantity=30)
+            .node("c")
+            .consumption(name="load", cost=10 ** 6, quantity=[[5, 6], [7, 8], [9, 9]])
+            .production(name="prod", cost=20, quantity=[8, 8])
             .build()
         )
 
-        # Mock
-        solver = MockSolver()
-        solver.Solve = MagicMock()
-
-        objective = ObjectiveBuilder(solver=solver)
-        objective.add_node = MagicMock()
-        objective.add_converter = MagicMock()
-        objective.build = MagicMock()
-
-        adequacy = AdequacyBuilder(solver=solver)
-        adequacy.add_node = MagicMock()
-        adequacy.add_converter = MagicMock()
-        adequacy.build = MagicMock()
-
-        storage = StorageBuilder(solver=solver)
-        storage.add_node = MagicMock()
-        storage.build = MagicMock()
-
-        mix = ConverterMixBuilder(solver=solver)
-        mix.add_converter = MagicMock()
-        mix.build = MagicMock()
-
-        in_cons = LPConsumption(
-            name="load", quantity=10, cost=10, variable=MockNumVar(0, 10, "load")
-        )
-        var_node = LPNode(consumptions=[in_cons], productions=[], storages=[], links=[])
-        empty_node = LPNode(consumptions=[], productions=[], storages=[], links=[])
-        var_conv = LPConverter(
-            name="conv",
-            src_ratios={("default", "a"): 0.5},
-            var_flow_src={("default", "a"): MockNumVar(0, 10, "conv src")},
-            dest_network="gas",
-            dest_node="b",
-            max=10,
-            cost=1,
-            var_flow_dest=MockNumVar(0, 10, "conv dest"),
-        )
-
-        def side_effect(network, node, t, scn):
-            return var_node if network == "default" and node == "a" else empty_node
-
-        in_mapper = InputMapper(solver=solver, study=study)
-        in_mapper.get_node_var = Mock(side_effect=side_effect)
-
-        exp_var_conv = LPConverter(
-            name="conv",
-            src_ratios={("default", "a"): 0.5},
-            max=10,
-            cost=1,
-            var_flow_src={("default", "a"): MockNumVar(0, 10, "conv src")},
-            dest_network="gas",
-            dest_node="b",
-            var_flow_dest=MockNumVar(0, 10, "conv dest"),
-        )
-        in_mapper.get_conv_var = Mock(return_value=exp_var_conv)
-
-        # Expected
-        in_cons = LPConsumption(name="load", quantity=10, cost=10, variable=10)
-        exp_var_node = LPNode(
-            consumptions=[in_cons], productions=[], storages=[], links=[]
+    def test_split(self):
+        study = self.islands()
+        self.assertEqual(
+            [
+                (0, [(0, [("default", "a"), ("default", "b")])]),
+                (1, [(1, [("default", "c")])]),
+            ],
+            _split(study, processes=4),
         )
-        exp_var_conv = LPConverter(
-            name="conv",
-            src_ratios={("default", "a"): 0.5},
-            var_flow_src={("default", "a"): 10},
-            dest_network="gas",
-            dest_node="b",
-            max=10,
-            cost=1,
-            var_flow_dest=10,
+        self.assertEqual(
+            [
+                (
+                    0,
+                    [
+                        (0, [("default", "a"), ("default", "b")]),
+                        (1, [("default", "c")]),
+                    ],
+                )
+            ],
+            _split(study, processes=1),
         )
 
-        expected = LPTimeStep(
-            networks={
-                "default": LPNetwork(nodes={"a": exp_var_node}),
-                "gas": LPNetwork(nodes={"b": empty_node}),
-            },
-            converters={"conv": exp_var_conv},
+        study = (
+            Study(horizon=1)
+            .network()
+            .node("a")
+            .node("b")
+            .link(src="a", dest="b", cost=1, quantity=1)
+            .build()
+        )
+        self.assertEqual([None], _split(study, processes=4))
+
+    def test_merge_stats(self):
+        total = dict(
+            modeler=1,
+            solver=2,
+            iterations=3,
+            variables=4,
+            constraints=5,
+            status="optimal",
+            queue=1,
+            rss=None,
+            workers=10,
+        )
+        stats = dict(
+            modeler=1,
+            solver=1,
+            iterations=1,
+            variables=1,
+            constraints=1,
+            status="infeasible",
+            queue=0.5,
+            rss=100,
+            workers=11,
+        )
+        _merge_stats(total, stats)
+        self.assertEqual(
+            dict(
+                modeler=2,
+                solver=3,
+                iterations=4,
+                variables=5,
+                constraints=6,
+                status="infeasible",
+                queue=1,
+                rss=100,
+                workers=10,
+            ),
+            total,
         )
 
-        # Test
-        res = _solve_batch(
-            (study, 0, solver, objective, adequacy, storage, mix, in_mapper)
+    def test_solve_components(self):
+        study = self.islands()
+
+        with multiprocessing.Pool(2) as pool:
+            split = solve_lp(study, pool=pool, chunk_size=2, window=1)
+            whole = solve_lp(study, pool=pool, chunk_size=2, window=1, decompose=False)
+
+        for name, node in whole.networks["default"].nodes.items():
+            other = split.networks["default"].nodes[name]
+            for kind in ["consumptions", "productions", "links"]:
+                for exp, res in zip(getattr(node, kind), getattr(other, kind)):
+                    np.testing.assert_array_almost_equal(exp.quantity, res.quantity)
+            for exp, res in zip(node.storages, other.storages):
+                np.testing.assert_array_almost_equal(exp.capacity, res.capacity)
+        np.testing.assert_array_equal(
+            [[5, 6], [7, 8], [8, 8]],
+            split.networks["default"].nodes["c"].consumptions[0].quantity,
         )
-        res, t_mod, t_sol = msgpack.unpackb(res, use_list=False, raw=False)
-        self.assertEqual([expected], [LPTimeStep.from_json(r) for r in res])
-        self.assertTrue(t_mod > 0)
-        self.assertTrue(t_sol > 0)
+        # Each scenario gets one record with both components
+        self.assertEqual(3, len(split.benchmark.solver))
+        self.assertEqual(whole.benchmark.variables, split.benchmark.variables)
+        self.assertEqual(whole.benchmark.constraints, split.benchmark.constraints)
+
+        with tempfile.TemporaryDirectory() as path:
+            solve_lp(study, dump_dir=path, dump_scenarios=[1])
+            self.assertEqual(
+                ["scn1_c0_t0.lp", "scn1_c1_t0.lp"], sorted(os.listdir(path))
+            )
 
-        in_mapper.get_node_var.assert_has_calls(
-            [
-                call(network="default", node="a", t=0, scn=0),
-                call(network="gas", node="b", t=0, scn=0),
-            ]
+    def test_solve_duplicates(self):
+        quantity = [[10, 20], [5, 5], [10, 20], [10, 20], [5, 5]]
+        study = (
+            Study(horizon=2, nb_scn=5)
+            .network()
+            .node("a")
+            .consumption(name="load", cost=10 ** 6, quantity=quantity)
+            .production(name="prod", cost=10, quantity=[15, 15])
+            .build()
         )
-        adequacy.add_node.assert_has_calls(
-            [
-                call(name_network="default", name_node="a", t=0, node=var_node),
-                call(name_network="gas", name_node="b", t=0, node=empty_node),
-            ]
+
+        res = solve_lp(study, chunk_size=1)
+        np.testing.assert_array_equal(
+            [[10, 15], [5, 5], [10, 15], [10, 15], [5, 5]],
+            res.networks["default"].nodes["a"].consumptions[0].quantity,
         )
-        storage.add_node.assert_has_calls(
-            [
-                call(name_network="default", name_node="a", t=0, node=var_node),
-                call(name_network="gas", name_node="b", t=0, node=empty_node),
-            ]
+        self.assertEqual(3, res.benchmark.saved)
+        self.assertEqual(2, len(res.benchmark.solver))
+
+        res = solve_lp(study, dedup=False)
+        self.assertEqual(0, res.benchmark.saved)
+        self.assertEqual(5, len(res.benchmark.solver))
+
+    def test_solve_presolve(self):
+        study = (
+            Study(horizon=2)
+            .network()
+            .node("b")
+            .node("a")
+            .consumption(name="load", cost=10 ** 6, quantity=[10, 20])
+            .consumption(name="empty", cost=10 ** 6, quantity=0)
+            .production(name="nuclear", cost=10, quantity=[12, 12])
+            .production(name="solar", cost=10, quantity=[4, 4])
+            .production(name="off", cost=1, quantity=0)
+            .link(src="a", dest="b", cost=1, quantity=0)
+            .build()
         )
-        mix.add_converter.assert_called_with(conv=var_conv)
 
-        objective.add_node.assert_has_calls(
-            [call(node=var_node), call(node=empty_node)]
+        res = solve_lp(study)
+        node = res.networks["default"].nodes["a"]
+        np.testing.assert_array_almost_equal([[10, 16]], node.consumptions[0].quantity)
+        np.testing.assert_array_equal([[0, 0]], node.consumptions[1].quantity)
+        np.testing.assert_array_almost_equal([[7.5, 12]], node.productions[0].quantity)
+        np.testing.assert_array_almost_equal([[2.5, 4]], node.productions[1].quantity)
+        np.testing.assert_array_equal([[0, 0]], node.productions[2].quantity)
+        np.testing.assert_array_equal([[0, 0]], node.links[0].quantity)
+        # empty, solar, off and link variables, adequacy of b
+        self.assertEqual(8, res.benchmark.removed_variables)
+        self.assertEqual(2, res.benchmark.removed_constraints)
+        self.assertEqual([4], res.benchmark.variables)
+
+        res = solve_lp(study, presolve=False)
+        self.assertEqual(0, res.benchmark.removed_variables)
+        self.assertEqual([12], res.benchmark.variables)
+
+    def test_solve_infeasible(self):
+        # Storage can't hold its initial capacity
+        study = (
+            Study(horizon=3)
+            .network()
+            .node("a")
+            .consumption(name="load", cost=10 ** 6, quantity=5)
+            .storage(name="cell", capacity=10, flow_in=5, flow_out=5, init_capacity=20)
+            .build()
         )
-        objective.add_converter(conv=var_conv)
 
-        objective.build.assert_called_with()
-        adequacy.build.assert_called_with()
-        storage.build.assert_called_with()
-        mix.build.assert_called_with()
+        res = solve_lp(study)
+        node = res.networks["default"].nodes["a"]
+        np.testing.assert_array_equal([[5, 5, 5]], node.consumptions[0].quantity)
+        np.testing.assert_array_equal([[0, 0, 0]], node.storages[0].capacity)
+
+    def test_solve_status(self):
+        # Second scenario storage can't hold its initial capacity
+        study = (
+            Study(horizon=2, nb_scn=2)
+            .network()
+            .node("a")
+            .consumption(name="load", cost=10 ** 6, quantity=5)
+            .storage(
+                name="cell",
+                capacity=[[30, 30], [10, 10]],
+                flow_in=5,
+                flow_out=5,
+                init_capacity=20,
+            )
+            .build()
+        )
 
-        solver.Solve.assert_called_with()
+        res = solve_lp(study, dedup=False)
+        df = res.benchmark.to_df()
+        self.assertEqual("optimal", df.loc[0, "status"])
+        self.assertEqual("infeasible", df.loc[1, "status"])
+        np.testing.assert_array_equal(
+            [0, 0], res.networks["default"].nodes["a"].storages[0].capacity[1]
+        )
 
     def test_solve(self):
         # Input
@@ -518,22 +595,12 @@ class TestSolve(unittest.TestCase):
         )
 
         # Mock
-
         out_mapper = OutputMapper(study=study)
-        out_mapper.set_node_var = MagicMock()
-        out_mapper.set_converter_var = MagicMock()
+        out_mapper.set_scenarios = MagicMock()
         out_mapper.get_result = MagicMock(return_value=exp_result)
 
         # Test
         res = solve_lp(study, out_mapper)
 
         self.assertEqual(exp_result, res)
-        out_mapper.set_node_var.assert_has_calls(
-            [
-                call(network="gas", node="a", t=0, scn=0, vars=ANY),
-                call(network="default", node="b", t=0, scn=0, vars=ANY),
-            ]
-        )
-        out_mapper.set_converter_var.assert_called_with(
-            name="conv", t=0, scn=0, vars=ANY
-        )
+        out_mapper.set_scenarios.assert_has_calls([call(scns=[0], output=ANY, start=0)])
@@ -4,10 +4,11 @@
 #  If a copy of the Apache License, version 2.0 was not distributed with this file, you can obtain one at http://www.apache.org/licenses/LICENSE-2.0.
 #  SPDX-License-Identifier: Apache-2.0
 #  This file is part of hadar-simulator, a python adequacy library for everyone.
+import asyncio
 import json
 import threading
 import unittest
-from http.server import BaseHTTPRequestHandler, HTTPServer
+from http.server import BaseHTTPRequestHandler, HTTPServer, ThreadingHTTPServer
 
 from hadar import RemoteOptimizer
 from hadar.optimizer.domain.input import Study
@@ -17,7 +18,14 @@ from hadar.optimizer.domain.output import (
     OutputNode,
     OutputNetwork,
 )
-from hadar.optimizer.remote.optimizer import check_code
+from hadar.optimizer.remote.optimizer import check_code, ServerError
+from hadar.optimizer.remote.wire import encode, decode, MEDIA_TYPE
+from hadar.optimizer.utils import keep_arrays
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
 
 
 class MockSchedulerServer(BaseHTTPRequestHandler):
@@ -56,6 +64,74 @@ class MockSchedulerServer(BaseHTTPRequestHandler):
         self.wfile.write(body)
 
 
+class MockBinaryServer(BaseHTTPRequestHandler):
+    """
+    Server which answers in binary format if asked. Without binary support, binary study is refused by 415.
+    """
+
+    binary = True
+    received = []  # Content types of studies received
+
+    def accept_binary(self) -> bool:
+        return self.binary and MEDIA_TYPE in self.headers.get("Accept", "")
+
+    def reply(self, data: dict):
+        if self.accept_binary():
+            body, content_type = encode(data), MEDIA_TYPE
+        else:
+            body, content_type = json.dumps(data).encode(), "application/json"
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        content_length = int(self.headers["Content-Length"])
+        body = self.rfile.read(content_length)
+        content_type = self.headers["Content-Type"]
+        if content_type == MEDIA_TYPE and not self.binary:
+            self.send_response(415)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if content_type == MEDIA_TYPE:
+            data = decode(body, self.headers.get("Content-Encoding"))
+        else:
+            data = json.loads(body.decode())
+        MockBinaryServer.received.append(content_type)
+        assert isinstance(Study.from_json(data), Study)
+        self.reply({"job": 123, "status": "QUEUED", "progress": 1})
+
+    def do_GET(self):
+        res = job_result(7)
+        if self.accept_binary():
+            with keep_arrays():
+                result = res.to_json()
+        else:
+            result = res.to_json()  # Json fallback, arrays as lists
+        self.reply({"job": 123, "status": "TERMINATED", "result": result})
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockUnsupportedServer(BaseHTTPRequestHandler):
+    """
+    Server which refuses study in any format.
+    """
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(415)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
 def handle_twice(handle_request):
     handle_request()  # one for Post /study
     handle_request()  # second for GET /result/123
@@ -94,7 +170,160 @@ class RemoteOptimizerTest(unittest.TestCase):
 
         self.assertEqual(self.result, res)
 
+    def test_binary(self):
+        study = (
+            Study(horizon=2)
+            .network()
+            .node("a")
+            .consumption(cost=0, quantity=[1, 2], name="load")
+            .build()
+        )
+        for binary, compression in [(True, "gzip"), (False, None)]:
+            MockBinaryServer.binary = binary
+            MockBinaryServer.received = []
+            httpd = HTTPServer(("localhost", 0), MockBinaryServer)
+            server = threading.Thread(target=httpd.serve_forever, daemon=True)
+            server.start()
+
+            url = "http://localhost:%d" % httpd.server_address[1]
+            optim = RemoteOptimizer(url=url, binary=True, compression=compression)
+            res = optim.solve(study)
+            httpd.shutdown()
+            httpd.server_close()
+
+            self.assertIsInstance(res, Result)
+            self.assertEqual(job_result(7), res)
+            # Without server support, study is sent again as json
+            expected = MEDIA_TYPE if binary else "application/json"
+            self.assertEqual([expected], MockBinaryServer.received)
+
+    def test_unsupported(self):
+        httpd = ThreadingHTTPServer(("localhost", 0), MockUnsupportedServer)
+        server = threading.Thread(target=httpd.serve_forever, daemon=True)
+        server.start()
+        url = "http://localhost:%d" % httpd.server_address[1]
+
+        optimizers = [RemoteOptimizer(url=url, binary=b) for b in [True, False]]
+        for optim in optimizers:
+            self.assertRaises(ValueError, lambda: optim.solve(self.study))
+            if aiohttp is not None:
+                self.assertRaises(
+                    ValueError, lambda: asyncio.run(optim.solve_async(self.study))
+                )
+        httpd.shutdown()
+        httpd.server_close()
+
     def test_check_code(self):
         self.assertRaises(ValueError, lambda: check_code(404))
         self.assertRaises(ValueError, lambda: check_code(403))
+        self.assertRaises(ValueError, lambda: check_code(415))
         self.assertRaises(IOError, lambda: check_code(500))
+
+
+def job_result(job: int) -> Result:
+    nodes = {
+        "a": OutputNode(
+            consumptions=[OutputConsumption(quantity=[job], name="load")],
+            productions=[],
+            storages=[],
+            links=[],
+        )
+    }
+    return Result(networks={"default": OutputNetwork(nodes=nodes)}, converters={})
+
+
+class MockAsyncServer(BaseHTTPRequestHandler):
+    """
+    Keep-alive server which queues each job for two polls, records client ports to count connections.
+    Jobs of study with an horizon of 2 end with error.
+    """
+
+    protocol_version = "HTTP/1.1"
+    lock = threading.Lock()
+    jobs = dict()  # {job id: [number of polls, study horizon]}
+    ports = set()
+
+    def reply(self, data: dict):
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        MockAsyncServer.ports.add(self.client_address[1])
+        content_length = int(self.headers["Content-Length"])
+        study = Study.from_json(json.loads(self.rfile.read(content_length).decode()))
+        with MockAsyncServer.lock:
+            job = len(MockAsyncServer.jobs)
+            MockAsyncServer.jobs[job] = [0, study.horizon]
+        self.reply({"job": job, "status": "QUEUED", "progress": 2})
+
+    def do_GET(self):
+        MockAsyncServer.ports.add(self.client_address[1])
+        job = int(self.path.split("?")[0].split("/")[-1])
+        polls, horizon = MockAsyncServer.jobs[job]
+        MockAsyncServer.jobs[job][0] += 1
+        if polls < 2:
+            self.reply({"job": job, "status": "QUEUED", "progress": 2 - polls})
+        elif horizon == 2:
+            self.reply({"job": job, "status": "ERROR", "message": "wrong study"})
+        else:
+            result = job_result(job).to_json()
+            self.reply({"job": job, "status": "TERMINATED", "result": result})
+
+    def log_message(self, format, *args):
+        pass
+
+
+@unittest.skipIf(aiohttp is None, "aiohttp not installed")
+class AsyncRemoteOptimizerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        MockAsyncServer.jobs.clear()
+        MockAsyncServer.ports.clear()
+        self.httpd = ThreadingHTTPServer(("localhost", 0), MockAsyncServer)
+        self.server = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.server.start()
+        self.optim = RemoteOptimizer(
+            url="http://localhost:%d" % self.httpd.server_address[1],
+            concurrency=3,
+            poll=0.01,
+            max_poll=0.05,
+        )
+        self.study = (
+            Study(horizon=1)
+            .network()
+            .node("a")
+            .consumption(cost=0, quantity=[0], name="load")
+            .build()
+        )
+
+    def tearDown(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def test_solve_async(self):
+        res = asyncio.run(self.optim.solve_async(self.study))
+
+        self.assertEqual(job_result(0), res)
+        self.assertEqual(3, MockAsyncServer.jobs[0][0])
+        self.assertEqual(1, len(MockAsyncServer.ports))  # One keep-alive connection
+
+    def test_solve_many(self):
+        res = self.optim.solve_many([self.study] * 10)
+
+        self.assertEqual(10, len(res))
+        jobs = [r.networks["default"].nodes["a"].consumptions[0] for r in res]
+        jobs = [cons.quantity[0] for cons in jobs]
+        self.assertEqual(list(range(10)), sorted(jobs))
+        self.assertTrue(len(MockAsyncServer.ports) <= 3)
+
+    def test_error(self):
+        study = (
+            Study(horizon=2)
+            .network()
+            .node("a")
+            .consumption(cost=0, quantity=[0, 0], name="load")
+            .build()
+        )
+        self.assertRaises(ServerError, lambda: self.optim.solve_many([study]))
@@ -0,0 +1,100 @@
+#  Copyright (c) 2019-2020, RTE (https://www.rte-france.com)
+#  See AUTHORS.txt
+#  This Source Code Form is subject to the terms of the Apache License, version 2.0.
+#  If a copy of the Apache License, version 2.0 was not distributed with this file, you can obtain one at http://www.apache.org/licenses/LICENSE-2.0.
+#  SPDX-License-Identifier: Apache-2.0
+#  This file is part of hadar-simulator, a python adequacy library for everyone.
+import json
+import unittest
+
+import numpy as np
+
+from hadar.optimizer.domain.input import Study
+from hadar.optimizer.domain.output import (
+    Result,
+    OutputConsumption,
+    OutputNode,
+    OutputNetwork,
+    OutputConverter,
+)
+from hadar.optimizer.remote.wire import (
+    encode,
+    decode,
+    headers,
+    is_binary,
+    MEDIA_TYPE,
+)
+
+
+class TestWire(unittest.TestCase):
+    def setUp(self) -> None:
+        self.study = (
+            Study(horizon=3, nb_scn=2)
+            .network()
+            .node("a")
+            .consumption(name="load", cost=10 ** 6, quantity=[[1, 2, 3], [4, 5, 6]])
+            .production(name="prod", cost=[1, 2, 3], quantity=12)
+            .to_converter(name="conv", ratio=0.5)
+            .network("gas")
+            .node("b")
+            .converter(name="conv", to_network="gas", to_node="b", max=[[3], [4]])
+            .build()
+        )
+
+    def test_study(self):
+        payload = encode(self.study)
+        tree = decode(payload)
+        res = Study.from_json(tree)
+
+        cons = res.networks["default"].nodes["a"].consumptions[0]
+        np.testing.assert_array_equal([[1, 2, 3], [4, 5, 6]], cons.quantity.value)
+        self.assertEqual(self.study.to_json(), res.to_json())
+        # Arrays are written as raw buffers, smaller than json text
+        self.assertTrue(len(payload) < len(json.dumps(self.study.to_json())))
+        # Study is not altered by encoding
+        self.assertIsInstance(self.study.to_json()["horizon"], int)
+
+    def test_result(self):
+        nodes = {
+            "a": OutputNode(
+                consumptions=[
+                    OutputConsumption(
+                        quantity=np.arange(6, dtype=np.float32).reshape(2, 3),
+                        name="load",
+                    )
+                ],
+                productions=[],
+                storages=[],
+                links=[],
+            )
+        }
+        conv = OutputConverter(
+            name="conv",
+            flow_src={("default", "a"): np.ones((2, 3))},
+            flow_dest=np.zeros((2, 3)),
+        )
+        result = Result(
+            networks={"default": OutputNetwork(nodes=nodes)},
+            converters={"conv": conv},
+        )
+
+        for compression in [None, "gzip"]:
+            res = Result.from_json(decode(encode(result, compression), compression))
+            quantity = res.networks["default"].nodes["a"].consumptions[0].quantity
+            self.assertEqual(np.float32, quantity.dtype)
+            np.testing.assert_array_equal(np.arange(6).reshape(2, 3), quantity)
+            np.testing.assert_array_equal(
+                np.ones((2, 3)), res.converters["conv"].flow_src[("default", "a")]
+            )
+
+    def test_compression(self):
+        self.assertRaises(ValueError, lambda: encode(self.study, "lzma"))
+        res = Study.from_json(decode(encode(self.study, "gzip"), "gzip"))
+        self.assertEqual(self.study.to_json(), res.to_json())
+
+    def test_headers(self):
+        self.assertEqual(MEDIA_TYPE, headers(True)["Content-Type"])
+        self.assertEqual("gzip", headers(True, "gzip")["Content-Encoding"])
+        self.assertEqual("application/json", headers(False)["Accept"])
+        self.assertTrue(is_binary({"Content-Type": MEDIA_TYPE + "; v=1"}))
+        self.assertFalse(is_binary({"Content-Type": "application/json"}))
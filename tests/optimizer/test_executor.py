@@ -0,0 +1,118 @@
+#  Copyright (c) 2019-2020, RTE (https://www.rte-france.com)
+#  See AUTHORS.txt
+#  This Source Code Form is subject to the terms of the Apache License, version 2.0.
+#  If a copy of the Apache License, version 2.0 was not distributed with this file, you can obtain one at http://www.apache.org/licenses/LICENSE-2.0.
+#  SPDX-License-Identifier: Apache-2.0
+#  This file is part of hadar-simulator, a python adequacy library for everyone.
+import multiprocessing
+import os
+import unittest
+import unittest.mock
+
+import numpy as np
+
+from hadar.optimizer.domain.input import Study
+from hadar.optimizer.executor import (
+    SerialExecutor,
+    ThreadExecutor,
+    ProcessExecutor,
+    SocketExecutor,
+    create_executor,
+    serve,
+    AUTHKEY_ENV,
+)
+from hadar.optimizer.lp import optimizer
+from hadar.optimizer.lp.optimizer import solve_lp
+from hadar.optimizer import shared
+from hadar.optimizer.shared import attach, _detach_all
+
+
+def square(x):
+    return x * x
+
+
+def fail(x):
+    raise ValueError("wrong %d" % x)
+
+
+def horizon(name):
+    return attach(name).horizon
+
+
+def kept(_):
+    return len(shared._attached), len(optimizer._templates)
+
+
+class TestExecutor(unittest.TestCase):
+    def setUp(self) -> None:
+        self.study = (
+            Study(horizon=2, nb_scn=3)
+            .network()
+            .node("a")
+            .consumption(
+                name="load", cost=10 ** 6, quantity=[[10, 20], [5, 5], [0, 30]]
+            )
+            .production(name="prod", cost=10, quantity=15)
+            .build()
+        )
+
+    def assert_executor(self, executor):
+        with executor:
+            self.assertEqual([0, 1, 4, 9], executor.map(square, range(4)))
+            unordered = executor.imap_unordered(square, range(4))
+            self.assertEqual([0, 1, 4, 9], sorted(unordered))
+
+            with executor.share(self.study) as shared:
+                self.assertEqual([2, 2], executor.map(horizon, [shared.name] * 2))
+
+            res = solve_lp(self.study, pool=executor, chunk_size=1)
+            np.testing.assert_array_equal(
+                [[10, 15], [5, 5], [0, 15]],
+                res.networks["default"].nodes["a"].consumptions[0].quantity,
+            )
+            # Workers release study and templates when solve ends
+            self.assertEqual([(0, 0)] * 4, executor.map(kept, range(4)))
+        _detach_all()
+
+    def test_serial(self):
+        self.assert_executor(SerialExecutor())
+
+    def test_thread(self):
+        executor = ThreadExecutor(2)
+        self.assertEqual(2, executor.processes)
+        self.assert_executor(executor)
+
+    def test_process(self):
+        executor = ProcessExecutor(2)
+        self.assertEqual(2, executor.processes)
+        self.assert_executor(executor)
+
+    def test_socket(self):
+        executor = SocketExecutor(local=2, authkey=b"test secret")
+        self.assertEqual(2, executor.processes)
+        self.assert_executor(executor)
+
+    def test_socket_error(self):
+        with SocketExecutor(local=1, authkey="test secret") as executor:
+            with self.assertRaises(RuntimeError) as ctx:
+                executor.map(fail, [3])
+            self.assertIn("wrong 3", str(ctx.exception))
+            self.assertEqual([4], executor.map(square, [2]))
+
+    def test_socket_authkey(self):
+        with unittest.mock.patch.dict(os.environ, {AUTHKEY_ENV: ""}):
+            self.assertRaises(ValueError, lambda: SocketExecutor(local=1))
+            self.assertRaises(ValueError, lambda: serve(("localhost", 0)))
+        with unittest.mock.patch.dict(os.environ, {AUTHKEY_ENV: "env secret"}):
+            with SocketExecutor(local=1) as executor:
+                self.assertEqual([4], executor.map(square, [2]))
+
+    def test_create_executor(self):
+        self.assertIsInstance(create_executor("serial"), SerialExecutor)
+        executor = SerialExecutor()
+        self.assertIs(executor, create_executor(executor))
+        with multiprocessing.Pool(1) as pool:
+            executor = create_executor(pool)
+            self.assertIsInstance(executor, ProcessExecutor)
+            self.assertIs(pool, executor.pool)
+        self.assertRaises(ValueError, lambda: create_executor("cloud"))
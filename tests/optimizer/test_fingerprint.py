@@ -0,0 +1,73 @@
+#  Copyright (c) 2019-2020, RTE (https://www.rte-france.com)
+#  See AUTHORS.txt
+#  This Source Code Form is subject to the terms of the Apache License, version 2.0.
+#  If a copy of the Apache License, version 2.0 was not distributed with this file, you can obtain one at http://www.apache.org/licenses/LICENSE-2.0.
+#  SPDX-License-Identifier: Apache-2.0
+#  This file is part of hadar-simulator, a python adequacy library for everyone.
+import unittest
+
+from hadar.optimizer.domain.input import Study
+from hadar.optimizer.fingerprint import (
+    numerical_values,
+    structure_fingerprint,
+    scenario_fingerprints,
+    group_scenarios,
+)
+
+
+class TestFingerprint(unittest.TestCase):
+    def setUp(self) -> None:
+        self.study = (
+            Study(horizon=2, nb_scn=4)
+            .network()
+            .node("a")
+            .consumption(
+                name="load", cost=10, quantity=[[1, 2], [3, 4], [1, 2], [1, 2]]
+            )
+            .production(name="prod", cost=[[1], [1], [1], [2]], quantity=[5, 6])
+            .storage(name="cell", capacity=10, flow_in=1, flow_out=1)
+            .build()
+        )
+
+    def test_numerical_values(self):
+        self.assertEqual(9, len(list(numerical_values(self.study))))
+
+    def test_scenario_fingerprints(self):
+        digests = scenario_fingerprints(self.study)
+
+        self.assertEqual(4, len(digests))
+        self.assertEqual(digests[0], digests[2])
+        self.assertNotEqual(digests[0], digests[1])
+        self.assertNotEqual(digests[0], digests[3])
+
+    def test_group_scenarios(self):
+        self.assertEqual({0: [0, 2], 1: [1], 3: [3]}, group_scenarios(self.study))
+
+    def test_group_constant_scenarios(self):
+        study = (
+            Study(horizon=2, nb_scn=3)
+            .network()
+            .node("a")
+            .consumption(name="load", cost=10, quantity=[1, 2])
+            .build()
+        )
+        self.assertEqual({0: [0, 1, 2]}, group_scenarios(study))
+
+    def test_structure_fingerprint(self):
+        def build(cost, init):
+            return (
+                Study(horizon=2, nb_scn=2)
+                .network()
+                .node("a")
+                .consumption(name="load", cost=cost, quantity=[[1, 2], [3, 4]])
+                .storage(
+                    name="cell", capacity=10, flow_in=1, flow_out=1, init_capacity=init
+                )
+                .build()
+            )
+
+        digest = structure_fingerprint(build(10, 0))
+        self.assertEqual(digest, structure_fingerprint(build(10, 0)))
+        self.assertNotEqual(digest, structure_fingerprint(build(11, 0)))
+        self.assertNotEqual(digest, structure_fingerprint(build(10, 1)))
+        self.assertNotEqual(digest, structure_fingerprint(build([[10], [10]], 0)))
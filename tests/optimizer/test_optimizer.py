@@ -0,0 +1,87 @@
+#  Copyright (c) 2019-2020, RTE (https://www.rte-france.com)
+#  See AUTHORS.txt
+#  This Source Code Form is subject to the terms of the Apache License, version 2.0.
+#  If a copy of the Apache License, version 2.0 was not distributed with this file, you can obtain one at http://www.apache.org/licenses/LICENSE-2.0.
+#  SPDX-License-Identifier: Apache-2.0
+#  This file is part of hadar-simulator, a python adequacy library for everyone.
+import unittest
+
+import numpy as np
+
+from hadar.optimizer.domain.input import Study
+from hadar.optimizer.optimizer import LPOptimizer, compare_backends
+
+
+class TestLPOptimizer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.study = (
+            Study(horizon=2, nb_scn=3)
+            .network()
+            .node("a")
+            .consumption(name="load", cost=10 ** 6, quantity=[10, 20])
+            .production(name="prod", cost=10, quantity=15)
+            .build()
+        )
+
+    def test_reuse_pool(self):
+        with LPOptimizer(processes=2) as optim:
+            res = optim.solve(self.study)
+            pool = optim.pool
+            optim.solve(self.study)
+
+            self.assertIs(pool, optim.pool)
+            self.assertEqual(2, pool.processes)
+
+        self.assertIsNone(optim._pool)
+        np.testing.assert_array_equal(
+            [[10, 15]] * 3,
+            res.networks["default"].nodes["a"].consumptions[0].quantity,
+        )
+
+    def test_solve_iter(self):
+        study = (
+            Study(horizon=2, nb_scn=4)
+            .network()
+            .node("a")
+            .consumption(
+                name="load",
+                cost=10 ** 6,
+                quantity=[[10, 20], [5, 5], [10, 20], [30, 0]],
+            )
+            .production(name="prod", cost=10, quantity=15)
+            .build()
+        )
+        steps = []
+
+        with LPOptimizer(processes=2, chunk_size=1) as optim:
+            results = dict(optim.solve_iter(study, progress=lambda *a: steps.append(a)))
+
+        self.assertEqual([0, 1, 2, 3], sorted(results))
+        expected = [[10, 15], [5, 5], [10, 15], [15, 0]]
+        for scn, res in results.items():
+            np.testing.assert_array_equal(
+                [expected[scn]],
+                res.networks["default"].nodes["a"].consumptions[0].quantity,
+            )
+        self.assertEqual((4, 4), steps[-1])
+        self.assertEqual(3, len(steps))  # Scenario 2 comes with its duplicate 0
+
+    def test_close(self):
+        optim = LPOptimizer(processes=1)
+        optim.solve(self.study)
+        pool = optim.pool
+        optim.close()
+        self.assertIsNone(optim._pool)
+
+        # Optimizer still usable after close
+        optim.solve(self.study)
+        self.assertIsNot(pool, optim.pool)
+        optim.close()
+
+    def test_compare_backends(self):
+        res = compare_backends(self.study, backends=["GLOP", "CLP"], processes=1)
+
+        self.assertEqual(["GLOP", "CLP"], list(res.index))
+        self.assertEqual(
+            ["total", "modeler", "solver", "mapper", "iterations"], list(res.columns)
+        )
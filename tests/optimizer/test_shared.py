@@ -0,0 +1,47 @@
+#  Copyright (c) 2019-2020, RTE (https://www.rte-france.com)
+#  See AUTHORS.txt
+#  This Source Code Form is subject to the terms of the Apache License, version 2.0.
+#  If a copy of the Apache License, version 2.0 was not distributed with this file, you can obtain one at http://www.apache.org/licenses/LICENSE-2.0.
+#  SPDX-License-Identifier: Apache-2.0
+#  This file is part of hadar-simulator, a python adequacy library for everyone.
+import unittest
+
+import numpy as np
+
+from hadar.optimizer.domain.input import Study
+from hadar.optimizer import shared as module
+from hadar.optimizer.shared import SharedStudy, attach, _detach_all
+
+
+class TestSharedStudy(unittest.TestCase):
+    def test_attach(self):
+        study = (
+            Study(horizon=3, nb_scn=2)
+            .network()
+            .node("a")
+            .consumption(name="load", cost=10, quantity=[[1, 2, 3], [4, 5, 6]])
+            .production(name="prod", cost=[1, 2, 3], quantity=12)
+            .build()
+        )
+
+        with SharedStudy(study) as shared:
+            res = attach(shared.name)
+            self.assertIs(res, attach(shared.name))
+
+            cons = res.networks["default"].nodes["a"].consumptions[0]
+            prod = res.networks["default"].nodes["a"].productions[0]
+            np.testing.assert_array_equal([[1, 2, 3], [4, 5, 6]], cons.quantity.value)
+            np.testing.assert_array_equal([1, 2, 3], prod.cost.value)
+            self.assertEqual(12, prod.quantity.value)
+            self.assertFalse(cons.quantity.value.flags.writeable)
+
+            del cons, prod, res
+            _detach_all()
+
+    def test_close(self):
+        study = Study(horizon=1).network().node("a").build()
+        with SharedStudy(study) as shared:
+            name = shared.name
+            attach(name)
+            self.assertIn(name, module._attached)
+        self.assertNotIn(name, module._attached)
@@ -10,6 +10,7 @@ import unittest
 import numpy as np
 import pandas as pd
 
+from hadar.optimizer.executor import SerialExecutor
 from hadar.workflow.pipeline import Pipeline, TO_SHUFFLER
 from hadar.workflow.pipeline import ToShuffler
 from hadar.workflow.shuffler import Timeline, TimelinePipeline, Shuffler
@@ -118,3 +119,7 @@ class TestShuffler(unittest.TestCase):
         res = shuffler.shuffle(3)
         for name, array in res.items():
             np.testing.assert_equal(exp[name], array)
+
+        res = shuffler.shuffle(3, executor=SerialExecutor())
+        for name, array in res.items():
+            np.testing.assert_equal(exp[name], array)